@@ -0,0 +1,54 @@
+# ========================================
+# FileName: bench_cramer_rao.py
+# Date: 19 oct. 2026 - 10:21
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Benchmarks of the basis
+#        construction and of the
+#        Cramer-Rao lower bounds
+# =========================================
+
+import os
+import numpy as np
+from scipy.linalg import toeplitz
+
+import sys
+file_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(file_dir, '..'))
+from benchmarks.harness import benchmark
+from src.cramer_rao import (
+        basis_euc_sym_mat_real,
+        basis_euc_sym_mat_real_vec,
+        crb_centered_multivariate_gaussian_basis,
+        crb_centered_multivariate_gaussian_kron
+)
+
+N_FEATURES = [5, 15, 35, 70, 140]
+
+
+def make_covariance(n_features: int) -> np.ndarray:
+    """Toeplitz covariance of the correlated scenarios."""
+    return toeplitz(0.75 ** np.arange(n_features))
+
+
+@benchmark(N_FEATURES, complexity=3)
+def basis_numba(n_features):
+    return lambda: basis_euc_sym_mat_real(n_features)
+
+
+@benchmark(N_FEATURES, complexity=3)
+def basis_vectorized(n_features):
+    return lambda: basis_euc_sym_mat_real_vec(n_features)
+
+
+@benchmark(N_FEATURES, complexity=7)
+def crb_basis(n_features):
+    covariance = make_covariance(n_features)
+    return lambda: crb_centered_multivariate_gaussian_basis(covariance, 100)
+
+
+@benchmark(N_FEATURES, complexity=6)
+def crb_kron(n_features):
+    covariance = make_covariance(n_features)
+    return lambda: crb_centered_multivariate_gaussian_kron(covariance, 100)
@@ -0,0 +1,72 @@
+# ========================================
+# FileName: bench_montecarlo.py
+# Date: 19 oct. 2026 - 10:34
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Benchmarks of the per-trial
+#        kernels of the Monte-Carlo
+#        experiments
+# =========================================
+
+import os
+import numpy as np
+
+import sys
+file_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(file_dir, '..'))
+from benchmarks.harness import (
+        benchmark,
+        load_module
+)
+from src.scenarios import load_scenario
+
+EXPERIMENTS_DIR = os.path.join(file_dir, '..', 'experiments')
+SCENARIOS = ['correlated_low_dimension', 'white_high_dimension']
+
+
+def load_experiment(experiment: str, scenario: str) -> tuple:
+    """Load the compute script and a scenario of an experiment.
+
+    Args:
+        experiment (str): Name of the experiment folder
+        scenario (str): Name of the scenario file, without extension
+
+    Returns:
+        tuple: (compute_montecarlo module, scenario)
+    """
+    experiment_dir = os.path.join(EXPERIMENTS_DIR, experiment)
+    script = load_module(
+            os.path.join(experiment_dir, 'compute_montecarlo.py'),
+            f'{experiment}_compute_montecarlo')
+    config = load_scenario(
+            os.path.join(experiment_dir, 'scenarios', f'{scenario}.yaml'))
+    return script, config
+
+
+@benchmark(SCENARIOS)
+def trial_cramer_rao_cov(scenario):
+    script, config = load_experiment('cramer_rao_cov', scenario)
+    mean = config.covariance[0] * 0
+    chol = np.linalg.cholesky(config.covariance)
+    return lambda: script.montecarlo_trial(
+            mean, config.covariance, chol, config.n_samples_list, 42, 1)
+
+
+@benchmark(SCENARIOS)
+def trial_cramer_rao_mean_cov(scenario):
+    script, config = load_experiment('cramer_rao_mean_cov', scenario)
+    chol = np.linalg.cholesky(config.covariance)
+    return lambda: script.montecarlo_trial(
+            config.mean, config.covariance, chol, config.n_samples_list,
+            42, 1)
+
+
+@benchmark(SCENARIOS)
+def chunk_cramer_rao_cov_estimators(scenario):
+    script, config = load_experiment('cramer_rao_cov', scenario)
+    mean = config.covariance[0] * 0
+    chol = np.linalg.cholesky(config.covariance)
+    return lambda: script.montecarlo_chunk(
+            mean, config.covariance, chol, config.n_samples_list, 42,
+            list(range(1, 17)), estimators=('ledoit_wolf', 'oas', 'rblw'))
@@ -0,0 +1,74 @@
+# ========================================
+# FileName: bench_results.py
+# Date: 19 oct. 2026 - 10:47
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Benchmarks of the loading and
+#        aggregation of results over
+#        many group folders
+# =========================================
+
+import atexit
+import os
+import pickle
+import shutil
+import tempfile
+import numpy as np
+
+import sys
+file_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(file_dir, '..'))
+from benchmarks.harness import benchmark
+from src.results import (
+        find_group_folders,
+        load_results,
+        aggregate_results
+)
+
+
+def make_storage(n_groups: int, n_features: int = 15,
+                 n_trials: int = 100) -> str:
+    """Create a temporary storage folder with synthetic group results.
+
+    Args:
+        n_groups (int): Number of group_* folders
+        n_features (int, optional): Dimension. Defaults to 15.
+        n_trials (int, optional): Number of trials per group.
+            Defaults to 100.
+
+    Returns:
+        str: Path to the storage folder, removed at exit
+    """
+    storage_path = tempfile.mkdtemp(prefix='bench_results_')
+    atexit.register(shutil.rmtree, storage_path, ignore_errors=True)
+
+    rng = np.random.default_rng(0)
+    n_samples_list = np.unique(np.logspace(1, 4, 30, base=n_features,
+                                           dtype=int))
+    for group in range(n_groups):
+        folder = os.path.join(storage_path, f'group_{group}')
+        os.makedirs(folder)
+        results = {
+            'mse_covariance_mean': rng.random(len(n_samples_list)),
+            'mse_covariance_std': rng.random(len(n_samples_list)),
+            'trials_range': [group*n_trials + 1, (group+1)*n_trials],
+            'n_trials': n_trials*n_groups,
+            'n_samples_list': n_samples_list,
+            'mean': np.zeros(n_features),
+            'covariance': np.eye(n_features),
+            'seed': 42}
+        with open(os.path.join(folder, 'results.pkl'), 'wb') as f:
+            pickle.dump(results, f)
+    return storage_path
+
+
+@benchmark([10, 100, 1000], complexity=1)
+def load_and_aggregate(n_groups):
+    storage_path = make_storage(n_groups)
+
+    def load_and_aggregate():
+        folders = find_group_folders(storage_path)
+        return aggregate_results([load_results(f) for f in folders],
+                                 ['mse_covariance'])
+    return load_and_aggregate
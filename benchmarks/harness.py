@@ -0,0 +1,158 @@
+# ========================================
+# FileName: harness.py
+# Date: 19 oct. 2026 - 09:48
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Minimal benchmark harness: timing
+#        and peak memory of parametrized
+#        benchmarks
+# =========================================
+
+import gc
+import importlib.util
+import inspect
+import os
+import statistics
+import time
+import timeit
+import tracemalloc
+
+
+def benchmark(params, complexity=None):
+    """Declare a parametrized benchmark.
+
+    The decorated function takes a parameter, does the setup and returns
+    the callable to time.
+
+    Args:
+        params (list): Values of the parameter, ordered by increasing cost
+        complexity (float, optional): Exponent of the cost as a function of
+            a numerical parameter. When given, the parameters for which the
+            cost extrapolated from the previous one exceeds the time budget
+            are skipped. Defaults to None.
+    """
+    def decorator(func):
+        func.benchmark_params = list(params)
+        func.benchmark_complexity = complexity
+        return func
+    return decorator
+
+
+def load_module(path: str, name: str):
+    """Import a python file which is not part of a package.
+
+    Args:
+        path (str): Path to the python file
+        name (str): Name given to the module
+
+    Returns:
+        module: Imported module
+    """
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def collect_benchmarks(directory: str) -> list:
+    """Collect the benchmarks of the bench_*.py files of a directory.
+
+    Args:
+        directory (str): Directory of the benchmark files
+
+    Returns:
+        list: (name, function) of every benchmark
+    """
+    benchmarks = []
+    for filename in sorted(os.listdir(directory)):
+        if not (filename.startswith('bench_') and filename.endswith('.py')):
+            continue
+        module_name = filename[:-3]
+        module = load_module(os.path.join(directory, filename), module_name)
+        for name, func in inspect.getmembers(module, inspect.isfunction):
+            if hasattr(func, 'benchmark_params'):
+                benchmarks.append((f'{module_name}.{name}', func))
+    return benchmarks
+
+
+def measure(stmt, repeat: int = 5, max_seconds: float = 10.) -> dict:
+    """Time a callable and measure its peak memory.
+
+    The first call is timed alone, which also warms up the caches and
+    the JIT compilers. If it is longer than the budget the measure stops
+    there, otherwise the number of calls per repetition is chosen by
+    `timeit.Timer.autorange`.
+
+    Args:
+        stmt (callable): Callable to benchmark
+        repeat (int, optional): Number of repetitions. Defaults to 5.
+        max_seconds (float, optional): Time budget. Defaults to 10.
+
+    Returns:
+        dict: Timings (s) per call and peak memory (bytes)
+    """
+    gc.collect()
+    t_start = time.perf_counter()
+    stmt()
+    first_call = time.perf_counter() - t_start
+
+    if first_call > max_seconds:
+        number, times = 1, [first_call]
+    else:
+        timer = timeit.Timer(stmt)
+        number, _ = timer.autorange()
+        n_repeat = max(1, min(repeat,
+                              int(max_seconds / (first_call * number))))
+        times = [t / number for t in timer.repeat(n_repeat, number)]
+
+    # Memory is measured on a separate call as tracemalloc slows
+    # down the allocations
+    gc.collect()
+    tracemalloc.start()
+    stmt()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'first_call': first_call,
+            'number': number,
+            'times': times,
+            'min': min(times),
+            'median': statistics.median(times),
+            'peak_memory': peak_memory}
+
+
+def run_benchmark(name: str, func, repeat: int = 5,
+                  max_seconds: float = 10.) -> list:
+    """Run a benchmark for all its parameters.
+
+    Args:
+        name (str): Name of the benchmark
+        func (callable): Benchmark declared with `benchmark`
+        repeat (int, optional): Number of repetitions. Defaults to 5.
+        max_seconds (float, optional): Time budget per parameter.
+            Defaults to 10.
+
+    Returns:
+        list: One record per parameter
+    """
+    records = []
+    previous = None
+    for param in func.benchmark_params:
+        record = {'name': name, 'param': param}
+
+        if previous is not None and func.benchmark_complexity is not None:
+            previous_param, previous_time = previous
+            predicted = previous_time * \
+                (param / previous_param) ** func.benchmark_complexity
+            if predicted > max_seconds:
+                record['status'] = 'skipped'
+                record['predicted'] = predicted
+                records.append(record)
+                continue
+
+        record.update(measure(func(param), repeat, max_seconds))
+        record['status'] = 'ok'
+        records.append(record)
+        previous = (param, record['median'])
+    return records
@@ -0,0 +1,134 @@
+# ========================================
+# FileName: run_benchmarks.py
+# Date: 19 oct. 2026 - 10:05
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Run the benchmark suite and store
+#        the results in JSON format
+# =========================================
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import subprocess
+import rich
+
+import sys
+file_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(file_dir, '..'))
+from benchmarks.harness import (
+        collect_benchmarks,
+        run_benchmark
+)
+
+
+def get_commit() -> tuple:
+    """Get the commit sha of the repository and whether it is dirty.
+
+    Returns:
+        tuple: (sha, dirty). sha is None outside of a git repository
+    """
+    try:
+        sha = subprocess.check_output(
+                ['git', 'rev-parse', 'HEAD'], cwd=file_dir,
+                stderr=subprocess.DEVNULL).decode().strip()
+        status = subprocess.check_output(
+                ['git', 'status', '--porcelain', '--untracked-files=no'],
+                cwd=file_dir, stderr=subprocess.DEVNULL).decode().strip()
+        return sha, len(status) > 0
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+
+def get_environment() -> dict:
+    """Machine and versions of the main packages."""
+    versions = {'python': platform.python_version()}
+    for package in ['numpy', 'scipy', 'numba', 'sklearn', 'joblib']:
+        try:
+            versions[package] = __import__(package).__version__
+        except ImportError:
+            versions[package] = None
+    return {'machine': platform.machine(),
+            'processor': platform.processor(),
+            'node': platform.node(),
+            'cpu_count': os.cpu_count(),
+            'versions': versions}
+
+
+def compare(records: list, reference_file: str):
+    """Print the ratio of the median times to a reference run."""
+    with open(reference_file, 'r') as f:
+        reference = {(r['name'], str(r['param'])): r
+                     for r in json.load(f)['benchmarks']
+                     if r['status'] == 'ok'}
+
+    rich.print(f'[bold]Comparison to {reference_file}[/bold]')
+    for record in records:
+        key = (record['name'], str(record['param']))
+        if record['status'] != 'ok' or key not in reference:
+            continue
+        ratio = record['median'] / reference[key]['median']
+        color = 'red' if ratio > 1.1 else 'green' if ratio < 0.9 else 'white'
+        rich.print(f'{record["name"]}[{record["param"]}]: '
+                   f'[{color}]x{ratio:.2f}[/{color}]')
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+            description='Run the benchmarks of the bench_*.py files and '
+            'store timings and peak memory in a JSON file.')
+    parser.add_argument('--filter', type=str, default=None,
+                        help='Regular expression on the names of the '
+                        'benchmarks to run.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of repetitions of each measure.')
+    parser.add_argument('--max_seconds', type=float, default=10.,
+                        help='Time budget of a single call. Larger '
+                        'parameters are skipped when their extrapolated '
+                        'time exceeds it.')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Path of the JSON file. Defaults to '
+                        'benchmarks/results/<commit_sha>.json')
+    parser.add_argument('--compare', type=str, default=None,
+                        help='JSON file of a previous run to compare to.')
+    args = parser.parse_args()
+
+    sha, dirty = get_commit()
+    records = []
+    for name, func in collect_benchmarks(file_dir):
+        if args.filter is not None and re.search(args.filter, name) is None:
+            continue
+        rich.print(f'[bold]{name}[/bold]')
+        for record in run_benchmark(name, func, args.repeat,
+                                    args.max_seconds):
+            if record['status'] == 'ok':
+                rich.print(f'  {record["param"]}: '
+                           f'{record["median"]*1e3:.3f} ms, '
+                           f'{record["peak_memory"]/2**20:.2f} MiB')
+            else:
+                rich.print(f'  {record["param"]}: [yellow]skipped[/yellow]')
+            records.append(record)
+
+    output = args.output
+    if output is None:
+        name = sha if sha is not None else 'nocommit'
+        if dirty:
+            name += '-dirty'
+        output = os.path.join(file_dir, 'results', f'{name}.json')
+    if os.path.dirname(output) and not os.path.isdir(os.path.dirname(output)):
+        os.makedirs(os.path.dirname(output))
+    with open(output, 'w') as f:
+        json.dump({'commit': sha,
+                   'dirty': dirty,
+                   'date': datetime.datetime.now().isoformat(),
+                   'environment': get_environment(),
+                   'benchmarks': records}, f, indent=2)
+    rich.print(f'[bold green]Results saved in {output}')
+
+    if args.compare is not None:
+        compare(records, args.compare)
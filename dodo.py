@@ -8,14 +8,55 @@
 #        pydoit (https://pydoit.org/)
 #        format.
 # =========================================
+import glob
 import os
 import yaml
+from doit import get_var
 
 DOIT_CONFIG = {
     'default_tasks': ['show_info'],
     'verbosity': 2
 }
 
+# Folder of the results of the simulation pipelines
+PIPELINE_DIR = os.path.join('results', 'pipeline')
+# Actions run on the results of the simulation of each scenario of the
+# experiments: experiment -> action -> (options, files written)
+PIPELINE_ACTIONS = {
+    'cramer_rao_cov': {
+        'export_csv': ([], ['MSE.csv', 'CRB.csv']),
+        'plot': (['--batch', '--force'],
+                 ['MSE_covariance.pdf', 'MSE_covariance.tex']),
+    },
+    'cramer_rao_mean_cov': {
+        'plot': (['--batch', '--force'],
+                 ['MSE_location.pdf', 'MSE_location.tex',
+                  'MSE_covariance.pdf', 'MSE_covariance.tex']),
+    },
+}
+
+
+def find_details(directory: str, filename: str) -> list:
+    """Details files of the experiments or documents of a directory, with
+    their name.
+
+    Only the folders directly in the directory are looked into, and the
+    files are declared as dependencies of the tasks using them, so that
+    doit registers an experiment again only when its details change.
+
+    Args:
+        directory (str): 'experiments' or 'documents'
+        filename (str): Name of the details files
+
+    Returns:
+        list: (path of the details file, name) sorted by path
+    """
+    details = []
+    for path in sorted(glob.glob(os.path.join(directory, '*', filename))):
+        with open(path) as f:
+            details.append((path, yaml.safe_load(f)['name']))
+    return details
+
 
 def task_show_info():
     """Show information"""
@@ -47,23 +88,14 @@ def task_init_qanat():
 def task_add_experiments():
     """Add experiments to the project"""
 
-    # Find all experiments_details.yml files
-    # in the experiments directory
-    experiments_details = []
-    name_list = []
-    for root, dirs, files in os.walk('experiments'):
-        if 'experiment_details.yaml' in files:
-            experiments_details.append(os.path.join(root,
-                                                    'experiment_details.yaml'))
-            with open(os.path.join(root, 'experiment_details.yaml')) as f:
-                name_list.append(yaml.load(f, Loader=yaml.FullLoader)['name'])
-
-    for experiment_file, name in zip(experiments_details, name_list):
+    for experiment_file, name in find_details('experiments',
+                                              'experiment_details.yaml'):
         yield {
             'name': name,
             'actions': [['qanat', 'experiment',
                         'new', '--file',
                          experiment_file]],
+            'file_dep': [experiment_file],
             'verbosity': 2,
             'doc': 'Add experiment {}'.format(name),
             'task_dep': ['init_qanat']
@@ -73,27 +105,90 @@ def task_add_experiments():
 def task_add_documents():
     """Add documents to the project"""
 
-    # Find all the document_details.yaml files in doucments/*/
-    documents_details = []
-    name_list = []
-    for root, dirs, files in os.walk('documents'):
-        if 'document_details.yaml' in files:
-            documents_details.append(os.path.join(root,
-                                                  'document_details.yaml'))
-            with open(os.path.join(root, 'document_details.yaml')) as f:
-                name_list.append(yaml.load(f, Loader=yaml.FullLoader)['name'])
-
-    for document_file, name in zip(documents_details, name_list):
+    for document_file, name in find_details('documents',
+                                            'document_details.yaml'):
         yield {
             'name': name,
             'actions': [['qanat', 'document',
                         'new', document_file]],
+            'file_dep': [document_file],
             'verbosity': 2,
             'doc': 'Add document {}'.format(name),
             'task_dep': ['init_qanat', 'add_experiments']
         }
 
 
+def task_warmup_numba():
+    """Compile the numba kernels of src/ into the on-disk cache"""
+
+    def warmup_numba():
+        from src.cramer_rao import warmup
+        warmup()
+
+    return {
+        'basename': 'warmup_numba',
+        'actions': [warmup_numba],
+        'file_dep': ['src/cramer_rao.py'],
+        'verbosity': 2,
+    }
+
+
+def task_benchmark():
+    """Run the benchmark suite of benchmarks/"""
+
+    return {
+        'basename': 'benchmark',
+        'actions': [['python', 'benchmarks/run_benchmarks.py']],
+        'task_dep': ['warmup_numba'],
+        'verbosity': 2,
+    }
+
+
+def task_simulate():
+    """Simulate the scenarios of the experiments and run their actions
+
+    Each scenario of scenarios/ of the experiments of PIPELINE_ACTIONS is
+    simulated into results/pipeline/<experiment>/<scenario>, then the
+    actions are run on its results. Only the steps whose files are missing
+    or whose dependencies changed are run, e.g. in parallel with
+    `doit -n 4 simulate`. The number of jobs of each simulation is set with
+    `doit simulate n_jobs=<n>`.
+    """
+    n_jobs = get_var('n_jobs', '1')
+    sources = sorted(glob.glob(os.path.join('src', '*.py')))
+    for experiment, actions in PIPELINE_ACTIONS.items():
+        experiment_dir = os.path.join('experiments', experiment)
+        script = os.path.join(experiment_dir, 'compute_montecarlo.py')
+        for scenario_file in sorted(glob.glob(
+                os.path.join(experiment_dir, 'scenarios', '*.yaml'))):
+            scenario = os.path.splitext(os.path.basename(scenario_file))[0]
+            storage_path = os.path.join(PIPELINE_DIR, experiment, scenario)
+            results_file = os.path.join(storage_path, 'results.pkl')
+            yield {
+                'name': f'{experiment}:{scenario}:montecarlo',
+                'actions': [['python', script, scenario_file,
+                             '--storage_path', storage_path,
+                             '--n_jobs', n_jobs]],
+                'file_dep': [script, scenario_file] + sources,
+                'targets': [results_file],
+                'doc': f'Simulate {scenario} for {experiment}',
+                'verbosity': 2,
+            }
+            for action, (options, outputs) in actions.items():
+                action_script = os.path.join(experiment_dir, f'{action}.py')
+                yield {
+                    'name': f'{experiment}:{scenario}:{action}',
+                    'actions': [['python', action_script,
+                                 '--storage_path', storage_path] + options],
+                    # The figures also depend on the modules of src/
+                    'file_dep': [action_script, results_file] + sources,
+                    'targets': [os.path.join(storage_path, output)
+                                for output in outputs],
+                    'doc': f'Run {action} on {scenario} for {experiment}',
+                    'verbosity': 2,
+                }
+
+
 def task_initialize_example():
     """Initialize the example project"""
 
@@ -107,7 +202,8 @@ def task_initialize_example():
         'basename': 'initialize_example',
         'actions': [initialize_example],
         'verbosity': 2,
-        'task_dep': ['init_qanat', 'add_experiments', 'add_documents']
+        'task_dep': ['init_qanat', 'add_experiments', 'add_documents',
+                     'warmup_numba']
     }
 
 
@@ -12,21 +12,234 @@
 # =========================================
 
 import numpy as np
-from joblib import Parallel, delayed
-from sklearn.covariance import EmpiricalCovariance
 import argparse
 import os
-from pathlib import Path
-import importlib
 import rich
-from tqdm import tqdm
 import pickle
+from functools import partial
+from contextlib import nullcontext
 
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 from src.utils import matprint
+from src.montecarlo import (
+        run_montecarlo,
+        run_adaptive_montecarlo,
+        execution_backend,
+        BACKENDS
+)
+from src.profiling import NO_PROFILER, save_profile
+from src.progress import ProgressMonitor
+from src.sampling import gaussian_samples, antithetic_gaussian_samples
+from src.variance_reduction import (
+        control_statistics,
+        control_expectations,
+        accumulate_trials,
+        state_from_moments,
+        summarize_state
+)
+from src.sharding import SHARD_BACKENDS, run_sharded
+from src.trial_store import TrialWriter, STORE_FORMATS, chunk_handler
+from src.estimate_archive import EstimateArchive
+
+from src.expected_mse import expected_mse_covariance
+from src.metrics import METRICS, ReferenceCovariance, evaluate_metrics
+from src.estimators import ESTIMATORS, make_estimators, fit_estimators
+from src.scenarios import load_scenario, array_digest
+from src.spectrum import (
+        SPECTRAL_STATISTICS,
+        spectral_statistics,
+        expected_spectral_statistics
+)
+from src.provenance import snapshot_scenario
+from src.run_index import AUTO_INDEX, index_results
+from src.result_cache import (
+        RESULT_CACHE,
+        ResultCache,
+        loaded_sources,
+        result_fingerprint,
+        run_cached
+)
+
+# Name of the experiment in the catalogue of the runs
+EXPERIMENT = os.path.basename(os.path.dirname(os.path.abspath(__file__)))
+# Outputs of the trials holding the estimates
+ESTIMATES = ['covariance_estimate', 'covariance_estimate_antithetic']
+
+
+def montecarlo_chunk(mean, covariance, chol, n_samples_list, seed,
+                     trial_numbers, profiler=NO_PROFILER, antithetic=False,
+                     control_variates=False, estimates=False,
+                     metrics=(), reference=None, estimators=()):
+    """Trials of a chunk of the Monte-Carlo simulation, run together.
+
+    For each number of samples, the datasets of all the trials are drawn,
+    each from the random generator of its trial so that the trials do not
+    depend on the chunks, and stacked: every estimator and metric is then
+    evaluated once on the stack.
+
+    Args:
+        mean (np.ndarray): Mean of the distribution
+        covariance (np.ndarray): Covariance of the distribution
+        chol (np.ndarray): Lower Cholesky factor of the covariance
+        n_samples_list (array-like): Numbers of samples to estimate with
+        seed (int): Seed of the simulation
+        trial_numbers (list): Numbers of the trials. The random generator
+            of each trial is seeded with seed + trial_no
+        profiler (StageProfiler, optional): Profiler timing the stages of
+            the trials. Defaults to NO_PROFILER.
+        antithetic (bool, optional): Whether to estimate on a pair of
+            antithetic datasets. The statistics of the second one are
+            suffixed by `_antithetic`. Defaults to False.
+        control_variates (bool, optional): Whether to compute the control
+            variables on the sample covariance. Defaults to False.
+        estimates (bool, optional): Whether to return the estimates, under
+            the names listed in ESTIMATES. Defaults to False.
+        metrics (tuple, optional): Names of metrics of METRICS evaluated
+            on the covariance estimates in addition to the squared error,
+            returned as `<name>_covariance`. Defaults to ().
+        reference (ReferenceCovariance, optional): Factorizations of the
+            covariance shared by the metrics, computed if not given.
+            Defaults to None.
+        estimators (tuple, optional): Names of estimators of ESTIMATORS
+            compared to the sample covariance on the same datasets. Their
+            errors are suffixed by `_<name>`. Defaults to ().
+
+    Returns:
+        list: Errors on the covariance for each number of samples, for
+            each trial
+    """
+    if reference is None:
+        reference = ReferenceCovariance(covariance)
+    rngs = [np.random.default_rng(seed + trial_no)
+            for trial_no in trial_numbers]
+    n_trials = len(trial_numbers)
+    suffixes = ['', '_antithetic'] if antithetic else ['']
+    estimators = make_estimators(['empirical', *estimators],
+                                 assume_centered=True)
+    prefixes = {name: '' if name == 'empirical' else f'_{name}'
+                for name in estimators}
+
+    # Estimates of all the trials and numbers of samples, keyed by the
+    # suffix of their outputs
+    covariances = {prefix + suffix: np.zeros(
+                       (n_trials, len(n_samples_list)) + covariance.shape)
+                   for prefix in prefixes.values() for suffix in suffixes}
+    for i, n_samples in enumerate(n_samples_list):
+        # Generate the samples of the trials, then their antithetic ones
+        with profiler.stage('sampling'):
+            if antithetic:
+                pairs = [antithetic_gaussian_samples(
+                    rng, mean, chol, n_samples) for rng in rngs]
+                datasets = np.stack([pair[0] for pair in pairs] +
+                                    [pair[1] for pair in pairs])
+            else:
+                datasets = np.stack([gaussian_samples(
+                    rng, mean, chol, n_samples) for rng in rngs])
+
+        # Estimate the covariance on the whole stack
+        with profiler.stage('estimation'):
+            fits = fit_estimators(datasets, estimators)
+        for name, (_, stack) in fits.items():
+            for j, suffix in enumerate(suffixes):
+                covariances[prefixes[name] + suffix][:, i] = \
+                    stack[j * n_trials:(j + 1) * n_trials]
+
+    # Compute the squared error and the other metrics
+    outputs = {}
+    for key, stack in covariances.items():
+        with profiler.stage('error'):
+            values = evaluate_metrics(stack, reference,
+                                      ['frobenius', *metrics])
+            outputs['mse_covariance' + key] = values.pop('frobenius')
+            for name, value in values.items():
+                outputs[f'{name}_covariance' + key] = value
+    for suffix in suffixes:
+        if control_variates:
+            with profiler.stage('controls'):
+                for name, values in control_statistics(
+                        covariances[suffix], covariance).items():
+                    outputs[name + suffix] = values
+        if estimates:
+            outputs['covariance_estimate' + suffix] = covariances[suffix]
+    return [{name: values[k] for name, values in outputs.items()}
+            for k in range(n_trials)]
+
+
+def montecarlo_trial(mean, covariance, chol, n_samples_list, seed,
+                     trial_no, profiler=NO_PROFILER, **kwargs):
+    """Single trial of the Monte-Carlo simulation.
+
+    Args:
+        mean (np.ndarray): Mean of the distribution
+        covariance (np.ndarray): Covariance of the distribution
+        chol (np.ndarray): Lower Cholesky factor of the covariance
+        n_samples_list (array-like): Numbers of samples to estimate with
+        seed (int): Seed of the simulation
+        trial_no (int): Number of the trial. The random generator of the
+            trial is seeded with seed + trial_no
+        profiler (StageProfiler, optional): Profiler timing the stages of
+            the trial. Defaults to NO_PROFILER.
+        **kwargs: Options of `montecarlo_chunk`
+
+    Returns:
+        dict: Errors on the covariance for each number of samples
+    """
+    return montecarlo_chunk(mean, covariance, chol, n_samples_list, seed,
+                            [trial_no], profiler, **kwargs)[0]
+
+
+def spectral_chunk(mean, covariance, chol, n_samples_list, seed,
+                   trial_numbers, profiler=NO_PROFILER, n_probes=32):
+    """Trials of a chunk of the large-dimension mode, run one after the
+    other.
+
+    The datasets are those of `montecarlo_chunk`, but the sample
+    covariances are never formed: the squared error, the extreme
+    eigenvalues and the fit of the Marchenko-Pastur law are computed from
+    the samples by Hutchinson estimates and Lanczos iterations, see
+    `spectral_statistics`, at a cost linear in the number of features for
+    a white covariance.
+
+    Args:
+        mean (np.ndarray): Mean of the distribution
+        covariance (np.ndarray): Covariance of the distribution
+        chol (np.ndarray): Lower Cholesky factor of the covariance
+        n_samples_list (array-like): Numbers of samples to estimate with
+        seed (int): Seed of the simulation
+        trial_numbers (list): Numbers of the trials. The samples of each
+            trial are drawn from a generator seeded with seed + trial_no,
+            the probes from a generator seeded with (seed, trial_no)
+        profiler (StageProfiler, optional): Profiler timing the stages of
+            the trials. Defaults to NO_PROFILER.
+        n_probes (int, optional): Number of probes of the Hutchinson
+            estimates, 0 for exact traces. Defaults to 32.
+
+    Returns:
+        list: Statistics of SPECTRAL_STATISTICS for each number of samples,
+            for each trial
+    """
+    identity = np.array_equal(covariance, np.eye(len(covariance)))
+    results = []
+    for trial_no in trial_numbers:
+        rng = np.random.default_rng(seed + trial_no)
+        probe_rng = np.random.default_rng([seed, trial_no])
+        outputs = {name: np.zeros(len(n_samples_list))
+                   for name in SPECTRAL_STATISTICS}
+        for i, n_samples in enumerate(n_samples_list):
+            # Whitened samples, the mean is known
+            with profiler.stage('sampling'):
+                white_samples = rng.standard_normal(
+                        (n_samples, len(mean)))
+            with profiler.stage('spectrum'):
+                statistics = spectral_statistics(white_samples, chol,
+                                                 probe_rng, n_probes,
+                                                 identity)
+            for name, value in statistics.items():
+                outputs[name][i] = value
+        results.append(outputs)
+    return results
 
-WRITE_PROGRESS_EVERY = 10
 
 if __name__ == "__main__":
 
@@ -35,11 +248,12 @@ if __name__ == "__main__":
             "parameters of a centered multivariate normal distribution.\n"
             "We use an MSE criterion to compare the theoretical values of "
             "the covariance to the estimated one.",
-            epilog="Example: python compute_montecarlo.py scenario1.py")
+            epilog="Example: python compute_montecarlo.py scenario1.yaml")
     parser.add_argument('config_file', type=str, help='Path to the config file'
                         ' containing the parameters of the simulation: '
                         'covariance, number of samples list, number of '
-                        'trials.')
+                        'trials. Either a YAML declaration or a python '
+                        'file.')
     parser.add_argument('--trials_range_start', type=int, default=None,
                         help='Range of the total number of trials to run in '
                         'this script. Start of the range.'
@@ -57,21 +271,155 @@ if __name__ == "__main__":
     parser.add_argument('--storage_path', type=str, default='./data/',
                         help='Path to the folder where the results of MSE '
                         'will be stored.')
+    parser.add_argument('--backend', type=str, default='loky',
+                        choices=BACKENDS,
+                        help='Backend running the chunks of trials: local '
+                        'processes (loky), threads, the main process '
+                        '(serial), or a dask or ray cluster (a local one '
+                        'unless DASK_SCHEDULER_ADDRESS or RAY_ADDRESS is '
+                        'set).')
+    parser.add_argument('--chunk_size', type=int, default=None,
+                        help='Number of trials run sequentially by a job. '
+                        'Defaults to one block of trials per thread with the '
+                        'threading backend and to 10 otherwise.')
+    parser.add_argument('--blas_threads', type=int, default=None,
+                        help='Number of BLAS threads of each job (of the '
+                        'whole process with the threading backend). '
+                        'Defaults to the BLAS default.')
+    parser.add_argument('--profile', action='store_true', default=False,
+                        help='Time the stages of the simulation and store '
+                        'them in profile.json in the storage folder.')
+    parser.add_argument('--cprofile', action='store_true', default=False,
+                        help='Run the first chunk of trials under cProfile '
+                        'and dump its profile in profile_chunk.prof in the '
+                        'storage folder.')
+    parser.add_argument('--adaptive', action='store_true', default=False,
+                        help='Run the trials by rounds and stop simulating '
+                        'the numbers of samples for which the confidence '
+                        'interval of the MSE is narrow enough. The number '
+                        'of trials of the config file (or the trials range) '
+                        'is then a maximum.')
+    parser.add_argument('--target_rel_ci', type=float, default=0.01,
+                        help='Adaptive mode: target half-width of the '
+                        'confidence interval relative to the MSE.')
+    parser.add_argument('--round_size', type=int, default=1000,
+                        help='Adaptive mode: number of trials per round.')
+    parser.add_argument('--min_trials', type=int, default=100,
+                        help='Adaptive mode: minimum number of trials per '
+                        'number of samples.')
+    parser.add_argument('--confidence', type=float, default=0.95,
+                        help='Adaptive mode: level of the confidence '
+                        'intervals.')
+    parser.add_argument('--antithetic', action='store_true', default=False,
+                        help='Estimate on pairs of antithetic datasets in '
+                        'each trial.')
+    parser.add_argument('--control_variates', action='store_true',
+                        default=False,
+                        help='Compute control-variate estimates of the MSE '
+                        'using the known moments of the sample covariance.')
+    parser.add_argument('--analytic', action='store_true', default=False,
+                        help='Do not run any trial and store the closed-form '
+                        'MSE of the empirical estimators.')
+    parser.add_argument('--n_shards', type=int, default=1,
+                        help='Split the trials into this number of shards '
+                        'run by --shard_backend, each storing its results '
+                        'in a shard_<k> subfolder, and merge them.')
+    parser.add_argument('--shard_backend', type=str, default='local',
+                        choices=list(SHARD_BACKENDS),
+                        help='Backend running the shards: local pool of '
+                        'processes, one after the other, or HTCondor submit '
+                        'file (the shards are then merged with --reduce).')
+    parser.add_argument('--shard_workers', type=int, default=None,
+                        help='Number of shards run simultaneously by the '
+                        'local backend. Defaults to the number of CPUs.')
+    parser.add_argument('--reduce', action='store_true', default=False,
+                        help='Only merge the results of the shards already '
+                        'run in the storage folder, planned with the same '
+                        '--n_shards and trials range.')
+    parser.add_argument('--save_trials', action='store_true', default=False,
+                        help='Store the statistics and the estimates of '
+                        'every trial in the storage folder.')
+    parser.add_argument('--trials_format', type=str, default='npz',
+                        choices=STORE_FORMATS,
+                        help='Format of the store of the trials: a '
+                        'compressed npz file per chunk, or a Zarr or HDF5 '
+                        'store.')
+    parser.add_argument('--metrics', type=str, nargs='+', default=[],
+                        choices=[name for name in METRICS
+                                 if name != 'frobenius'],
+                        help='Metrics evaluated on the covariance estimates '
+                        'in addition to the squared error, stored as '
+                        '<metric>_covariance.')
+    parser.add_argument('--estimators', type=str, nargs='+', default=[],
+                        choices=[name for name in ESTIMATORS
+                                 if name != 'empirical'],
+                        help='Estimators compared to the sample covariance '
+                        'on the same datasets, e.g. the Ledoit-Wolf, OAS '
+                        'and Rao-Blackwellized Ledoit-Wolf shrinkages. '
+                        'Their errors are suffixed by _<estimator>.')
+    parser.add_argument('--archive_n', type=int, nargs='+', default=None,
+                        help='Numbers of samples whose covariance estimates '
+                        'are archived (half-vectorized, in float32) to '
+                        'evaluate other metrics later.')
+    parser.add_argument('--spectral', action='store_true', default=False,
+                        help='Large-dimension mode: compute the squared '
+                        'error, the extreme eigenvalues and the fit of the '
+                        'Marchenko-Pastur law from the samples without '
+                        'forming the sample covariances. Enabled by the '
+                        'scenarios declaring spectral: true.')
+    parser.add_argument('--probes', type=int, default=32,
+                        help='Large-dimension mode: number of probes of the '
+                        'Hutchinson trace estimates, 0 for exact traces.')
+    parser.add_argument('--index', action='store_true', default=False,
+                        help='Add the run to the catalogue of the runs, '
+                        'results/run_index.db or the file given by the '
+                        'environment variable RUN_INDEX, which also enables '
+                        'it for every run.')
+    parser.add_argument('--cache_dir', type=str, default=RESULT_CACHE,
+                        help='Folder of the cache of the results of the '
+                        'trials shared by the runs. The trials already run '
+                        'by a simulation of the same scenario, seed, '
+                        'options and source code are read from it, and '
+                        'only the missing ones are run.')
+    parser.add_argument('--no_cache', action='store_true', default=False,
+                        help='Run every trial without reading nor writing '
+                        'the cache.')
     args = parser.parse_args()
+    if args.adaptive and (args.antithetic or args.control_variates or
+                          args.save_trials or args.archive_n is not None):
+        parser.error('--antithetic, --control_variates, --save_trials and '
+                     '--archive_n are not available in adaptive mode.')
+    if args.analytic and (args.n_shards > 1 or args.reduce or
+                          args.adaptive or args.save_trials or
+                          args.archive_n is not None or
+                          args.antithetic or args.control_variates or
+                          args.profile or args.cprofile):
+        parser.error('--analytic does not run any trial and cannot be '
+                     'combined with the options of the simulation.')
     seed = int(args.seed)
 
-    # Load the config file
-    if not os.path.isfile(args.config_file):
-        raise FileNotFoundError("The config file does not exist.")
+    # Load the config file: YAML declaration or python file
+    config = load_scenario(args.config_file)
 
-    sys.path.append(os.path.dirname(args.config_file))
-    config = importlib.import_module(Path(args.config_file).stem)
+    # Large-dimension mode, requested or declared by the scenario
+    spectral = args.spectral or \
+        bool((config.spec or {}).get('spectral', False))
+    if spectral and (args.adaptive or args.antithetic or
+                     args.control_variates or args.save_trials or
+                     args.archive_n is not None or len(args.metrics) > 0 or
+                     len(args.estimators) > 0):
+        parser.error('The large-dimension mode only computes its spectral '
+                     'statistics and cannot be combined with --adaptive, '
+                     '--antithetic, --control_variates, --save_trials, '
+                     '--archive_n, --metrics and --estimators.')
 
     # Extract the parameters
     covariance = config.covariance
     mean = np.zeros(covariance.shape[0])
     n_samples_list = config.n_samples_list
     n_trials = config.n_trials
+    # Cholesky factor cached with the other artifacts of the scenario
+    chol = config.artifacts()['chol']
     n_jobs = args.n_jobs
 
     # Check the trials range
@@ -94,80 +442,208 @@ if __name__ == "__main__":
     rich.print('[bold]Parameters of the simulation[/bold]')
     rich.print(f'[bold]Mean[/bold]: {mean}')
     rich.print('[bold]Covariance[/bold]:')
-    matprint(covariance)
+    if spectral:
+        rich.print(f'{covariance.shape[0]} x {covariance.shape[1]} matrix '
+                   '(large-dimension mode)')
+    else:
+        matprint(covariance)
     rich.print(f'[bold]Number of samples[/bold]: {n_samples_list}')
     rich.print(f'[bold]Number of trials[/bold]: {n_trials}')
     rich.print(f'[bold]Number of jobs[/bold]: {n_jobs}')
     rich.print(f'[bold]Trials range[/bold]: {trials_range}')
 
-    # Create a file: progress.txt to track the progress of the simulation
     if not os.path.isdir(args.storage_path):
         os.makedirs(args.storage_path)
-    progress_file = os.path.join(args.storage_path, 'progress.txt')
-    with open(progress_file, 'w') as f:
-        total_trials = trials_range[1] - trials_range[0] + 1
-        f.write(f'count_total={total_trials}\n')
-
-    # Function for the Monte-Carlo simulation
-    def montecarlo_simulation(mean, covariance,
-                              n_samples_list, seed,
-                              trial_no):
-        rng = np.random.default_rng(seed + trial_no)
+    # Copy of the scenario, read by show_config without git
+    snapshot_scenario(args.storage_path, args.config_file, config.digest)
+    total_trials = trials_range[1] - trials_range[0] + 1
 
-        mse_covariance = np.zeros(len(n_samples_list))
-        for i, n_samples in enumerate(n_samples_list):
-            # Generate the samples
-            samples = rng.multivariate_normal(mean, covariance, n_samples)
-            # Estimate the mean and covariance
-            empirical_covariance = EmpiricalCovariance(
-                    assume_centered=True).fit(samples)
-            # Compute the MSE
-            mse_covariance[i] = \
-                np.trace(
-                    np.dot(
-                        covariance - empirical_covariance.covariance_,
-                        (covariance - empirical_covariance.covariance_).T
-                    )
-                )
-        # Write to progress.txt regularly to track the progress
-        # of the simulation
-        if (trial_no - trials_range[0] + 1) % WRITE_PROGRESS_EVERY == 0:
-            with open(progress_file, 'a') as f:
-                f.write(f'{WRITE_PROGRESS_EVERY}\n')
-
-        return mse_covariance
-
-    # Run the Monte-Carlo simulation
-    results_jobs = Parallel(n_jobs=n_jobs)(
-        delayed(montecarlo_simulation)(mean, covariance, n_samples_list,
-                                       seed, trial_no)
-        for trial_no in tqdm(
-            range(trials_range[0], trials_range[1] + 1))
-        )
-
-    # Write final progress.txt
-    with open(progress_file, 'a') as f:
-        f.write('finished')
-
-    # Compute the mean and std of the MSE for location and
-    # covariance
-    mse_covariance = np.zeros((total_trials, len(n_samples_list)))
-    for trial_no in range(0, trials_range[1] - trials_range[0] + 1):
-        mse_covariance[trial_no, :] = results_jobs[trial_no]
-    mse_covariance_mean = np.mean(mse_covariance, axis=0)
-
-    std_covariance = np.std(mse_covariance, axis=0)
+    # Sharded simulation: this process only runs and merges the shards
+    if args.n_shards > 1 or args.reduce:
+        results = run_sharded(
+                __file__, sys.argv[1:], trials_range, args.storage_path,
+                args.n_shards, args.shard_backend, args.shard_workers,
+                args.reduce)
+        # None when the shards are submitted and not completed yet
+        if results is not None and (args.index or AUTO_INDEX):
+            index_results(args.storage_path, results, EXPERIMENT)
+        sys.exit(0)
+
+    # Closed-form MSE of the empirical estimator
+    expected = {'mse_covariance': expected_mse_covariance(
+        covariance, n_samples_list, assume_centered=True)}
+    if spectral:
+        # Limits of the spectral statistics given by Marchenko-Pastur
+        expected.update(expected_spectral_statistics(covariance.shape[0],
+                                                     n_samples_list))
+
+    if args.analytic:
+        rich.print('[bold]Analytic mode: no trial is run[/bold]')
+        # Still mark the run as finished for Qanat
+        with ProgressMonitor(args.storage_path, 0, shared=False):
+            pass
+        summary = {'n_trials_per_n': np.zeros(len(n_samples_list),
+                                              dtype=int)}
+        for name, values in expected.items():
+            summary[f'{name}_mean'] = values
+            summary[f'{name}_std'] = np.full(len(n_samples_list), np.nan)
+    else:
+        # Run the Monte-Carlo simulation
+        if args.cprofile:
+            cprofile_path = os.path.join(args.storage_path,
+                                         'profile_chunk.prof')
+        else:
+            cprofile_path = None
+
+        # The trials are written while the simulation goes on
+        sinks = []
+        if args.save_trials:
+            trial_writer = TrialWriter(args.storage_path, args.trials_format)
+            sinks.append(trial_writer)
+        else:
+            trial_writer = nullcontext()
+        if args.archive_n is not None:
+            archive = EstimateArchive(args.storage_path, trials_range,
+                                      n_samples_list, args.archive_n,
+                                      covariance.shape[0])
+            sinks.append(archive)
+
+        # Trials already run by an identical simulation are read from the
+        # cache, except when every trial is stored or in adaptive mode
+        cache = None
+        if not (args.no_cache or args.adaptive or len(sinks) > 0):
+            cache = ResultCache(result_fingerprint(
+                {'script': os.path.basename(__file__),
+                 'distribution': array_digest(mean, covariance,
+                                              n_samples_list),
+                 'seed': seed,
+                 'antithetic': args.antithetic,
+                 'control_variates': args.control_variates,
+                 'metrics': sorted(args.metrics),
+                 'estimators': sorted(args.estimators),
+                 'probes': args.probes if spectral else None},
+                loaded_sources(__file__)), args.cache_dir)
+            cached, missing = cache.plan(trials_range)
+            total_trials = sum(last - first + 1 for first, last in missing)
+            rich.print(f'[bold]Trials in the cache[/bold]: '
+                       f'{sum(last - first + 1 for first, last, _ in cached)}'
+                       f', to run: {total_trials}')
+
+        # The progress of the simulation is tracked in progress.txt
+        # and progress.json by a single writer
+        with ProgressMonitor(args.storage_path, total_trials,
+                             shared=args.backend == 'loky' and
+                             n_jobs != 1) as progress, \
+                execution_backend(args.backend, n_jobs, [covariance, chol]), \
+                trial_writer:
+            options = {'n_jobs': n_jobs,
+                       'chunk_size': args.chunk_size,
+                       'progress_queue': progress.queue,
+                       'profile': args.profile,
+                       'cprofile_path': cprofile_path,
+                       'backend': args.backend,
+                       'blas_threads': args.blas_threads,
+                       'batched': True}
+            if len(sinks) > 0:
+                options['on_chunk'] = chunk_handler(sinks, ESTIMATES)
+            if spectral:
+                trial_function = partial(spectral_chunk,
+                                         n_probes=args.probes)
+            else:
+                trial_function = partial(
+                        montecarlo_chunk,
+                        antithetic=args.antithetic,
+                        control_variates=args.control_variates,
+                        estimates=len(sinks) > 0,
+                        metrics=tuple(args.metrics),
+                        reference=ReferenceCovariance(covariance),
+                        estimators=tuple(args.estimators))
+            if args.adaptive:
+                moments, profile_stats = run_adaptive_montecarlo(
+                    trial_function,
+                    lambda n_samples: (mean, covariance, chol, n_samples,
+                                       seed),
+                    n_samples_list, trials_range, args.target_rel_ci,
+                    args.round_size, args.min_trials, args.confidence,
+                    **options)
+            else:
+                trials, profile_stats, n_cached = run_cached(
+                    lambda missing_range: run_montecarlo(
+                        trial_function,
+                        (mean, covariance, chol, n_samples_list, seed),
+                        missing_range, **options),
+                    trials_range, cache)
+
+        if args.archive_n is not None:
+            archive.close()
+
+        # Mergeable state of the statistics of the trials
+        expectations = None
+        if args.adaptive:
+            state = state_from_moments(moments)
+        else:
+            if args.control_variates:
+                expectations = control_expectations(
+                    covariance, n_samples_list, assume_centered=True)
+                controls = list(expectations)
+            else:
+                controls = None
+            if spectral:
+                names = SPECTRAL_STATISTICS
+            else:
+                keys = [''] + [f'_{name}' for name in args.estimators]
+                names = [f'{name}_covariance{key}' for key in keys
+                         for name in ['mse', *args.metrics]]
+            state = accumulate_trials(trials, names,
+                                      controls, args.antithetic)
+        summary = summarize_state(state, expectations)
 
     # Save the results
-    results = {'mse_covariance_mean': mse_covariance_mean,
-               'mse_covariance_std': std_covariance,
+    results = {**summary,
+               **{f'{name}_expected': values
+                  for name, values in expected.items()},
                'trials_range': trials_range,
                'n_trials': n_trials,
                'n_samples_list': n_samples_list,
                'mean': mean,
                'covariance': covariance,
+               'scenario_digest': config.digest,
                'seed': seed}
+    if args.adaptive:
+        results['adaptive'] = {'target_rel_ci': args.target_rel_ci,
+                               'round_size': args.round_size,
+                               'min_trials': args.min_trials,
+                               'confidence': args.confidence}
+    results['antithetic'] = args.antithetic
+    results['control_variates'] = args.control_variates
+    results['analytic'] = args.analytic
+    results['spectral'] = spectral
+    if spectral:
+        results['probes'] = args.probes
+    if args.save_trials:
+        results['trials_store'] = os.path.basename(trial_writer.path)
+    results['archive_n'] = args.archive_n
+    results['metrics'] = args.metrics
+    results['estimators'] = args.estimators
+    if not args.analytic:
+        results['state'] = state
+        if cache is not None:
+            results['result_fingerprint'] = cache.fingerprint
+            results['cached_trials'] = n_cached
+        results['expectations'] = expectations
 
     results_file = os.path.join(args.storage_path, 'results.pkl')
     with open(results_file, 'wb') as f:
         pickle.dump(results, f)
+    # Catalogue of the runs, queried without loading their results
+    if args.index or AUTO_INDEX:
+        index_results(args.storage_path, results, EXPERIMENT)
+
+    if args.profile:
+        save_profile(os.path.join(args.storage_path, 'profile.json'),
+                     profile_stats, n_jobs=n_jobs,
+                     chunk_size=args.chunk_size,
+                     backend=args.backend,
+                     blas_threads=args.blas_threads,
+                     trials_range=trials_range,
+                     n_samples_list=[int(n) for n in n_samples_list])
@@ -10,42 +10,59 @@
 
 import argparse
 import os
-import numpy as np
-import pickle
 import matplotlib.pyplot as plt
 import seaborn as sns
 import tikzplotlib
 import rich
 import sys
-from tqdm import tqdm
+from functools import partial
 file_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(os.path.join(file_dir, '../..'))
 from src.utils import (
         tikzplotlib_fix_ncols
 )
-from src.cramer_rao import (
-        crb_centered_multivariate_gaussian_basis,
+from src.expected_mse import expected_mse_covariance
+from src.results import (
+        find_group_folders,
+        load_results,
+        aggregate_results
 )
+from src.plotting import configure_matplotlib, render_folders
+from src.result_cache import loaded_sources
+from src.scenarios import load_artifacts
 
-sns.set_style('darkgrid')
 
-# Activate LaTeX text rendering
-# if available on your system
-plt.rc('text', usetex=True)
-plt.rc('font', family='serif')
+def setup_style():
+    sns.set_style('darkgrid')
+
+    # Activate LaTeX text rendering
+    # if available on your system
+    plt.rc('text', usetex=True)
+    plt.rc('font', family='serif')
+
+
+setup_style()
 
 
 def generate_figure(mse_covariance_mean,
                     mse_covariance_std,
                     crb,
+                    mse_covariance_expected,
                     n_samples_list,
                     folder,
-                    save=False):
+                    save=False,
+                    mse_shrinkage_mean=None):
 
     fig_cov, ax_cov = plt.subplots(1, 1, figsize=(6, 4))
     ax_cov.plot(n_samples_list, mse_covariance_mean, label='Covariance',
                 marker='o', markersize=5, linestyle='')
 
+    # Plot the MSE of the shrinkage estimators run on the same datasets
+    if mse_shrinkage_mean is not None:
+        for name, values in mse_shrinkage_mean.items():
+            ax_cov.plot(n_samples_list, values, label=name,
+                        marker='s', markersize=4, linestyle='-')
+
     # Fill between the standard deviation
     ax_cov.fill_between(n_samples_list,
                         mse_covariance_mean - mse_covariance_std,
@@ -53,6 +70,11 @@ def generate_figure(mse_covariance_mean,
                         color='b', alpha=0.2,
                         label='Standard deviation')
 
+    # Plot the exact MSE of the sample covariance
+    ax_cov.plot(n_samples_list, mse_covariance_expected,
+                label='Expected MSE (sample covariance)',
+                marker='', c='r', linestyle='--')
+
     # Plot the lower bound
     ax_cov.plot(n_samples_list, crb, label='Lower bound',
                 marker='', c='k', linestyle='-')
@@ -73,6 +95,28 @@ def generate_figure(mse_covariance_mean,
         print('Saved covariance plot in {}'.format(folder))
 
 
+def plot_folder(folder, save=False):
+    # Load results
+    results = load_results(folder)
+
+    # Lower bound, computed once per scenario
+    n_samples_list = results['n_samples_list']
+    crb = load_artifacts(results['covariance'], n_samples_list,
+                         crb=True)['crb']
+
+    # Plotting
+    generate_figure(results['mse_covariance_mean'],
+                    results['mse_covariance_std'],
+                    crb,
+                    expected_mse_covariance(results['covariance'],
+                                            n_samples_list),
+                    results['n_samples_list'],
+                    folder,
+                    save,
+                    {name: results[f'mse_covariance_{name}_mean']
+                     for name in results.get('estimators', [])})
+
+
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser()
@@ -84,95 +128,74 @@ if __name__ == "__main__":
                         help='Aggregate results from different folders')
     parser.add_argument('--save', action='store_true', default=False,
                         help='Save the plot as pdf and LaTeX code')
+    parser.add_argument('--batch', action='store_true', default=False,
+                        help='Render the figures of the groups without '
+                        'display and in parallel, saving them (implies '
+                        '--save). Groups whose results did not change '
+                        'since their last rendering are skipped.')
+    parser.add_argument('--n_jobs', type=int, default=1,
+                        help='Number of processes rendering the groups in '
+                        'batch mode.')
+    parser.add_argument('--force', action='store_true', default=False,
+                        help='Render again every group in batch mode.')
     args = parser.parse_args()
 
     rich.print(
             '[bold green]Plotting MSE as a function of the number of samples')
     rich.print('[bold green]Folder: {}'.format(args.storage_path))
-    rich.print('[bold red]Sorry, the lower-bound is very slow to compute.'
-               'for larger size of the covariance matrix.')
+    rich.print('[bold red]Sorry, the lower-bound is very slow to compute '
+               'for larger size of the covariance matrix. It is computed '
+               'once per scenario and cached.')
 
     # Check if subfolders with name "group_" exist
     # Which means that several parameters have been
     # estimated and stored in different folders
-    if os.path.isdir(os.path.join(args.storage_path, 'group_0')):
-        folders = [os.path.join(args.storage_path, f) for f in
-                   os.listdir(args.storage_path) if 'group_' in f
-                   and os.path.isdir(os.path.join(args.storage_path, f))]
-    else:
-        folders = [args.storage_path]
+    folders = find_group_folders(args.storage_path)
+
+    if args.batch:
+        configure_matplotlib(batch=True)
+        args.save = True
 
     # We aggregate the restults from all the folders if wanted
     if args.aggregate:
-        mse_covariance_mean = []
-        mse_covariance_std = []
-        trials_per_group = []
-        for folder in folders:
-
-            # Load results
-            with open(os.path.join(folder, 'results.pkl'), 'rb') as f:
-                results = pickle.load(f)
-
-            # Aggregate results
-            mse_covariance_mean.append(results['mse_covariance_mean'])
-            mse_covariance_std.append(results['mse_covariance_std'])
-            trials_range = results['trials_range']
-            trials_per_group.append(trials_range[1] - trials_range[0] + 1)
-            n_samples_list = results['n_samples_list']
-
-        # Compute the weighted average
-        mse_covariance_mean = np.array(mse_covariance_mean)
-        mse_covariance_mean = np.average(mse_covariance_mean, axis=0,
-                                         weights=trials_per_group)
-
-        # Compute the weighted standard deviation
-        # TODO: VERIFY THIS FORMULA!!!!!!!
-        mse_covariance_std = np.array(mse_covariance_std)
-        mse_covariance_std = np.sqrt(np.average(
-            (mse_covariance_std**2 + mse_covariance_mean**2), axis=0,
-            weights=trials_per_group) - mse_covariance_mean**2)
-
-        # Compute the lower bound
-        crb = np.zeros((len(n_samples_list),))
-        print("Computing CRB")
-        for i, n_samples in enumerate(tqdm(n_samples_list)):
-            crb[i] = np.sqrt(np.trace(
-                    crb_centered_multivariate_gaussian_basis(
-                        results['covariance'], n_samples)
-                        )
-                    )
+        results = aggregate_results(
+                [load_results(folder) for folder in folders],
+                ['mse_covariance'])
+        n_samples_list = results['n_samples_list']
+        mse_covariance_mean = results['mse_covariance_mean']
+        mse_covariance_std = results['mse_covariance_std']
+
+        # Lower bound, computed once per scenario, on the squared error as
+        # the MSE curves
+        crb = load_artifacts(results['covariance'], n_samples_list,
+                             crb=True)['crb']
 
         # Plotting
         generate_figure(mse_covariance_mean,
                         mse_covariance_std,
                         crb,
+                        expected_mse_covariance(results['covariance'],
+                                                n_samples_list),
                         n_samples_list,
                         args.storage_path,
                         args.save)
 
+    elif args.batch:
+        # Render the groups whose results changed in parallel
+        rendered = render_folders(
+                partial(plot_folder, save=True), folders,
+                lambda folder: [os.path.join(folder, 'results.pkl'),
+                                *loaded_sources(__file__)],
+                lambda folder: [os.path.join(folder, 'MSE_covariance.pdf'),
+                                os.path.join(folder, 'MSE_covariance.tex')],
+                'plot', args.n_jobs, args.force, setup=setup_style)
+        rich.print(f'[bold green]Rendered {len(rendered)}/{len(folders)} '
+                   'groups')
+
     else:
         # We plot the results from each folder
         for folder in folders:
-            # Load results
-            with open(os.path.join(folder, 'results.pkl'), 'rb') as f:
-                results = pickle.load(f)
-
-            # Compute the lower bound
-            n_samples_list = results['n_samples_list']
-            crb = np.zeros((len(n_samples_list),))
-            print("Computing CRB")
-            for i, n_samples in enumerate(tqdm(n_samples_list)):
-                crb[i] = np.trace(
-                            crb_centered_multivariate_gaussian_basis(
-                                results['covariance'], n_samples)
-                        )
-
-            # Plotting
-            generate_figure(results['mse_covariance_mean'],
-                            results['mse_covariance_std'],
-                            crb,
-                            results['n_samples_list'],
-                            folder,
-                            args.save)
-
-    plt.show()
+            plot_folder(folder, args.save)
+
+    if not args.batch:
+        plt.show()
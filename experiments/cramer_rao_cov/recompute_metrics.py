@@ -0,0 +1,68 @@
+# ========================================
+# FileName: recompute_metrics.py
+# Date: 19 oct. 2026 - 16:20
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Evaluate error metrics on the
+# archived covariance estimates of a run
+# =========================================
+
+import argparse
+import os
+import pickle
+import numpy as np
+import rich
+import sys
+import pandas as pd
+file_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(file_dir, '../..'))
+from src.metrics import METRICS
+from src.estimate_archive import recompute_metrics
+from src.results import (
+        find_group_folders,
+        load_results
+)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+            description='Evaluate error metrics on the covariance estimates '
+            'archived with --archive_n, without running the trials again.')
+    parser.add_argument('--storage_path', type=str,
+                        default='data/',
+                        help='Path to the data folder where '
+                        'results.pkl is located.')
+    parser.add_argument('--metrics', type=str, nargs='+',
+                        default=list(METRICS), choices=list(METRICS),
+                        help='Metrics to evaluate.')
+    parser.add_argument('--batch_size', type=int, default=1024,
+                        help='Number of trials evaluated at once.')
+    args = parser.parse_args()
+
+    rich.print('[bold green]Folder: {}'.format(args.storage_path))
+
+    # Check if subfolders with name "group_" exist
+    # Which means that several parameters have been
+    # estimated and stored in different folders
+    for folder in find_group_folders(args.storage_path):
+        results = load_results(folder)
+        values, n_samples = recompute_metrics(
+                folder, results['covariance'], args.metrics,
+                args.batch_size)
+
+        # Save the values of the trials and their statistics
+        metrics = {'n_samples': n_samples, 'trials': values}
+        df = pd.DataFrame({'n_samples': n_samples})
+        for name, name_values in values.items():
+            metrics[f'{name}_mean'] = np.mean(name_values, axis=0)
+            metrics[f'{name}_std'] = np.std(name_values, axis=0)
+            df[f'{name}_mean'] = metrics[f'{name}_mean']
+            df[f'{name}_std'] = metrics[f'{name}_std']
+        with open(os.path.join(folder, 'metrics.pkl'), 'wb') as f:
+            pickle.dump(metrics, f)
+        df.to_csv(os.path.join(folder, 'METRICS.csv'), index=False)
+
+        rich.print(f'[bold]{folder}[/bold]: {len(name_values)} trials')
+        rich.print(df)
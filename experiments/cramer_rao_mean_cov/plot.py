@@ -10,35 +10,55 @@
 
 import argparse
 import os
-import numpy as np
-import pickle
 import matplotlib.pyplot as plt
 import seaborn as sns
 import tikzplotlib
 import rich
 import sys
+from functools import partial
 file_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(os.path.join(file_dir, '../..'))
 from src.utils import (
         tikzplotlib_fix_ncols)
+from src.expected_mse import expected_mse_mean, expected_mse_covariance
+from src.results import (
+        find_group_folders,
+        load_results,
+        aggregate_results
+)
+from src.plotting import configure_matplotlib, render_folders
+from src.result_cache import loaded_sources
 
 
-sns.set_style('darkgrid')
+def setup_style():
+    sns.set_style('darkgrid')
 
-# Activate LaTeX text rendering
-# if available on your system
-plt.rc('text', usetex=True)
-plt.rc('font', family='serif')
+    # Activate LaTeX text rendering
+    # if available on your system
+    plt.rc('text', usetex=True)
+    plt.rc('font', family='serif')
+
+
+setup_style()
 
 
 def generate_figure(mse_location_mean,
                     mse_location_std,
                     mse_covariance_mean,
                     mse_covariance_std,
+                    covariance,
                     n_samples_list,
                     folder,
                     save=False):
 
+    # Exact MSE of the empirical estimators, normalized by the number of
+    # entries as in the simulation
+    n_features = covariance.shape[0]
+    mse_location_expected = expected_mse_mean(
+            covariance, n_samples_list) / n_features
+    mse_covariance_expected = expected_mse_covariance(
+            covariance, n_samples_list, assume_centered=False) / n_features**2
+
     # Figure with location
     fig_location, ax_location = plt.subplots(1, 1, figsize=(6, 4))
     ax_location.plot(n_samples_list, mse_location_mean, label='Location',
@@ -50,6 +70,9 @@ def generate_figure(mse_location_mean,
                              mse_location_mean + mse_location_std,
                              color='b', alpha=0.2,
                              label='Standard deviation')
+    ax_location.plot(n_samples_list, mse_location_expected,
+                     label='Expected MSE (sample mean)',
+                     marker='', c='r', linestyle='--')
 
     ax_location.set_xlabel('Number of samples')
     ax_location.set_ylabel('MSE')
@@ -77,6 +100,9 @@ def generate_figure(mse_location_mean,
                         mse_covariance_mean + mse_covariance_std,
                         color='b', alpha=0.2,
                         label='Standard deviation')
+    ax_cov.plot(n_samples_list, mse_covariance_expected,
+                label='Expected MSE (sample covariance)',
+                marker='', c='r', linestyle='--')
 
     ax_cov.set_xlabel('Number of samples')
     ax_cov.set_ylabel('MSE')
@@ -94,6 +120,21 @@ def generate_figure(mse_location_mean,
         print('Saved covariance plot in {}'.format(folder))
 
 
+def plot_folder(folder, save=False):
+    # Load results
+    results = load_results(folder)
+
+    # Plotting
+    generate_figure(results['mse_location_mean'],
+                    results['mse_location_std'],
+                    results['mse_covariance_mean'],
+                    results['mse_covariance_std'],
+                    results['covariance'],
+                    results['n_samples_list'],
+                    folder,
+                    save)
+
+
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser()
@@ -105,6 +146,16 @@ if __name__ == "__main__":
                         help='Aggregate results from different folders')
     parser.add_argument('--save', action='store_true', default=False,
                         help='Save the plot as pdf and LaTeX code')
+    parser.add_argument('--batch', action='store_true', default=False,
+                        help='Render the figures of the groups without '
+                        'display and in parallel, saving them (implies '
+                        '--save). Groups whose results did not change '
+                        'since their last rendering are skipped.')
+    parser.add_argument('--n_jobs', type=int, default=1,
+                        help='Number of processes rendering the groups in '
+                        'batch mode.')
+    parser.add_argument('--force', action='store_true', default=False,
+                        help='Render again every group in batch mode.')
     args = parser.parse_args()
 
     rich.print(
@@ -115,77 +166,50 @@ if __name__ == "__main__":
     # Check if subfolders with name "group_" exist
     # Which means that several parameters have been
     # estimated and stored in different folders
-    if os.path.isdir(os.path.join(args.storage_path, 'group_0')):
-        folders = [os.path.join(args.storage_path, f) for f in
-                   os.listdir(args.storage_path) if 'group_' in f
-                   and os.path.isdir(os.path.join(args.storage_path, f))]
-    else:
-        folders = [args.storage_path]
+    folders = find_group_folders(args.storage_path)
+
+    if args.batch:
+        configure_matplotlib(batch=True)
+        args.save = True
 
     # We aggregate the restults from all the folders if wanted
     if args.aggregate:
-        mse_location_mean = []
-        mse_covariance_mean = []
-        mse_location_std = []
-        mse_covariance_std = []
-        trials_per_group = []
-        for folder in folders:
-
-            # Load results
-            with open(os.path.join(folder, 'results.pkl'), 'rb') as f:
-                results = pickle.load(f)
-
-            # Aggregate results
-            mse_location_mean.append(results['mse_location_mean'])
-            mse_covariance_mean.append(results['mse_covariance_mean'])
-            mse_location_std.append(results['mse_location_std'])
-            mse_covariance_std.append(results['mse_covariance_std'])
-            trials_range = results['trials_range']
-            trials_per_group.append(trials_range[1] - trials_range[0] + 1)
-            n_samples_list = results['n_samples_list']
-
-        # Compute the weighted average
-        mse_location_mean = np.array(mse_location_mean)
-        mse_covariance_mean = np.array(mse_covariance_mean)
-        mse_location_mean = np.average(mse_location_mean, axis=0,
-                                       weights=trials_per_group)
-        mse_covariance_mean = np.average(mse_covariance_mean, axis=0,
-                                         weights=trials_per_group)
-
-        # Compute the weighted standard deviation
-        # TODO: VERIFY THIS FORMULA!!!!!!!
-        mse_location_std = np.array(mse_location_std)
-        mse_covariance_std = np.array(mse_covariance_std)
-        mse_location_std = np.sqrt(np.average(
-            (mse_location_std**2 + mse_location_mean**2), axis=0,
-            weights=trials_per_group) - mse_location_mean**2)
-        mse_covariance_std = np.sqrt(np.average(
-            (mse_covariance_std**2 + mse_covariance_mean**2), axis=0,
-            weights=trials_per_group) - mse_covariance_mean**2)
+        results = aggregate_results(
+                [load_results(folder) for folder in folders],
+                ['mse_location', 'mse_covariance'])
+        n_samples_list = results['n_samples_list']
+        mse_location_mean = results['mse_location_mean']
+        mse_location_std = results['mse_location_std']
+        mse_covariance_mean = results['mse_covariance_mean']
+        mse_covariance_std = results['mse_covariance_std']
 
         # Plotting
         generate_figure(mse_location_mean,
                         mse_location_std,
                         mse_covariance_mean,
                         mse_covariance_std,
+                        results['covariance'],
                         n_samples_list,
                         args.storage_path,
                         args.save)
 
+    elif args.batch:
+        # Render the groups whose results changed in parallel
+        rendered = render_folders(
+                partial(plot_folder, save=True), folders,
+                lambda folder: [os.path.join(folder, 'results.pkl'),
+                                *loaded_sources(__file__)],
+                lambda folder: [os.path.join(folder, f'MSE_{name}.{ext}')
+                                for name in ['location', 'covariance']
+                                for ext in ['pdf', 'tex']],
+                'plot', args.n_jobs, args.force, setup=setup_style)
+        rich.print(f'[bold green]Rendered {len(rendered)}/{len(folders)} '
+                   'groups')
+
     else:
         # We plot the results from each folder
         for folder in folders:
-            # Load results
-            with open(os.path.join(folder, 'results.pkl'), 'rb') as f:
-                results = pickle.load(f)
-
-            # Plotting
-            generate_figure(results['mse_location_mean'],
-                            results['mse_location_std'],
-                            results['mse_covariance_mean'],
-                            results['mse_covariance_std'],
-                            results['n_samples_list'],
-                            folder,
-                            args.save)
-
-    plt.show()
+            plot_folder(folder, args.save)
+
+    if not args.batch:
+        plt.show()
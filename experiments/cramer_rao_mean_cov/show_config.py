@@ -10,59 +10,32 @@
 # =========================================
 
 import os
-import git
+import sys
 import argparse
-import yaml
 import rich
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+from src.provenance import scenario_configs
 
 
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(
             description='Show config file used for a run')
-    parser.add_argument('--storage_path',
-                        type=str, help='Path to the storage folder')
+    parser.add_argument('--storage_path', type=str, nargs='+',
+                        help='Path to the storage folder. Several folders '
+                        'of runs or of groups can be given, and the runs '
+                        'with several groups are shown for all of them.')
     args = parser.parse_args()
 
-    # Check if the storage_path is named group_*
-    if os.path.basename(args.storage_path).startswith('group_'):
-        info_file_path = os.path.join(args.storage_path, '../info.yaml')
-        group_id = int(os.path.basename(args.storage_path).split('_')[1])
-    else:
-        info_file_path = os.path.join(args.storage_path, 'info.yaml')
-        group_id = 0
-
-        # Check that there aren't multiple groups
-        for f in os.listdir(args.storage_path):
-            if f.startswith('group_'):
-                raise ValueError('Multiple groups in the storage folder:'
-                                 'please specify the group no')
-
-    # Load info file
-    with open(info_file_path, 'r') as info_file:
-        info = yaml.safe_load(info_file)
-    commit_sha = info['commit_sha']
-
-    # Get the config file path from the commands
-    command = info['commands'][group_id]
-
-    # Look for the config file: only thing in the
-    # command that ends with .py besides execute
-    # script.
-    config_file_path = None
-    for c in command[2:]:
-        if c.endswith('.py'):
-            config_file_path = c
-            break
-
-    if config_file_path is None:
-        raise ValueError('Sorry no config file found in the commands...')
-
-    rich.print('Config file path: {}'.format(config_file_path))
-    rich.print('Commit sha: {}'.format(commit_sha))
-
-    # Get the config file at the time of the commit
-    repo = git.Repo(os.getcwd())
-    config = repo.git.show('{}:{}'.format(commit_sha, config_file_path))
-    rich.print('Config file content:')
-    rich.print(config)
+    # Snapshots taken at compute time, and the config files of older runs
+    # read from git at the commit of the run in a single batch
+    for config in scenario_configs(args.storage_path, os.getcwd()):
+        rich.print('[bold]Folder: {}'.format(config['storage_path']))
+        if config['content'] is None:
+            rich.print('[bold red]Sorry no config file found for this '
+                       'run...')
+            continue
+        rich.print('Config file path: {}'.format(config['path']))
+        rich.print('Commit sha: {}'.format(config['commit_sha']))
+        rich.print('Config file content ({}):'.format(config['source']))
+        rich.print(config['content'])
@@ -9,8 +9,8 @@
 # =========================================
 
 import argparse
-import yaml
 import os
+from functools import partial
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.patches import Ellipse
@@ -19,15 +19,160 @@ import tikzplotlib
 import sys
 file_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(os.path.join(file_dir, '../..'))
-from src.utils import (
-        format_covariance_latex,
-        tikzplotlib_fix_ncols)
-
-
-# Activate LaTeX text rendering
-# if available on your system
-plt.rc('text', usetex=True)
-plt.rc('font', family='serif')
+from src.utils import tikzplotlib_fix_ncols
+from src.sample_store import (
+        SAMPLES_FILE,
+        PARAMETERS_FILE,
+        LEGACY_SAMPLES_FILE,
+        LEGACY_PARAMETERS_FILE,
+        load_samples
+)
+from src.plotting import (
+        configure_matplotlib,
+        format_covariance,
+        render_folders
+)
+from src.result_cache import loaded_sources
+from src.results import find_group_folders
+from src.sample_summary import (
+        SUMMARY_FILE,
+        default_bounds,
+        load_summary,
+        summarize_samples
+)
+
+
+def setup_style():
+    # Activate LaTeX text rendering
+    # if available on your system
+    plt.rc('text', usetex=True)
+    plt.rc('font', family='serif')
+
+
+setup_style()
+
+
+DENSITIES = ['histogram', 'hexbin', 'rasterized']
+
+
+def draw_samples(ax, samples, summary, density, max_points):
+    # Small samples are all drawn
+    if len(samples) <= max_points:
+        ax.scatter(samples[:, 0], samples[:, 1], s=10, c='pink', alpha=0.5,
+                   label='Samples')
+        return
+    edges_x, edges_y = summary.edges
+    if density == 'histogram':
+        # Histogram as a background image, with a uniform subsample
+        histogram = np.ma.masked_equal(summary.histogram.T, 0)
+        ax.imshow(histogram, origin='lower', aspect='auto',
+                  interpolation='nearest', cmap='RdPu',
+                  extent=(edges_x[0], edges_x[-1], edges_y[0], edges_y[-1]))
+        ax.scatter(summary.subsample[:, 0], summary.subsample[:, 1], s=2,
+                   c='k', alpha=0.3, label='Samples (subsample)')
+    elif density == 'hexbin':
+        # Hexagonal bins filled from the counts of the histogram
+        centers_x = (edges_x[:-1] + edges_x[1:]) / 2
+        centers_y = (edges_y[:-1] + edges_y[1:]) / 2
+        grid_x, grid_y = np.meshgrid(centers_x, centers_y, indexing='ij')
+        ax.hexbin(grid_x.ravel(), grid_y.ravel(),
+                  C=summary.histogram.ravel(), reduce_C_function=np.sum,
+                  gridsize=len(centers_x) // 4, mincnt=1, cmap='RdPu',
+                  rasterized=True)
+    else:
+        ax.scatter(samples[:, 0], samples[:, 1], s=1, c='pink', alpha=0.5,
+                   label='Samples', rasterized=True)
+
+
+def generate_figure(samples, summary, parameters, density, max_points):
+    mean = parameters['mean']
+    cov = parameters['cov']
+
+    # Mean and covariance matrix estimated in the streaming pass
+    mean_est = summary.mean
+    cov_est = summary.covariance
+    # Compute eigenvalues and eigenvectors
+    eig_val_est, eig_vec_est = np.linalg.eig(cov_est)
+    # Compute angle of rotation
+    angle_est = np.arctan2(
+            eig_vec_est[1, 0],
+            eig_vec_est[0, 0]) * 180 / np.pi
+
+    # Compute eigenvalues and eigenvectors for the true covariance matrix
+    eig_val, eig_vec = np.linalg.eig(cov)
+    # Compute angle of rotation
+    angle = np.arctan2(eig_vec[1, 0], eig_vec[0, 0]) * 180 / np.pi
+
+    # Plotting
+    fig, ax = plt.subplots(1, 1, figsize=(8, 7))
+    draw_samples(ax, samples, summary, density, max_points)
+    ax.scatter(mean[0], mean[1], s=100, c='r', marker='x',
+               label='True mean')
+    ax.scatter(mean_est[0], mean_est[1], s=100, c='b', marker='x',
+               label='Estimated mean')
+
+    # Plot covariance matrix ellipsoid
+    ell = Ellipse(xy=(mean[0], mean[1]),
+                  width=2 * np.sqrt(eig_val[0]),
+                  height=2 * np.sqrt(eig_val[1]),
+                  angle=angle,
+                  color='r',
+                  label='True covariance matrix')
+    ell.set_facecolor('none')
+    ax.add_artist(ell)
+
+    # Plot estimated covariance matrix ellipsoid
+    ell_est = Ellipse(xy=(mean_est[0], mean_est[1]),
+                      width=2 * np.sqrt(eig_val_est[0]),
+                      height=2 * np.sqrt(eig_val_est[1]),
+                      angle=angle_est,
+                      color='b',
+                      label='Estimated covariance matrix')
+    ell_est.set_facecolor('none')
+    ax.add_artist(ell_est)
+
+    ax.legend()
+    ax.set_xlabel(r'$x_1$')
+    ax.set_ylabel(r'$x_2$')
+    title = r'$\mu = [{:.2f}, {:.2f}]$'.format(mean[0], mean[1]) + ', '
+    # LaTeX array with usetex, plain rows with mathtext
+    title += r'$\Sigma = {}$'.format(format_covariance(cov)) + '\n'
+    title += r'Number of samples: {}'.format(parameters['n_samples']) + '\n'
+    title += r'Seed: {}'.format(parameters['seed'])
+    ax.set_title(title, ha='left', fontsize=12, loc='left')
+    return fig
+
+
+def plot_folder(folder, save=False, density='histogram', max_points=5000,
+                bins=200, tikz_points=1000):
+    # Load samples (memory-mapped) and parameters
+    samples, parameters = load_samples(folder)
+
+    # Summary computed while sampling, if it has the same histogram and
+    # subsample, else a single pass over the samples: mean, covariance,
+    # histogram and subsample
+    summary = load_summary(folder)
+    if summary is None or summary.count != len(samples) or \
+            summary.histogram.shape != (bins, bins) or \
+            len(summary.reservoir) != tikz_points:
+        summary = summarize_samples(
+                samples,
+                default_bounds(parameters['mean'], parameters['cov']),
+                bins, tikz_points, parameters['seed'])
+
+    fig = generate_figure(samples, summary, parameters, density,
+                          max_points)
+
+    if save:
+        fig.savefig(os.path.join(folder, 'plot.pdf'), bbox_inches='tight')
+        # The LaTeX code only holds the subsample, over the histogram
+        # saved as an image
+        if len(samples) > max_points and density != 'histogram':
+            fig = generate_figure(samples, summary, parameters,
+                                  'histogram', max_points)
+        tikzplotlib_fix_ncols(fig)
+        tikzplotlib.save(os.path.join(folder, 'plot.tex'), figure=fig)
+        print('Saved plot in {}'.format(folder))
 
 
 if __name__ == "__main__":
@@ -35,99 +180,62 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('--storage_path', type=str,
                         default='data/',
-                        help='Path to the data folder where samples.csv, '
-                        'and parameters.txt are located')
+                        help='Path to the data folder where samples.npy '
+                        'and parameters.json (or samples.csv and '
+                        'parameters.txt) are located')
     parser.add_argument('--save', action='store_true', default=False,
                         help='Save the plot as pdf and LaTeX code')
+    parser.add_argument('--density', type=str, default='histogram',
+                        choices=DENSITIES,
+                        help='Drawing of the samples when there are more '
+                        'than --max_points: 2D histogram image with a '
+                        'uniform subsample, hexagonal bins, or rasterized '
+                        'scatter of all the samples.')
+    parser.add_argument('--max_points', type=int, default=5000,
+                        help='Number of samples above which they are '
+                        'drawn as a density.')
+    parser.add_argument('--bins', type=int, default=200,
+                        help='Number of bins of the 2D histogram along '
+                        'each coordinate.')
+    parser.add_argument('--tikz_points', type=int, default=1000,
+                        help='Size of the uniform subsample drawn over the '
+                        'histogram and exported in the LaTeX code.')
+    parser.add_argument('--batch', action='store_true', default=False,
+                        help='Render the figures of the groups without '
+                        'display and in parallel, saving them (implies '
+                        '--save). Groups whose samples did not change '
+                        'since their last rendering are skipped.')
+    parser.add_argument('--n_jobs', type=int, default=1,
+                        help='Number of processes rendering the groups in '
+                        'batch mode.')
+    parser.add_argument('--force', action='store_true', default=False,
+                        help='Render again every group in batch mode.')
     args = parser.parse_args()
 
     # Check if subfolders with name "group_" exist
     # Which means that several parameters have been
     # estimated and stored in different folders
-    if os.path.isdir(os.path.join(args.storage_path, 'group_0')):
-        folders = [os.path.join(args.storage_path, f) for f in
-                   os.listdir(args.storage_path) if 'group_' in f
-                   and os.path.isdir(os.path.join(args.storage_path, f))]
+    folders = find_group_folders(args.storage_path)
+
+    options = {'density': args.density,
+               'max_points': args.max_points,
+               'bins': args.bins,
+               'tikz_points': args.tikz_points}
+    if args.batch:
+        configure_matplotlib(batch=True)
+        # Render the groups whose samples changed in parallel
+        rendered = render_folders(
+                partial(plot_folder, save=True, **options), folders,
+                lambda folder: [os.path.join(folder, name) for name in
+                                [SAMPLES_FILE, LEGACY_SAMPLES_FILE,
+                                 PARAMETERS_FILE, LEGACY_PARAMETERS_FILE,
+                                 SUMMARY_FILE]] +
+                loaded_sources(__file__),
+                lambda folder: [os.path.join(folder, 'plot.pdf'),
+                                os.path.join(folder, 'plot.tex')],
+                'plot', args.n_jobs, args.force, options, setup_style)
+        print('Rendered {}/{} groups'.format(len(rendered), len(folders)))
     else:
-        folders = [args.storage_path]
-
-    for folder in folders:
-        # Load samples
-        samples = np.loadtxt(
-                os.path.join(folder, 'samples.csv'),
-                delimiter=',')
-
-        # Load parameters
-        with open(os.path.join(folder, 'parameters.txt'), 'r') as f:
-            lines = f.readlines()
-            # Mean is first line format: [x1, x2]
-            line = lines[0].replace('[', '').replace(']', '')
-            mean = np.array([float(x) for x in line.split(',')])
-            # Covariance matrix is second line
-            line = lines[1].replace('[', '').replace(']', '')
-            cov = np.array([float(x) for x in line.split(',')]).reshape(2, 2)
-            # Number of samples is third line
-            n_samples = int(lines[2])
-            # Random seed is fourth line
-            seed = int(lines[3])
-
-        # Estimate mean and covariance matrix
-        mean_est = np.mean(samples, axis=0)
-        cov_est = np.cov(samples.T)
-        # Compute eigenvalues and eigenvectors
-        eig_val_est, eig_vec_est = np.linalg.eig(cov_est)
-        # Compute angle of rotation
-        angle_est = np.arctan2(
-                eig_vec_est[1, 0],
-                eig_vec_est[0, 0]) * 180 / np.pi
-
-        # Compute eigenvalues and eigenvectors for the true covariance matrix
-        eig_val, eig_vec = np.linalg.eig(cov)
-        # Compute angle of rotationhttps://github.com/AmmarMian/qanat
-        angle = np.arctan2(eig_vec[1, 0], eig_vec[0, 0]) * 180 / np.pi
-
-        # Plotting
-        fig, ax = plt.subplots(1, 1, figsize=(8, 7))
-        ax.scatter(samples[:, 0], samples[:, 1], s=10, c='pink', alpha=0.5,
-                   label='Samples')
-        ax.scatter(mean[0], mean[1], s=100, c='r', marker='x',
-                   label='True mean')
-        ax.scatter(mean_est[0], mean_est[1], s=100, c='b', marker='x',
-                   label='Estimated mean')
-
-        # Plot covariance matrix ellipsoid
-        ell = Ellipse(xy=(mean[0], mean[1]),
-                      width=2 * np.sqrt(eig_val[0]),
-                      height=2 * np.sqrt(eig_val[1]),
-                      angle=angle,
-                      color='r',
-                      label='True covariance matrix')
-        ell.set_facecolor('none')
-        ax.add_artist(ell)
-
-        # Plot estimated covariance matrix ellipsoid
-        ell_est = Ellipse(xy=(mean_est[0], mean_est[1]),
-                          width=2 * np.sqrt(eig_val_est[0]),
-                          height=2 * np.sqrt(eig_val_est[1]),
-                          angle=angle_est,
-                          color='b',
-                          label='Estimated covariance matrix')
-        ell_est.set_facecolor('none')
-        ax.add_artist(ell_est)
-
-        ax.legend()
-        ax.set_xlabel(r'$x_1$')
-        ax.set_ylabel(r'$x_2$')
-        title = r'$\mu = [{:.2f}, {:.2f}]$'.format(mean[0], mean[1]) + ', '
-        title += r'$\Sigma = {}$'.format(format_covariance_latex(cov)) + '\n'
-        title += r'Number of samples: {}'.format(n_samples) + '\n'
-        title += r'Seed: {}'.format(seed)
-        ax.set_title(title, ha='left', fontsize=12, loc='left')
-
-        if args.save:
-            plt.savefig(os.path.join(folder, 'plot.pdf'), bbox_inches='tight')
-            tikzplotlib_fix_ncols(fig)
-            tikzplotlib.save(os.path.join(folder, 'plot.tex'))
-            print('Saved plot in {}'.format(folder))
-
-    plt.show()
+        for folder in folders:
+            plot_folder(folder, args.save, **options)
+        plt.show()
@@ -11,6 +11,62 @@ import numpy as np
 import argparse
 import os
 
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+from src.sample_store import (
+        LEGACY_SAMPLES_FILE,
+        open_samples,
+        save_parameters,
+        save_samples
+)
+from src.sample_summary import (
+        SUMMARY_FILE,
+        SampleSummary,
+        default_bounds,
+        save_summary
+)
+
+
+def count(value: str) -> int:
+    """Parse a positive number of samples, also written as e.g. 1e9."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = float(value)
+        if not number.is_integer():
+            raise argparse.ArgumentTypeError(
+                    f'{value} is not an integer number of samples')
+        number = int(number)
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+                f'{value} is not a positive number of samples')
+    return number
+
+
+def sample_blocks(rng: np.random.Generator, mean: np.ndarray,
+                  cov: np.ndarray, n_samples: int, block_size: int):
+    """Draw Gaussian samples block by block.
+
+    The blocks are affine transforms of consecutive standard normal draws,
+    so that the samples do not depend on the size of the blocks.
+
+    Args:
+        rng (np.random.Generator): Random generator
+        mean (np.ndarray): Mean of the distribution
+        cov (np.ndarray): Covariance of the distribution
+        n_samples (int): Number of samples
+        block_size (int): Maximum number of samples of a block
+
+    Yields:
+        tuple: (index of the first sample of the block, block of shape
+            (n_block, n_features))
+    """
+    chol = np.linalg.cholesky(cov)
+    for start in range(0, n_samples, block_size):
+        size = min(block_size, n_samples - start)
+        yield start, rng.standard_normal((size, len(mean))) @ chol.T + mean
+
+
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(
@@ -23,33 +79,67 @@ if __name__ == "__main__":
             default='1, 0, 0, 1',
             help='Covariance matrix of the gaussian distribution')
     parser.add_argument(
-            '--n_samples', type=float, default=1000,
+            '--n_samples', type=count, default=1000,
             help='Number of samples to generate')
     parser.add_argument(
-            '--seed', type=float, default=0,
+            '--seed', type=int, default=0,
             help='Random seed')
     parser.add_argument('--storage_path', type=str, default='data/',
                         help='Path to store the generated samples')
+    parser.add_argument('--export_csv', action='store_true', default=False,
+                        help='Also write the samples as text in '
+                        'samples.csv')
+    parser.add_argument('--block_size', type=count, default=2**20,
+                        help='Number of samples generated and written at '
+                        'once. The samples are written to a memory-mapped '
+                        'file, in bounded memory whatever their number.')
+    parser.add_argument('--bins', type=int, default=200,
+                        help='Number of bins along each coordinate of the '
+                        '2D histogram computed while sampling.')
+    parser.add_argument('--reservoir_size', type=int, default=1000,
+                        help='Size of the uniform subsample kept while '
+                        'sampling.')
+    parser.add_argument('--legacy_rng', action='store_true', default=False,
+                        help='Draw all the samples at once in memory with '
+                        'numpy.random.RandomState, to reproduce the samples '
+                        'of older runs.')
 
     args = parser.parse_args()
 
-    # Set random seed
-    rng = np.random.RandomState(int(args.seed))
-
     # Generate samples
-    mean = [float(x.strip()) for x in args.mean.split(',')]
+    mean = np.array([float(x.strip()) for x in args.mean.split(',')])
     cov = [float(x.strip()) for x in args.cov.split(',')]
     cov = np.array(cov).reshape(2, 2)
+    parameters = {'mean': mean, 'cov': cov,
+                  'n_samples': args.n_samples,
+                  'seed': args.seed}
+    os.makedirs(args.storage_path, exist_ok=True)
 
-    samples = rng.multivariate_normal(mean, cov, int(args.n_samples))
-
-    # Save samples and parameters
-    if not os.path.exists(os.path.dirname(args.storage_path)):
-        os.makedirs(os.path.dirname(args.storage_path))
-    np.savetxt(
-            os.path.join(args.storage_path, 'samples.csv'),
-            samples, delimiter=",")
-    parameters = [args.mean, args.cov, int(args.n_samples), int(args.seed)]
-    with open(os.path.join(args.storage_path, 'parameters.txt'), 'w') as f:
-        for item in parameters:
-            f.write("%s\n" % item)
+    if args.legacy_rng:
+        rng = np.random.RandomState(args.seed)
+        samples = rng.multivariate_normal(mean, cov, args.n_samples)
+        save_samples(args.storage_path, samples,
+                     {**parameters, 'rng': 'RandomState'}, args.export_csv)
+        # The plot summarizes these samples itself
+        if os.path.isfile(os.path.join(args.storage_path, SUMMARY_FILE)):
+            os.remove(os.path.join(args.storage_path, SUMMARY_FILE))
+    else:
+        # Write the samples block by block, summarizing them on the fly
+        # for the plot
+        rng = np.random.default_rng(args.seed)
+        samples = open_samples(args.storage_path, args.n_samples, len(mean))
+        summary = SampleSummary(default_bounds(mean, cov), args.bins,
+                                args.reservoir_size, args.seed)
+        for start, block in sample_blocks(rng, mean, cov, args.n_samples,
+                                          args.block_size):
+            samples[start:start + len(block)] = block
+            summary.update(block)
+        samples.flush()
+        save_summary(args.storage_path, summary)
+        save_parameters(args.storage_path,
+                        {**parameters, 'rng': 'Generator',
+                         'shape': list(samples.shape),
+                         'dtype': str(samples.dtype)})
+        if args.export_csv:
+            np.savetxt(os.path.join(args.storage_path, LEGACY_SAMPLES_FILE),
+                       samples, delimiter=',')
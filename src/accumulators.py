@@ -0,0 +1,211 @@
+# ========================================
+# FileName: accumulators.py
+# Date: 19 oct. 2026 - 15:10
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Streaming statistics of the
+#        Monte-Carlo trials
+# =========================================
+
+import numpy as np
+from scipy.stats import norm
+
+
+class RunningMoments:
+    """Streaming mean and variance of a vector of statistics.
+
+    Batches of observations are merged with the pairwise formula of Chan
+    et al., which is exact: merging the moments of several batches gives
+    the moments of their concatenation. Each component keeps its own
+    number of observations, so that components can stop being updated.
+
+    Args:
+        size (int): Number of components, e.g. the number of sample sizes
+    """
+
+    def __init__(self, size: int):
+        self.count = np.zeros(size, dtype=int)
+        self.mean = np.zeros(size)
+        self.m2 = np.zeros(size)
+
+    @classmethod
+    def from_samples(cls, values: np.ndarray) -> 'RunningMoments':
+        """Moments of a batch of observations.
+
+        Args:
+            values (np.ndarray): Observations of shape (n_observations, size)
+
+        Returns:
+            RunningMoments: Moments of the observations
+        """
+        moments = cls(values.shape[1])
+        moments.update(values)
+        return moments
+
+    def update(self, values: np.ndarray, columns=slice(None)):
+        """Add a batch of observations.
+
+        Args:
+            values (np.ndarray): Observations of shape
+                (n_observations, n_columns)
+            columns (optional): Index of the updated components.
+                Defaults to all of them.
+        """
+        if len(values) == 0:
+            return
+        count_b = len(values)
+        mean_b = np.mean(values, axis=0)
+        m2_b = np.sum((values - mean_b)**2, axis=0)
+        self._merge(columns, count_b, mean_b, m2_b)
+
+    def merge(self, other: 'RunningMoments'):
+        """Add the observations summarized by other moments.
+
+        Args:
+            other (RunningMoments): Moments of the same components
+        """
+        columns = other.count > 0
+        self._merge(columns, other.count[columns], other.mean[columns],
+                    other.m2[columns])
+
+    def _merge(self, columns, count_b, mean_b, m2_b):
+        count_a = self.count[columns]
+        count = count_a + count_b
+        delta = mean_b - self.mean[columns]
+        self.mean[columns] = self.mean[columns] + delta * count_b / count
+        self.m2[columns] = self.m2[columns] + m2_b + \
+            delta**2 * count_a * count_b / count
+        self.count[columns] = count
+
+    @property
+    def std(self) -> np.ndarray:
+        """Standard deviation of the observations (normalized by the number
+        of observations, as np.std)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.sqrt(self.m2 / self.count)
+
+    def ci_halfwidth(self, confidence: float = 0.95) -> np.ndarray:
+        """Half-width of the normal confidence interval on the mean.
+
+        Args:
+            confidence (float, optional): Level of the interval.
+                Defaults to 0.95.
+
+        Returns:
+            np.ndarray: Half-width for each component
+        """
+        return norm.ppf((1 + confidence) / 2) * self.sem
+
+    @property
+    def sem(self) -> np.ndarray:
+        """Standard error of the mean, from the unbiased variance."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = self.m2 / (self.count - 1)
+            return np.sqrt(variance / self.count)
+
+    def state(self) -> dict:
+        """State of the accumulator, e.g. to be pickled and merged later."""
+        return {'count': self.count.copy(),
+                'mean': self.mean.copy(),
+                'm2': self.m2.copy()}
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'RunningMoments':
+        """Build an accumulator from its state.
+
+        Args:
+            state (dict): Output of `state`
+
+        Returns:
+            RunningMoments: Accumulator
+        """
+        moments = cls(len(state['count']))
+        moments.count[:] = state['count']
+        moments.mean[:] = state['mean']
+        moments.m2[:] = state['m2']
+        return moments
+
+
+class RunningComoments:
+    """Streaming mean and covariance of vector observations, for several
+    independent components (e.g. one per sample size).
+
+    As for RunningMoments, batches are merged with the exact pairwise
+    formula.
+
+    Args:
+        size (int): Number of components
+        dim (int): Dimension of the observations
+    """
+
+    def __init__(self, size: int, dim: int):
+        self.count = np.zeros(size, dtype=int)
+        self.mean = np.zeros((size, dim))
+        self.comoment = np.zeros((size, dim, dim))
+
+    def update(self, values: np.ndarray, columns=slice(None)):
+        """Add a batch of observations.
+
+        Args:
+            values (np.ndarray): Observations of shape
+                (n_observations, n_columns, dim)
+            columns (optional): Index of the updated components.
+                Defaults to all of them.
+        """
+        if len(values) == 0:
+            return
+        count_b = len(values)
+        mean_b = np.mean(values, axis=0)
+        centered = values - mean_b
+        comoment_b = np.einsum('kci,kcj->cij', centered, centered)
+        self._merge(columns, count_b, mean_b, comoment_b)
+
+    def merge(self, other: 'RunningComoments'):
+        """Add the observations summarized by other comoments.
+
+        Args:
+            other (RunningComoments): Comoments of the same components
+        """
+        columns = other.count > 0
+        self._merge(columns, other.count[columns], other.mean[columns],
+                    other.comoment[columns])
+
+    def _merge(self, columns, count_b, mean_b, comoment_b):
+        count_a = self.count[columns]
+        count = count_a + count_b
+        weight = np.asarray(count_b / count)[..., None]
+        delta = mean_b - self.mean[columns]
+        self.mean[columns] = self.mean[columns] + delta * weight
+        self.comoment[columns] = self.comoment[columns] + comoment_b + \
+            np.einsum('...i,...j->...ij', delta, delta) * \
+            np.asarray(count_a * count_b / count)[..., None, None]
+        self.count[columns] = count
+
+    @property
+    def covariance(self) -> np.ndarray:
+        """Unbiased covariance of the observations of each component."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.comoment / (self.count - 1)[:, None, None]
+
+    def state(self) -> dict:
+        """State of the accumulator, e.g. to be pickled and merged later."""
+        return {'count': self.count.copy(),
+                'mean': self.mean.copy(),
+                'comoment': self.comoment.copy()}
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'RunningComoments':
+        """Build an accumulator from its state.
+
+        Args:
+            state (dict): Output of `state`
+
+        Returns:
+            RunningComoments: Accumulator
+        """
+        comoments = cls(*state['mean'].shape)
+        comoments.count[:] = state['count']
+        comoments.mean[:] = state['mean']
+        comoments.comoment[:] = state['comoment']
+        return comoments
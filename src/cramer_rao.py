@@ -16,7 +16,7 @@ from numba import njit
 
 # Multivariate Gaussian
 # =====================
-@njit
+@njit(cache=True)
 def basis_euc_sym_mat_real(M: int) -> np.ndarray:
     """Construction of the cannonical basis of M*M
     symetric matrices
@@ -117,3 +117,20 @@ def crb_centered_multivariate_gaussian_kron(
             n_samples * duplication_matrix(n_features).T @
             np.kron(icov, icov) @ duplication_matrix(n_features)
         )
+
+
+# Compilation
+# ===========
+def warmup():
+    """Compile the numba kernels of this module ahead of their first use.
+
+    The kernels are decorated with `cache=True`: the machine code produced
+    here is stored in the numba cache (`__pycache__` next to this file, or
+    `NUMBA_CACHE_DIR` if set) and reloaded from disk by later processes
+    instead of being compiled again.
+    """
+    basis_euc_sym_mat_real(2)
+
+
+if __name__ == "__main__":
+    warmup()
@@ -0,0 +1,205 @@
+# ========================================
+# FileName: estimate_archive.py
+# Date: 19 oct. 2026 - 14:55
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Compact archive of the covariance
+#        estimates of the trials and
+#        post-hoc evaluation of metrics
+# =========================================
+
+import glob
+import json
+import os
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from src.metrics import METRICS, ReferenceCovariance, evaluate_metrics
+
+ARCHIVE_NAME = 'estimates'
+ARCHIVE_DTYPE = np.float32
+
+
+def vech(matrices: np.ndarray) -> np.ndarray:
+    """Half-vectorization of symmetric matrices.
+
+    Args:
+        matrices (np.ndarray): Symmetric matrices of shape (..., p, p)
+
+    Returns:
+        np.ndarray: Upper triangles of shape (..., p(p+1)/2)
+    """
+    rows, columns = np.triu_indices(matrices.shape[-1])
+    return matrices[..., rows, columns]
+
+
+def unvech(vectors: np.ndarray, n_features: int) -> np.ndarray:
+    """Symmetric matrices from their half-vectorization.
+
+    Args:
+        vectors (np.ndarray): Upper triangles of shape (..., p(p+1)/2)
+        n_features (int): Size p of the matrices
+
+    Returns:
+        np.ndarray: Symmetric matrices of shape (..., p, p)
+    """
+    rows, columns = np.triu_indices(n_features)
+    matrices = np.zeros(vectors.shape[:-1] + (n_features, n_features),
+                        dtype=vectors.dtype)
+    matrices[..., rows, columns] = vectors
+    matrices[..., columns, rows] = vectors
+    return matrices
+
+
+class EstimateArchive:
+    """Archive of the covariance estimates of a range of trials, for some
+    of the numbers of samples.
+
+    The estimates are stored as their half-vectorization in float32 in an
+    array of shape (n_trials, n_archived_sizes, p(p+1)/2): a Zarr array
+    chunked by blocks of trials and compressed when zarr is installed,
+    otherwise a .npy file written and read through memory maps. A JSON
+    sidecar describes the array.
+
+    Args:
+        storage_path (str): Folder of the archive
+        trials_range (list): First and last trial numbers (included)
+        n_samples_list (array-like): Numbers of samples of the trials
+        archived_n (array-like): Numbers of samples whose estimates are
+            archived
+        n_features (int): Dimension p of the estimates
+        chunk_trials (int, optional): Number of trials per chunk of the
+            Zarr array. Defaults to 1024.
+    """
+
+    def __init__(self, storage_path: str, trials_range: list,
+                 n_samples_list, archived_n, n_features: int,
+                 chunk_trials: int = 1024):
+        n_samples_list = [int(n) for n in n_samples_list]
+        missing = [n for n in archived_n if n not in n_samples_list]
+        if len(missing) > 0:
+            raise ValueError(f'Numbers of samples {missing} are not '
+                             'simulated')
+        self.archived_n = [int(n) for n in archived_n]
+        self.indexes = [n_samples_list.index(n) for n in self.archived_n]
+        self.first_trial = trials_range[0]
+        shape = (trials_range[1] - trials_range[0] + 1,
+                 len(self.archived_n), n_features * (n_features + 1) // 2)
+
+        try:
+            import zarr
+            self.format = 'zarr'
+            self.array = zarr.open_array(
+                os.path.join(storage_path, f'{ARCHIVE_NAME}.zarr'),
+                mode='w', shape=shape, dtype=ARCHIVE_DTYPE,
+                chunks=(min(chunk_trials, shape[0]),) + shape[1:])
+        except ImportError:
+            self.format = 'npy'
+            self.array = open_memmap(
+                os.path.join(storage_path, f'{ARCHIVE_NAME}.npy'),
+                mode='w+', dtype=ARCHIVE_DTYPE, shape=shape)
+
+        with open(os.path.join(storage_path, f'{ARCHIVE_NAME}.json'),
+                  'w') as f:
+            json.dump({'format': self.format,
+                       'shape': list(shape),
+                       'first_trial': self.first_trial,
+                       'n_samples': self.archived_n,
+                       'n_features': n_features}, f, indent=2)
+
+    def put(self, trial_numbers: list, arrays: dict):
+        """Archive the estimates of a chunk of consecutive trials.
+
+        Args:
+            trial_numbers (list): Numbers of the trials of the chunk
+            arrays (dict): Outputs of the trials, with the estimates of
+                shape (n_trials, n_samples_sizes, p, p) in
+                `covariance_estimate`
+        """
+        start = trial_numbers[0] - self.first_trial
+        estimates = arrays['covariance_estimate'][:, self.indexes]
+        self.array[start:start + len(trial_numbers)] = \
+            vech(estimates).astype(ARCHIVE_DTYPE)
+
+    def close(self):
+        """Flush the archive."""
+        if self.format == 'npy':
+            self.array.flush()
+
+
+def open_archive(storage_path: str) -> tuple:
+    """Open an archive of estimates for reading, without loading it.
+
+    Args:
+        storage_path (str): Folder of the archive
+
+    Returns:
+        tuple: (array of shape (n_trials, n_archived_sizes, p(p+1)/2),
+            metadata of the archive)
+    """
+    with open(os.path.join(storage_path, f'{ARCHIVE_NAME}.json')) as f:
+        metadata = json.load(f)
+    if metadata['format'] == 'zarr':
+        import zarr
+        array = zarr.open_array(
+            os.path.join(storage_path, f'{ARCHIVE_NAME}.zarr'), mode='r')
+    else:
+        array = np.load(os.path.join(storage_path, f'{ARCHIVE_NAME}.npy'),
+                        mmap_mode='r')
+    return array, metadata
+
+
+def find_archives(storage_path: str) -> list:
+    """Folders of the archives of a run: the storage folder itself or the
+    folders of its shards.
+
+    Args:
+        storage_path (str): Storage folder of the run
+
+    Returns:
+        list: Folders containing an archive, ordered by first trial
+    """
+    if os.path.isfile(os.path.join(storage_path, f'{ARCHIVE_NAME}.json')):
+        return [storage_path]
+    folders = glob.glob(os.path.join(storage_path, 'shard_*'))
+    folders = [folder for folder in folders if os.path.isfile(
+        os.path.join(folder, f'{ARCHIVE_NAME}.json'))]
+    return sorted(folders, key=lambda folder: open_archive(folder)[1][
+        'first_trial'])
+
+
+def recompute_metrics(storage_path: str, covariance: np.ndarray,
+                      metrics: list = None,
+                      batch_size: int = 1024) -> tuple:
+    """Evaluate metrics on the archived estimates of a run, by batches of
+    trials.
+
+    Args:
+        storage_path (str): Storage folder of the run
+        covariance (np.ndarray): True covariance
+        metrics (list, optional): Names of metrics of METRICS.
+            Defaults to None, all of them.
+        batch_size (int, optional): Number of trials evaluated at once.
+            Defaults to 1024.
+
+    Returns:
+        tuple: (metrics of shape (n_trials, n_archived_sizes) for each
+            name, archived numbers of samples)
+    """
+    metrics = list(METRICS) if metrics is None else metrics
+    reference = ReferenceCovariance(covariance)
+    values = {name: [] for name in metrics}
+    for folder in find_archives(storage_path):
+        array, metadata = open_archive(folder)
+        for start in range(0, metadata['shape'][0], batch_size):
+            estimates = unvech(np.asarray(array[start:start + batch_size],
+                                          dtype=float),
+                               metadata['n_features'])
+            for name, block in evaluate_metrics(estimates, reference,
+                                                metrics).items():
+                values[name].append(block)
+    if len(values[metrics[0]]) == 0:
+        raise FileNotFoundError(f'No archive of estimates in {storage_path}')
+    return ({name: np.concatenate(blocks) for name, blocks in values.items()},
+            metadata['n_samples'])
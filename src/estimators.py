@@ -0,0 +1,180 @@
+# ========================================
+# FileName: estimators.py
+# Date: 19 oct. 2026 - 11:05
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Registry of location and covariance
+#        estimators fitted on stacks of
+#        datasets
+# =========================================
+
+from abc import ABC, abstractmethod
+from functools import partial
+import numpy as np
+from sklearn.base import clone
+from sklearn.covariance import MinCovDet
+
+from src.shrinkage import SHRINKAGES, scatter_statistics, shrink
+
+
+class BatchedEstimator(ABC):
+    """Estimator of the location and covariance fitted on a stack of
+    datasets at once.
+
+    Subclasses implement `fit`. The vectorized ones use the statistics of
+    `scatter_statistics`, computed once for all the estimators fitted on
+    the same datasets.
+
+    Args:
+        assume_centered (bool, optional): Whether the data are centered.
+            Defaults to False.
+    """
+
+    vectorized = True
+
+    def __init__(self, assume_centered: bool = False):
+        self.assume_centered = assume_centered
+
+    @abstractmethod
+    def fit(self, samples: np.ndarray, statistics: dict = None) -> tuple:
+        """Fit the estimator on each dataset of a stack.
+
+        Args:
+            samples (np.ndarray): Datasets of shape (k, n, p)
+            statistics (dict, optional): Output of scatter_statistics on
+                the datasets, computed if needed and not given.
+                Defaults to None.
+
+        Returns:
+            tuple: (locations of shape (k, p), covariances of shape
+                (k, p, p))
+        """
+
+    def _statistics(self, samples, statistics):
+        if statistics is None:
+            statistics = scatter_statistics(samples, self.assume_centered)
+        return statistics
+
+
+class EmpiricalEstimator(BatchedEstimator):
+    """Sample mean and sample covariance (normalized by n)."""
+
+    def fit(self, samples: np.ndarray, statistics: dict = None) -> tuple:
+        statistics = self._statistics(samples, statistics)
+        return statistics['location'], statistics['scatter']
+
+
+class ShrinkageEstimator(BatchedEstimator):
+    """Sample covariance shrunk towards a scaled identity.
+
+    Args:
+        shrinkage (str): Name of the shrinkage intensity in SHRINKAGES
+        assume_centered (bool, optional): Whether the data are centered.
+            Defaults to False.
+    """
+
+    def __init__(self, shrinkage: str, assume_centered: bool = False):
+        super().__init__(assume_centered)
+        self.shrinkage = SHRINKAGES[shrinkage]
+
+    def fit(self, samples: np.ndarray, statistics: dict = None) -> tuple:
+        statistics = self._statistics(samples, statistics)
+        return statistics['location'], shrink(statistics['scatter'],
+                                              self.shrinkage(statistics))
+
+
+class SklearnEstimator(BatchedEstimator):
+    """Adapter of a sklearn covariance estimator, fitted on each dataset
+    of the stack in turn.
+
+    Args:
+        estimator (sklearn.covariance.EmpiricalCovariance): Estimator
+            cloned for each dataset, with `location_` and `covariance_`
+            attributes once fitted
+        assume_centered (bool, optional): Whether the data are centered.
+            Defaults to False.
+    """
+
+    vectorized = False
+
+    def __init__(self, estimator, assume_centered: bool = False):
+        super().__init__(assume_centered)
+        self.estimator = estimator
+
+    def fit(self, samples: np.ndarray, statistics: dict = None) -> tuple:
+        locations = np.zeros((samples.shape[0], samples.shape[2]))
+        covariances = np.zeros((samples.shape[0], samples.shape[2],
+                                samples.shape[2]))
+        for k, dataset in enumerate(samples):
+            estimator = clone(self.estimator).set_params(
+                assume_centered=self.assume_centered).fit(dataset)
+            locations[k] = estimator.location_
+            covariances[k] = estimator.covariance_
+        return locations, covariances
+
+
+# Factories of the estimators, called with `assume_centered`
+ESTIMATORS = {'empirical': EmpiricalEstimator,
+              **{name: partial(ShrinkageEstimator, name)
+                 for name in SHRINKAGES},
+              'mcd': partial(SklearnEstimator, MinCovDet(random_state=0))}
+
+
+def register_estimator(name: str, factory):
+    """Add an estimator to the registry.
+
+    Args:
+        name (str): Name of the estimator
+        factory (callable): Called with `assume_centered` and returning a
+            BatchedEstimator, e.g. `partial(SklearnEstimator, estimator)`
+    """
+    if name in ESTIMATORS:
+        raise ValueError(f'Estimator {name} is already registered')
+    ESTIMATORS[name] = factory
+
+
+def make_estimators(names: list, assume_centered: bool = False) -> dict:
+    """Instantiate estimators of the registry.
+
+    Args:
+        names (list): Names of estimators of ESTIMATORS
+        assume_centered (bool, optional): Whether the data are centered.
+            Defaults to False.
+
+    Returns:
+        dict: BatchedEstimator of each name
+    """
+    unknown = [name for name in names if name not in ESTIMATORS]
+    if len(unknown) > 0:
+        raise ValueError(f'Unknown estimators {unknown}, '
+                         f'available: {list(ESTIMATORS)}')
+    return {name: ESTIMATORS[name](assume_centered=assume_centered)
+            for name in names}
+
+
+def fit_estimators(samples: np.ndarray, estimators: dict) -> dict:
+    """Fit several estimators on the same stack of datasets, sharing the
+    statistics of the vectorized ones.
+
+    Args:
+        samples (np.ndarray): Datasets of shape (k, n, p)
+        estimators (dict): BatchedEstimator of each name, as given by
+            make_estimators
+
+    Returns:
+        dict: (locations of shape (k, p), covariances of shape (k, p, p))
+            of each estimator
+    """
+    statistics = {}
+    fits = {}
+    for name, estimator in estimators.items():
+        if estimator.vectorized:
+            if estimator.assume_centered not in statistics:
+                statistics[estimator.assume_centered] = scatter_statistics(
+                    samples, estimator.assume_centered)
+            fits[name] = estimator.fit(
+                samples, statistics[estimator.assume_centered])
+        else:
+            fits[name] = estimator.fit(samples)
+    return fits
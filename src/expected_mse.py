@@ -0,0 +1,54 @@
+# ========================================
+# FileName: expected_mse.py
+# Date: 19 oct. 2026 - 11:20
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Closed-form MSE of the empirical
+#        estimators of a Gaussian
+#        distribution
+# =========================================
+
+import numpy as np
+
+
+def expected_mse_mean(covariance: np.ndarray,
+                      n_samples_list) -> np.ndarray:
+    """Exact MSE E[||m - mu||^2] of the sample mean of Gaussian samples.
+
+    Args:
+        covariance (np.ndarray): True covariance matrix
+        n_samples_list (array-like): Numbers of samples
+
+    Returns:
+        np.ndarray: tr(Sigma)/n for each number of samples
+    """
+    n_samples = np.asarray(n_samples_list, dtype=float)
+    return np.trace(covariance) / n_samples
+
+
+def expected_mse_covariance(covariance: np.ndarray, n_samples_list,
+                            assume_centered: bool = True) -> np.ndarray:
+    """Exact MSE E[||S - Sigma||_F^2] of the sample covariance (normalized
+    by the number of samples) of Gaussian samples.
+
+    It is obtained from the Wishart moments of S:
+    E[||S||_F^2] - 2 E[tr(S Sigma)] + ||Sigma||_F^2, which gives
+    (tr(Sigma)^2 + tr(Sigma^2))/n when centered and
+    ((n-1)(tr(Sigma)^2 + tr(Sigma^2)) + tr(Sigma^2))/n^2 otherwise.
+
+    Args:
+        covariance (np.ndarray): True covariance matrix
+        n_samples_list (array-like): Numbers of samples
+        assume_centered (bool, optional): Whether the sample covariance
+            uses the known mean. Defaults to True.
+
+    Returns:
+        np.ndarray: Expected squared error for each number of samples
+    """
+    n_samples = np.asarray(n_samples_list, dtype=float)
+    trace = np.trace(covariance)
+    trace2 = np.sum(covariance**2)
+    if assume_centered:
+        return (trace**2 + trace2) / n_samples
+    return ((n_samples - 1) * (trace**2 + trace2) + trace2) / n_samples**2
@@ -0,0 +1,195 @@
+# ========================================
+# FileName: metrics.py
+# Date: 19 oct. 2026 - 14:30
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Error metrics between stacks of
+#        covariance estimates and the true
+#        covariance
+# =========================================
+
+import numpy as np
+from scipy.linalg import solve_triangular
+
+
+class ReferenceCovariance:
+    """True covariance with the factorizations shared by the metrics.
+
+    Args:
+        covariance (np.ndarray): True covariance of shape (p, p)
+    """
+
+    def __init__(self, covariance: np.ndarray):
+        self.covariance = covariance
+        self.n_features = covariance.shape[0]
+        self.chol = np.linalg.cholesky(covariance)
+        # Inverse of the Cholesky factor: Sigma^-1 = whitener^T whitener
+        self.whitener = solve_triangular(self.chol,
+                                         np.eye(self.n_features), lower=True)
+
+    def generalized_eigenvalues(self, estimates: np.ndarray) -> np.ndarray:
+        """Generalized eigenvalues of the pairs (S_k, Sigma), i.e. the
+        eigenvalues of L^-1 S_k L^-T with Sigma = L L^T.
+
+        Args:
+            estimates (np.ndarray): Estimates of shape (..., p, p)
+
+        Returns:
+            np.ndarray: Eigenvalues of shape (..., p)
+        """
+        whitened = self.whitener @ estimates @ self.whitener.T
+        return np.linalg.eigvalsh(whitened)
+
+
+def singular_mask(eigenvalues: np.ndarray) -> np.ndarray:
+    """Eigenvalues numerically null, the null eigenvalues of rank-deficient
+    estimates coming out as +-1e-16 rather than 0.
+
+    Args:
+        eigenvalues (np.ndarray): Generalized eigenvalues of shape (..., p)
+
+    Returns:
+        np.ndarray: Whether each eigenvalue is at most
+            eps * p * max(eigenvalues) of its estimate
+    """
+    n_features = eigenvalues.shape[-1]
+    tolerance = np.finfo(eigenvalues.dtype).eps * n_features * \
+        np.max(np.abs(eigenvalues), axis=-1, keepdims=True)
+    return eigenvalues <= tolerance
+
+
+def frobenius_error(estimates: np.ndarray, reference: ReferenceCovariance,
+                    eigenvalues: np.ndarray = None) -> np.ndarray:
+    """Squared Frobenius norm of the errors ||S_k - Sigma||_F^2.
+
+    Args:
+        estimates (np.ndarray): Estimates of shape (..., p, p)
+        reference (ReferenceCovariance): True covariance
+        eigenvalues (np.ndarray, optional): Unused, for a common
+            signature of the metrics. Defaults to None.
+
+    Returns:
+        np.ndarray: Error of each estimate, of shape (...)
+    """
+    return np.sum((estimates - reference.covariance)**2, axis=(-2, -1))
+
+
+def spectral_error(estimates: np.ndarray, reference: ReferenceCovariance,
+                   eigenvalues: np.ndarray = None) -> np.ndarray:
+    """Spectral norm of the errors ||S_k - Sigma||_2, i.e. the largest
+    absolute eigenvalue of the symmetric errors.
+
+    Args:
+        estimates (np.ndarray): Estimates of shape (..., p, p)
+        reference (ReferenceCovariance): True covariance
+        eigenvalues (np.ndarray, optional): Unused. Defaults to None.
+
+    Returns:
+        np.ndarray: Error of each estimate, of shape (...)
+    """
+    return np.max(np.abs(np.linalg.eigvalsh(
+        estimates - reference.covariance)), axis=-1)
+
+
+def riemannian_distance(estimates: np.ndarray,
+                        reference: ReferenceCovariance,
+                        eigenvalues: np.ndarray = None) -> np.ndarray:
+    """Affine-invariant Riemannian distance
+    ||log(Sigma^-1/2 S_k Sigma^-1/2)||_F = sqrt(sum_i log^2 lambda_i).
+
+    Args:
+        estimates (np.ndarray): Estimates of shape (..., p, p)
+        reference (ReferenceCovariance): True covariance
+        eigenvalues (np.ndarray, optional): Generalized eigenvalues of the
+            estimates, computed if not given. Defaults to None.
+
+    Returns:
+        np.ndarray: Distance of each estimate, infinite for singular
+            estimates
+    """
+    if eigenvalues is None:
+        eigenvalues = reference.generalized_eigenvalues(estimates)
+    singular = singular_mask(eigenvalues)
+    log_eigenvalues = np.where(singular, -np.inf,
+                               np.log(np.where(singular, 1, eigenvalues)))
+    return np.sqrt(np.sum(log_eigenvalues**2, axis=-1))
+
+
+def stein_loss(estimates: np.ndarray, reference: ReferenceCovariance,
+               eigenvalues: np.ndarray = None) -> np.ndarray:
+    """Stein loss tr(Sigma^-1 S_k) - log det(Sigma^-1 S_k) - p.
+
+    Args:
+        estimates (np.ndarray): Estimates of shape (..., p, p)
+        reference (ReferenceCovariance): True covariance
+        eigenvalues (np.ndarray, optional): Generalized eigenvalues of the
+            estimates, computed if not given. Defaults to None.
+
+    Returns:
+        np.ndarray: Loss of each estimate, infinite for singular estimates
+    """
+    if eigenvalues is None:
+        eigenvalues = reference.generalized_eigenvalues(estimates)
+    singular = singular_mask(eigenvalues)
+    terms = np.where(singular, np.inf,
+                     eigenvalues - np.log(np.where(singular, 1, eigenvalues))
+                     - 1)
+    return np.sum(terms, axis=-1)
+
+
+def kl_divergence(estimates: np.ndarray, reference: ReferenceCovariance,
+                  eigenvalues: np.ndarray = None) -> np.ndarray:
+    """Kullback-Leibler divergence KL(N(0, Sigma) || N(0, S_k))
+    = (tr(S_k^-1 Sigma) + log det(S_k Sigma^-1) - p) / 2, i.e. the
+    information lost when the true distribution is approximated with the
+    estimate.
+
+    Args:
+        estimates (np.ndarray): Estimates of shape (..., p, p)
+        reference (ReferenceCovariance): True covariance
+        eigenvalues (np.ndarray, optional): Generalized eigenvalues of the
+            estimates, computed if not given. Defaults to None.
+
+    Returns:
+        np.ndarray: Divergence of each estimate, infinite for singular
+            estimates
+    """
+    if eigenvalues is None:
+        eigenvalues = reference.generalized_eigenvalues(estimates)
+    singular = singular_mask(eigenvalues)
+    regular = np.where(singular, 1, eigenvalues)
+    terms = np.where(singular, np.inf,
+                     1 / regular + np.log(regular) - 1)
+    return np.sum(terms, axis=-1) / 2
+
+
+METRICS = {'frobenius': frobenius_error,
+           'spectral': spectral_error,
+           'riemannian': riemannian_distance,
+           'kl': kl_divergence,
+           'stein': stein_loss}
+# Metrics computed from the generalized eigenvalues of (S_k, Sigma)
+EIGENVALUE_METRICS = ['riemannian', 'kl', 'stein']
+
+
+def evaluate_metrics(estimates: np.ndarray, reference: ReferenceCovariance,
+                     names: list = None) -> dict:
+    """Evaluate metrics on a stack of estimates, computing the generalized
+    eigenvalues once for all the metrics needing them.
+
+    Args:
+        estimates (np.ndarray): Estimates of shape (..., p, p)
+        reference (ReferenceCovariance): True covariance
+        names (list, optional): Names of metrics of METRICS.
+            Defaults to None, all of them.
+
+    Returns:
+        dict: Values of shape (...) of each metric
+    """
+    names = list(METRICS) if names is None else names
+    eigenvalues = None
+    if any(name in EIGENVALUE_METRICS for name in names):
+        eigenvalues = reference.generalized_eigenvalues(estimates)
+    return {name: METRICS[name](estimates, reference, eigenvalues)
+            for name in names}
@@ -0,0 +1,385 @@
+# ========================================
+# FileName: montecarlo.py
+# Date: 19 oct. 2026 - 11:42
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Execution of the trials of a
+#        Monte-Carlo simulation by chunks
+# =========================================
+
+import cProfile
+import os
+from contextlib import contextmanager, nullcontext
+import numpy as np
+import rich
+from joblib import Parallel, delayed, effective_n_jobs, parallel_config
+from threadpoolctl import threadpool_limits
+
+from src.accumulators import RunningMoments
+from src.profiling import StageProfiler
+from src.progress import REPORT_EVERY
+
+# Backends executing the chunks, with the name of the joblib backend
+# for the ones running on the local machine
+LOCAL_BACKENDS = {'loky': 'loky',
+                  'threading': 'threading',
+                  'serial': 'sequential'}
+# Backends whose workers can run on other nodes. They are configured by
+# `execution_backend` and their workers cannot reach the queue of the
+# progress monitor, so the progress is reported by the main process.
+REMOTE_BACKENDS = ['dask', 'ray']
+BACKENDS = list(LOCAL_BACKENDS) + REMOTE_BACKENDS
+# Backends whose workers share the memory and the BLAS thread pools of
+# the main process
+SHARED_BACKENDS = ['threading', 'serial']
+DEFAULT_CHUNK_SIZE = 10
+# Maximum number of trials run at once by a batched trial function, which
+# bounds the memory of the stacked datasets
+MAX_BATCH_SIZE = 64
+
+
+def make_chunks(trials_range: list, chunk_size: int) -> list:
+    """Split a range of trials into chunks of consecutive trials.
+
+    Args:
+        trials_range (list): First and last trial numbers (included)
+        chunk_size (int): Number of trials per chunk
+
+    Returns:
+        list: Lists of trial numbers
+    """
+    trials = range(trials_range[0], trials_range[1] + 1)
+    return [list(trials[i:i + chunk_size])
+            for i in range(0, len(trials), chunk_size)]
+
+
+def stack_results(results: list) -> dict:
+    """Stack the results of the trials.
+
+    Args:
+        results (list): Dictionaries of arrays returned by the trials
+
+    Returns:
+        dict: For each key, array of shape (n_trials, ...)
+    """
+    return {name: np.array([result[name] for result in results])
+            for name in results[0]}
+
+
+def run_chunk(trial_function, args: tuple, trial_numbers: list,
+              progress_queue=None, profile: bool = False,
+              blas_threads: int = None, batched: bool = False) -> tuple:
+    """Run sequentially the trials of a chunk.
+
+    Args:
+        trial_function (callable): Function called as
+            `trial_function(*args, trial_no, profiler=profiler)` and
+            returning a dictionary of arrays, or if batched as
+            `trial_function(*args, trial_numbers, profiler=profiler)` and
+            returning the list of the dictionaries of the trials
+        args (tuple): Arguments of the trial function shared by the trials
+        trial_numbers (list): Numbers of the trials
+        progress_queue (queue, optional): Queue of a ProgressMonitor where
+            the numbers of completed trials are reported every
+            REPORT_EVERY trials and at the end of the chunk.
+            Defaults to None.
+        profile (bool, optional): Whether to time the stages of the trials.
+            Defaults to False.
+        blas_threads (int, optional): Number of threads of the BLAS
+            libraries of the worker during the chunk. Defaults to None,
+            not limited.
+        batched (bool, optional): Whether the trial function runs the
+            trials of the chunk at once, by batches of at most
+            MAX_BATCH_SIZE trials. Defaults to False.
+
+    Returns:
+        tuple: (results of the trials, statistics of the profiler)
+    """
+    profiler = StageProfiler(enabled=profile)
+    results = []
+    n_unreported = 0
+    with profiler.stage('chunk'), blas_limits(blas_threads):
+        if batched:
+            for start in range(0, len(trial_numbers), MAX_BATCH_SIZE):
+                batch = list(trial_numbers[start:start + MAX_BATCH_SIZE])
+                results.extend(trial_function(*args, batch,
+                                              profiler=profiler))
+                if progress_queue is not None:
+                    with profiler.stage('progress'):
+                        progress_queue.put(len(batch))
+        else:
+            for trial_no in trial_numbers:
+                results.append(trial_function(*args, trial_no,
+                                              profiler=profiler))
+                n_unreported += 1
+                if progress_queue is not None and \
+                        n_unreported == REPORT_EVERY:
+                    with profiler.stage('progress'):
+                        progress_queue.put(n_unreported)
+                    n_unreported = 0
+        if progress_queue is not None and n_unreported > 0:
+            with profiler.stage('progress'):
+                progress_queue.put(n_unreported)
+    return results, profiler.stats
+
+
+def blas_limits(blas_threads: int = None):
+    """Context limiting the number of threads of the BLAS libraries.
+
+    The limits of threadpoolctl apply to the whole process: with threads
+    as workers, they must be set once by the main process.
+
+    Args:
+        blas_threads (int, optional): Number of threads. Defaults to None,
+            not limited.
+    """
+    if blas_threads is None:
+        return nullcontext()
+    return threadpool_limits(limits=blas_threads, user_api='blas')
+
+
+@contextmanager
+def execution_backend(backend: str = 'loky', n_jobs: int = 1,
+                      scatter: list = None):
+    """Context in which the chunks of `run_montecarlo` can run on a
+    backend.
+
+    Nothing is done for the local backends. For dask, the client connects
+    to the scheduler at DASK_SCHEDULER_ADDRESS if set, otherwise to a
+    LocalCluster of n_jobs single-threaded workers, and the arrays of
+    `scatter` are sent once to the workers instead of with every chunk.
+    For ray, the cluster at RAY_ADDRESS is joined if set, otherwise a
+    local one is started, and the arguments are shared through its object
+    store.
+
+    Args:
+        backend (str, optional): Name of the backend in BACKENDS.
+            Defaults to 'loky'.
+        n_jobs (int, optional): Number of workers of the local cluster.
+            Defaults to 1.
+        scatter (list, optional): Constant arguments of the trials sent
+            once to the dask workers. Defaults to None.
+    """
+    if backend in LOCAL_BACKENDS:
+        yield
+    elif backend == 'dask':
+        from dask.distributed import Client, LocalCluster
+        address = os.environ.get('DASK_SCHEDULER_ADDRESS')
+        if address is None:
+            cluster = LocalCluster(
+                n_workers=n_jobs if n_jobs > 0 else None,
+                threads_per_worker=1, processes=True)
+        else:
+            cluster = nullcontext(address)
+        with cluster as target, Client(target) as client:
+            rich.print(f'[bold]Dask dashboard[/bold]: '
+                       f'{client.dashboard_link}')
+            with parallel_config(backend='dask', scatter=scatter):
+                yield
+    elif backend == 'ray':
+        import ray
+        from ray.util.joblib import register_ray
+        register_ray()
+        ray.init(address=os.environ.get('RAY_ADDRESS'),
+                 num_cpus=n_jobs if n_jobs > 0 else None)
+        try:
+            with parallel_config(backend='ray'):
+                yield
+        finally:
+            ray.shutdown()
+    else:
+        raise ValueError(f'Unknown backend {backend}, '
+                         f'available: {BACKENDS}')
+
+
+def run_montecarlo(trial_function, args: tuple, trials_range: list,
+                   n_jobs: int = 1, chunk_size: int = None,
+                   progress_queue=None, profile: bool = False,
+                   cprofile_path: str = None, backend: str = 'loky',
+                   blas_threads: int = None, on_chunk=None,
+                   batched: bool = False) -> tuple:
+    """Run the trials of a Monte-Carlo simulation by chunks in parallel.
+
+    When profiling, the statistics of the workers are merged and a stage
+    `overhead` is added: the time the workers spent out of the chunks
+    during the parallel section, i.e. dispatch, serialisation of the
+    arguments and results, inter-process communication and idle workers.
+
+    Args:
+        trial_function (callable): Function of a single trial, see
+            `run_chunk`
+        args (tuple): Arguments of the trial function shared by the trials
+        trials_range (list): First and last trial numbers (included)
+        n_jobs (int, optional): Number of parallel jobs. Defaults to 1.
+        chunk_size (int, optional): Number of trials per job. Defaults to
+            None: one block of trials per thread with the threading
+            backend, which avoids dispatching many small tasks to workers
+            sharing the memory, and DEFAULT_CHUNK_SIZE otherwise.
+        progress_queue (queue, optional): Queue of a ProgressMonitor where
+            the workers report their completed trials. Defaults to None.
+        profile (bool, optional): Whether to time the stages.
+            Defaults to False.
+        cprofile_path (str, optional): If given, the first chunk is run in
+            the main process under cProfile and the profile is dumped
+            there (pstats format). Defaults to None.
+        backend (str, optional): Backend running the chunks, among
+            BACKENDS. The remote ones must be set up with
+            `execution_backend` and use all their workers.
+            Defaults to 'loky'.
+        blas_threads (int, optional): Number of BLAS threads of each
+            worker process, or of the whole process with the threading
+            and serial backends, e.g. to avoid oversubscribing the cores
+            with n_jobs workers each running a multithreaded BLAS.
+            Defaults to None, not limited.
+        on_chunk (callable, optional): Called in the main process as
+            `on_chunk(trial_numbers, results)` when the results of a chunk
+            come back and returning the results to keep, e.g. without the
+            large outputs it has saved. Defaults to None.
+        batched (bool, optional): Whether the trial function runs the
+            trials of a chunk at once, see `run_chunk`. Defaults to False.
+
+    Returns:
+        tuple: (results of the trials ordered by trial number,
+            statistics of the profiler)
+    """
+    if on_chunk is None:
+        def on_chunk(trial_numbers, chunk_results):
+            return chunk_results
+
+    if backend in REMOTE_BACKENDS:
+        config = nullcontext()
+        n_jobs = -1
+        worker_queue = None
+    else:
+        config = parallel_config(backend=LOCAL_BACKENDS[backend])
+        worker_queue = progress_queue
+    if backend in SHARED_BACKENDS:
+        process_blas_threads, worker_blas_threads = blas_threads, None
+    else:
+        process_blas_threads, worker_blas_threads = None, blas_threads
+    if chunk_size is None:
+        if backend == 'threading':
+            n_trials = trials_range[1] - trials_range[0] + 1
+            chunk_size = max(-(-n_trials // effective_n_jobs(n_jobs)), 1)
+        else:
+            chunk_size = DEFAULT_CHUNK_SIZE
+    profiler = StageProfiler(enabled=profile)
+    chunks = make_chunks(trials_range, chunk_size)
+    results = []
+
+    if cprofile_path is not None and len(chunks) > 0:
+        # The timings of this chunk are biased by cProfile
+        # so they are not merged
+        chunk = chunks.pop(0)
+        cprofiler = cProfile.Profile()
+        chunk_results, _ = cprofiler.runcall(
+                run_chunk, trial_function, args, chunk, progress_queue,
+                batched=batched)
+        cprofiler.dump_stats(cprofile_path)
+        results.extend(on_chunk(chunk, chunk_results))
+
+    results_chunks = []
+    with profiler.stage('parallel'), config, \
+            blas_limits(process_blas_threads):
+        n_workers = min(effective_n_jobs(n_jobs), max(len(chunks), 1))
+        chunks_generator = Parallel(n_jobs=n_jobs, return_as='generator')(
+            delayed(run_chunk)(trial_function, args, chunk,
+                               worker_queue, profile, worker_blas_threads,
+                               batched)
+            for chunk in chunks
+        )
+        for chunk, (chunk_results, chunk_stats) in zip(chunks,
+                                                       chunks_generator):
+            results_chunks.append((on_chunk(chunk, chunk_results),
+                                   chunk_stats))
+            if worker_queue is None and progress_queue is not None:
+                progress_queue.put(len(chunk))
+
+    chunks_wall = 0.
+    for chunk_results, chunk_stats in results_chunks:
+        results.extend(chunk_results)
+        profiler.merge(chunk_stats)
+        chunks_wall += chunk_stats.get('chunk', {}).get('wall', 0.)
+
+    if profile and len(chunks) > 0:
+        overhead = profiler.stats['parallel']['wall'] * n_workers - \
+            chunks_wall
+        profiler.add('overhead', max(overhead, 0.), 0., len(chunks))
+
+    return results, profiler.stats
+
+
+def run_adaptive_montecarlo(trial_function, make_args, n_samples_list,
+                            trials_range: list, target_rel_ci: float,
+                            round_size: int = 1000, min_trials: int = 100,
+                            confidence: float = 0.95, **kwargs) -> tuple:
+    """Run the trials of a Monte-Carlo simulation by rounds until the
+    confidence intervals on the means are narrow enough.
+
+    After each round, the sample sizes for which the half-width of the
+    confidence interval of every statistic is below `target_rel_ci` times
+    the absolute value of its mean are considered converged and are not
+    simulated anymore. The simulation stops when all sample sizes have
+    converged or when the range of trials is exhausted.
+
+    Args:
+        trial_function (callable): Function of a single trial, see
+            `run_chunk`. The arrays it returns have one value per sample
+            size given in its arguments.
+        make_args (callable): Called with the array of the sample sizes
+            still simulated and returning the arguments of the trial
+            function
+        n_samples_list (array-like): Numbers of samples
+        trials_range (list): First and last trial numbers (included)
+        target_rel_ci (float): Target relative half-width of the
+            confidence intervals
+        round_size (int, optional): Number of trials per round.
+            Defaults to 1000.
+        min_trials (int, optional): Minimum number of trials before a
+            sample size can be considered converged. Defaults to 100.
+        confidence (float, optional): Level of the confidence intervals.
+            Defaults to 0.95.
+        **kwargs: Options of `run_montecarlo`
+
+    Returns:
+        tuple: (RunningMoments of each statistic, with the number of
+            trials used per sample size in their `count` attribute,
+            statistics of the profiler)
+    """
+    n_samples_list = np.asarray(n_samples_list)
+    active = np.arange(len(n_samples_list))
+    moments = None
+    profiler = StageProfiler(enabled=kwargs.get('profile', False))
+
+    first_trial = trials_range[0]
+    while len(active) > 0 and first_trial <= trials_range[1]:
+        round_range = [first_trial,
+                       min(first_trial + round_size - 1, trials_range[1])]
+        results, round_stats = run_montecarlo(
+                trial_function, make_args(n_samples_list[active]),
+                round_range, **kwargs)
+        profiler.merge(round_stats)
+        first_trial = round_range[1] + 1
+        # Only the first chunk of the simulation is run under cProfile
+        kwargs['cprofile_path'] = None
+
+        results = stack_results(results)
+        if moments is None:
+            moments = {name: RunningMoments(len(n_samples_list))
+                       for name in results}
+        converged = np.ones(len(n_samples_list), dtype=bool)
+        for name, values in results.items():
+            moments[name].update(values, active)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                rel_ci = moments[name].ci_halfwidth(confidence) / \
+                    np.abs(moments[name].mean)
+            converged &= (rel_ci <= target_rel_ci) & \
+                (moments[name].count >= min_trials)
+        active = active[~converged[active]]
+
+        rich.print(f'[bold]Round up to trial {round_range[1]}[/bold]: '
+                   f'{len(n_samples_list) - len(active)}/'
+                   f'{len(n_samples_list)} sample sizes converged')
+
+    return moments, profiler.stats
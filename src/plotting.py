@@ -0,0 +1,179 @@
+# ========================================
+# FileName: plotting.py
+# Date: 19 oct. 2026 - 16:30
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Headless rendering of the figures
+#        of the groups of a run in parallel,
+#        skipping the unchanged ones
+# =========================================
+
+import hashlib
+import json
+import os
+import shutil
+from functools import lru_cache
+import numpy as np
+from joblib import Parallel, delayed
+
+from src.utils import format_covariance_latex
+
+# Name of the file of a folder holding the digests of the sources of its
+# figures
+DIGESTS_FILE = '.figures.json'
+# Files larger than this are identified by their size and modification
+# time instead of their content
+HASH_MAX_BYTES = 64 * 2**20
+
+
+@lru_cache(maxsize=None)
+def latex_available() -> bool:
+    """Whether a LaTeX installation is found, looked up once per process.
+    """
+    return shutil.which('latex') is not None
+
+
+def configure_matplotlib(batch: bool = False, usetex: bool = True):
+    """Set up the backend and the text rendering of matplotlib.
+
+    Args:
+        batch (bool, optional): Whether to render without display, with the
+            Agg backend. Defaults to False.
+        usetex (bool, optional): Whether to render the text with LaTeX,
+            only applied when a LaTeX installation is found.
+            Defaults to True.
+    """
+    import matplotlib.pyplot as plt
+    if batch:
+        plt.switch_backend('Agg')
+    plt.rc('text', usetex=usetex and latex_available())
+    plt.rc('font', family='serif')
+
+
+def format_covariance(cov: np.ndarray) -> str:
+    """Format a 2D covariance matrix in math mode for the current text
+    rendering: a LaTeX array with usetex, else rows parsed by mathtext,
+    which does not know the LaTeX environments.
+
+    Args:
+        cov (np.ndarray): Covariance matrix
+
+    Returns:
+        str: Formatted covariance matrix, without the $ delimiters
+    """
+    import matplotlib.pyplot as plt
+    if plt.rcParams['text.usetex']:
+        return format_covariance_latex(cov)
+    return '[' + ', '.join(
+            '[' + ', '.join(str(value) for value in row) + ']'
+            for row in cov) + ']'
+
+
+def source_digest(paths: list, options: dict = None) -> str:
+    """Digest of the files and options a figure is made from.
+
+    Args:
+        paths (list): Files read to make the figure, missing ones ignored
+        options (dict, optional): Options of the rendering, serializable
+            to JSON. Defaults to None.
+
+    Returns:
+        str: SHA-256 hexadecimal digest
+    """
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        if not os.path.isfile(path):
+            continue
+        digest.update(os.path.basename(path).encode())
+        stat = os.stat(path)
+        if stat.st_size > HASH_MAX_BYTES:
+            digest.update(f'{stat.st_size}:{stat.st_mtime_ns}'.encode())
+            continue
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(2**20), b''):
+                digest.update(block)
+    digest.update(json.dumps(options, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _read_digests(folder: str) -> dict:
+    path = os.path.join(folder, DIGESTS_FILE)
+    if not os.path.isfile(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def is_up_to_date(folder: str, name: str, digest: str,
+                  outputs: list) -> bool:
+    """Whether the figures of a folder were rendered from the same sources
+    and are all present.
+
+    Args:
+        folder (str): Folder of the figures
+        name (str): Name of the set of figures, e.g. the plotting script
+        digest (str): Digest of the current sources
+        outputs (list): Paths of the figures
+
+    Returns:
+        bool: True if nothing has to be rendered again
+    """
+    return _read_digests(folder).get(name) == digest and \
+        all(os.path.isfile(path) for path in outputs)
+
+
+def _render(render, folder: str, setup=None):
+    if setup is not None:
+        setup()
+    configure_matplotlib(batch=True)
+    render(folder)
+    import matplotlib.pyplot as plt
+    plt.close('all')
+
+
+def render_folders(render, folders: list, sources, outputs,
+                   name: str = 'plot', n_jobs: int = 1,
+                   force: bool = False, options: dict = None,
+                   setup=None) -> list:
+    """Render the figures of several folders in parallel processes, without
+    display, skipping the folders whose sources did not change since their
+    figures were rendered.
+
+    Args:
+        render (callable): Called as `render(folder)`, makes and saves the
+            figures of a folder
+        folders (list): Folders to render
+        sources (callable): Called as `sources(folder)`, returns the files
+            the figures are made from
+        outputs (callable): Called as `outputs(folder)`, returns the paths
+            of the figures
+        name (str, optional): Name of the set of figures in the digests
+            file. Defaults to 'plot'.
+        n_jobs (int, optional): Number of processes. Defaults to 1.
+        force (bool, optional): Whether to render every folder.
+            Defaults to False.
+        options (dict, optional): Options of the rendering, a change of
+            which also triggers the rendering. Defaults to None.
+        setup (callable, optional): Called without argument in the
+            rendering process before each folder, e.g. to set the style of
+            the figures. Defaults to None.
+
+    Returns:
+        list: Folders rendered
+    """
+    digests = {folder: source_digest(sources(folder), options)
+               for folder in folders}
+    stale = [folder for folder in folders
+             if force or not is_up_to_date(folder, name, digests[folder],
+                                           outputs(folder))]
+
+    Parallel(n_jobs=n_jobs)(delayed(_render)(render, folder, setup)
+                            for folder in stale)
+
+    for folder in stale:
+        folder_digests = _read_digests(folder)
+        folder_digests[name] = digests[folder]
+        with open(os.path.join(folder, DIGESTS_FILE), 'w') as f:
+            json.dump(folder_digests, f, indent=2)
+    return stale
@@ -0,0 +1,111 @@
+# ========================================
+# FileName: profiling.py
+# Date: 19 oct. 2026 - 11:20
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Per-stage timing instrumentation
+#        of the Monte-Carlo simulations
+# =========================================
+
+import json
+import time
+from contextlib import nullcontext
+
+
+class _Stage:
+    """Context manager timing one execution of a stage."""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name,
+                          time.perf_counter() - self.wall,
+                          time.process_time() - self.cpu)
+        return False
+
+
+class StageProfiler:
+    """Accumulate the wall time, CPU time and number of calls of named
+    stages of a computation.
+
+    A disabled profiler returns a no-op context manager so that the
+    instrumentation can stay in the kernels at a negligible cost.
+
+    The CPU time is the one of the whole process, which includes the
+    threads of the BLAS library.
+
+    Args:
+        enabled (bool, optional): Whether to record the stages.
+            Defaults to True.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stats = {}
+
+    def stage(self, name: str):
+        """Context manager timing a stage.
+
+        Args:
+            name (str): Name of the stage
+
+        Returns:
+            context manager
+        """
+        if not self.enabled:
+            return nullcontext()
+        return _Stage(self, name)
+
+    def add(self, name: str, wall: float, cpu: float, count: int = 1):
+        """Add timings to a stage.
+
+        Args:
+            name (str): Name of the stage
+            wall (float): Wall time (s)
+            cpu (float): CPU time (s)
+            count (int, optional): Number of calls. Defaults to 1.
+        """
+        if name not in self.stats:
+            self.stats[name] = {'wall': 0., 'cpu': 0., 'count': 0}
+        self.stats[name]['wall'] += wall
+        self.stats[name]['cpu'] += cpu
+        self.stats[name]['count'] += count
+
+    def merge(self, stats: dict):
+        """Merge the statistics of another profiler, e.g. of a worker.
+
+        Args:
+            stats (dict): `stats` attribute of another profiler
+        """
+        for name, stat in stats.items():
+            self.add(name, stat['wall'], stat['cpu'], stat['count'])
+
+
+NO_PROFILER = StageProfiler(enabled=False)
+
+
+def save_profile(path: str, stats: dict, **metadata):
+    """Save the statistics of a profiler in JSON format.
+
+    Args:
+        path (str): Path of the JSON file
+        stats (dict): `stats` attribute of a profiler
+        **metadata: Other information on the run stored along the stages
+    """
+    stages = {}
+    for name, stat in sorted(stats.items(),
+                             key=lambda item: -item[1]['wall']):
+        stages[name] = dict(stat)
+        stages[name]['wall_per_call'] = stat['wall'] / max(stat['count'], 1)
+        stages[name]['cpu_per_call'] = stat['cpu'] / max(stat['count'], 1)
+
+    with open(path, 'w') as f:
+        json.dump({'stages': stages, **metadata}, f, indent=2)
@@ -0,0 +1,168 @@
+# ========================================
+# FileName: progress.py
+# Date: 19 oct. 2026 - 13:55
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Progress reporting of Monte-Carlo
+#        simulations through a single
+#        writer thread
+# =========================================
+
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from tqdm import tqdm
+
+# Number of trials a worker accumulates before reporting them
+REPORT_EVERY = 10
+
+
+def write_atomic(path: str, content: str):
+    """Write a file atomically: readers never see a partial file.
+
+    Args:
+        path (str): Path of the file
+        content (str): Content of the file
+    """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+class ProgressMonitor:
+    """Track the number of completed trials of a simulation.
+
+    Workers put their numbers of completed trials in `queue`. A single
+    thread of the main process consumes them, updates a tqdm bar and
+    rewrites, at most every `min_interval` seconds, two files of the
+    storage folder:
+    * progress.txt in the format parsed by Qanat: `count_total=<total>`
+      followed by the number of completed trials and, at the end of a
+      successful simulation only, `finished`,
+    * progress.json with the completed and total numbers of trials,
+      the rate in trials per second, the estimated remaining time and the
+      status of the simulation: 'running', 'finished', 'failed' or
+      'interrupted'.
+
+    Args:
+        storage_path (str): Folder where the progress files are written
+        total (int): Total number of trials
+        min_interval (float, optional): Minimum time (s) between two
+            writes of the progress files. Defaults to 2.
+        shared (bool, optional): Whether the queue is shared with other
+            processes, in which case it is served by a
+            multiprocessing.Manager. Defaults to True.
+    """
+
+    def __init__(self, storage_path: str, total: int,
+                 min_interval: float = 2., shared: bool = True):
+        self.storage_path = storage_path
+        self.total = total
+        self.min_interval = min_interval
+        self.done = 0
+
+        if shared:
+            self._manager = multiprocessing.Manager()
+            self.queue = self._manager.Queue()
+        else:
+            self._manager = None
+            self.queue = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """Write the initial progress files and start the writer thread."""
+        self._start_time = time.monotonic()
+        self._bar = tqdm(total=self.total, unit='trial')
+        self._write()
+        self._thread.start()
+
+    def close(self, finished: bool = True, status: str = None):
+        """Consume the remaining reports, stop the writer thread and write
+        the final state of the simulation.
+
+        Args:
+            finished (bool, optional): Whether the simulation completed.
+                Otherwise progress.txt is not marked as finished, so that
+                Qanat does not report the run as complete.
+                Defaults to True.
+            status (str, optional): Status stored in progress.json.
+                Defaults to None, 'finished' or 'failed'.
+        """
+        self._stop.set()
+        self._thread.join()
+        self._consume()
+        self._bar.close()
+        if status is None:
+            status = 'finished' if finished else 'failed'
+        self._write(finished=finished, status=status)
+        if self._manager is not None:
+            self._manager.shutdown()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        elif issubclass(exc_type, KeyboardInterrupt):
+            self.close(finished=False, status='interrupted')
+        else:
+            self.close(finished=False)
+        return False
+
+    def _consume(self, timeout: float = None) -> int:
+        """Consume the reports available in the queue.
+
+        Args:
+            timeout (float, optional): Time to wait for a first report.
+                Defaults to None, do not wait.
+
+        Returns:
+            int: Number of completed trials consumed
+        """
+        count = 0
+        try:
+            if timeout is not None:
+                count += self.queue.get(timeout=timeout)
+            while True:
+                count += self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        if count > 0:
+            self.done += count
+            self._bar.update(count)
+        return count
+
+    def _run(self):
+        last_write = time.monotonic()
+        while not self._stop.is_set():
+            self._consume(timeout=0.2)
+            if time.monotonic() - last_write >= self.min_interval:
+                self._write()
+                last_write = time.monotonic()
+
+    def _write(self, finished: bool = False, status: str = 'running'):
+        elapsed = time.monotonic() - self._start_time
+        rate = self.done / elapsed if elapsed > 0 else 0.
+        eta = (self.total - self.done) / rate if rate > 0 else None
+
+        content = f'count_total={self.total}\n{self.done}\n'
+        if finished:
+            content += 'finished'
+        write_atomic(os.path.join(self.storage_path, 'progress.txt'),
+                     content)
+        write_atomic(os.path.join(self.storage_path, 'progress.json'),
+                     json.dumps({'done': self.done,
+                                 'total': self.total,
+                                 'elapsed': elapsed,
+                                 'trials_per_second': rate,
+                                 'eta': eta,
+                                 'finished': finished,
+                                 'status': status}))
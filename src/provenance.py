@@ -0,0 +1,188 @@
+# ========================================
+# FileName: provenance.py
+# Date: 19 oct. 2026 - 15:30
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Scenario used by the runs, from
+#        the snapshot taken at compute time
+#        or from git for older runs
+# =========================================
+
+import hashlib
+import json
+import os
+import subprocess
+from functools import lru_cache
+import yaml
+
+# File of the folder of a run holding the snapshot of its scenario
+PROVENANCE_FILE = 'scenario.json'
+SCENARIO_EXTENSIONS = ('.yaml', '.yml', '.py')
+
+
+def snapshot_scenario(storage_path: str, config_file: str,
+                      scenario_digest: str = None):
+    """Copy the scenario file of a run into its folder, with its digest.
+
+    Args:
+        storage_path (str): Folder of the run
+        config_file (str): Path of the scenario file
+        scenario_digest (str, optional): Digest of the content of the
+            scenario, see `Scenario.digest`. Defaults to None.
+    """
+    with open(config_file, 'rb') as f:
+        content = f.read()
+    snapshot = {'path': config_file,
+                'sha256': hashlib.sha256(content).hexdigest(),
+                'scenario_digest': scenario_digest,
+                'content': content.decode()}
+    with open(os.path.join(storage_path, PROVENANCE_FILE), 'w') as f:
+        json.dump(snapshot, f, indent=2)
+
+
+def read_snapshot(storage_path: str) -> dict:
+    """Snapshot of the scenario of a run, None if it was not taken."""
+    path = os.path.join(storage_path, PROVENANCE_FILE)
+    if not os.path.isfile(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def _read_yaml(path: str) -> dict:
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+def group_folders(storage_path: str) -> list:
+    """Folders of the groups of a run, or the run folder itself when it
+    has a single group or is a group folder."""
+    if os.path.basename(os.path.normpath(storage_path)).startswith('group_'):
+        return [storage_path]
+    groups = sorted(
+            (f for f in os.listdir(storage_path) if f.startswith('group_')
+             and os.path.isdir(os.path.join(storage_path, f))),
+            key=lambda f: int(f.split('_')[1]))
+    if len(groups) == 0:
+        return [storage_path]
+    return [os.path.join(storage_path, f) for f in groups]
+
+
+def _run_folder(group_folder: str) -> tuple:
+    """Folder of the run of a group and number of the group."""
+    name = os.path.basename(os.path.normpath(group_folder))
+    if name.startswith('group_'):
+        return os.path.dirname(os.path.normpath(group_folder)), \
+            int(name.split('_')[1])
+    return group_folder, 0
+
+
+def run_config(group_folder: str) -> tuple:
+    """Commit of a Qanat run and path of the scenario file of one of its
+    groups, from info.yaml and group_info.yaml (or the commands of the
+    run).
+
+    Args:
+        group_folder (str): Folder of the group, or of the run when it has
+            a single group
+
+    Returns:
+        tuple: (commit sha, path of the scenario file relative to the
+            repository, None if not found)
+    """
+    run_folder, group_id = _run_folder(group_folder)
+    info = _read_yaml(os.path.join(run_folder, 'info.yaml'))
+
+    config_file = None
+    group_info_file = os.path.join(group_folder, 'group_info.yaml')
+    if os.path.isfile(group_info_file):
+        parameters = _read_yaml(group_info_file).get('parameters', {})
+        config_file = parameters.get('pos_0')
+    if config_file is None and 'commands' in info:
+        # Only argument of the command with the extension of a scenario
+        # besides the executed script
+        config_file = next(
+                (argument for argument in info['commands'][group_id][2:]
+                 if str(argument).endswith(SCENARIO_EXTENSIONS)), None)
+    return info['commit_sha'], config_file
+
+
+def git_show_batch(objects: list, repo_dir: str = '.') -> list:
+    """Content of several files at given commits, read by a single
+    `git cat-file --batch` process.
+
+    Args:
+        objects (list): (commit sha, path relative to the repository)
+        repo_dir (str, optional): Folder of the repository.
+            Defaults to '.'.
+
+    Returns:
+        list: Content of each file, None if it is not found
+    """
+    if len(objects) == 0:
+        return []
+    requests = ''.join(f'{commit}:{path}\n' for commit, path in objects)
+    output = subprocess.run(['git', 'cat-file', '--batch'], cwd=repo_dir,
+                            input=requests.encode(), capture_output=True,
+                            check=True).stdout
+    contents = []
+    position = 0
+    for _ in objects:
+        end = output.index(b'\n', position)
+        header = output[position:end].split()
+        position = end + 1
+        if len(header) != 3:
+            # "<object> missing" or "<object> ambiguous"
+            contents.append(None)
+            continue
+        size = int(header[2])
+        contents.append(output[position:position + size].decode())
+        position += size + 1
+    return contents
+
+
+def scenario_configs(storage_paths: list, repo_dir: str = '.') -> list:
+    """Scenario files used by runs, from their snapshots or, for the runs
+    computed before the snapshots, from git in a single batch.
+
+    Args:
+        storage_paths (list): Folders of runs or of groups of runs. The
+            runs with several groups are expanded to all their groups.
+        repo_dir (str, optional): Folder of the repository.
+            Defaults to '.'.
+
+    Returns:
+        list: For each group, dictionary with the folder (`storage_path`),
+            the path of the scenario file (`path`), the commit of the run
+            (`commit_sha`, None for snapshots of runs outside of Qanat),
+            its content (`content`, None if not found) and where it was
+            found (`source`: 'snapshot', 'git' or None)
+    """
+    configs = []
+    for storage_path in storage_paths:
+        for folder in group_folders(storage_path):
+            snapshot = read_snapshot(folder)
+            config = {'storage_path': folder, 'path': None,
+                      'commit_sha': None, 'content': None, 'source': None}
+            # Runs outside of Qanat have no info.yaml
+            if os.path.isfile(os.path.join(_run_folder(folder)[0],
+                                           'info.yaml')):
+                config['commit_sha'], config['path'] = run_config(folder)
+            if snapshot is not None:
+                config.update(path=snapshot['path'],
+                              content=snapshot['content'],
+                              source='snapshot')
+            configs.append(config)
+
+    missing = [config for config in configs if config['content'] is None
+               and config['commit_sha'] is not None
+               and config['path'] is not None]
+    contents = git_show_batch(
+            [(config['commit_sha'], config['path']) for config in missing],
+            repo_dir)
+    for config, content in zip(missing, contents):
+        if content is not None:
+            config.update(content=content, source='git')
+    return configs
@@ -0,0 +1,207 @@
+# ========================================
+# FileName: result_cache.py
+# Date: 19 oct. 2026 - 10:05
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Content-addressed cache of the
+#        results of the trials, reused
+#        across runs
+# =========================================
+
+import hashlib
+import json
+import os
+import re
+import sys
+import numpy as np
+
+from src.montecarlo import stack_results
+from src.profiling import StageProfiler
+
+# Folder of the cached trials, shared by all the runs
+RESULT_CACHE = os.environ.get(
+        'RESULT_CACHE',
+        os.path.join(os.path.expanduser('~'), '.cache', 'qanat_results'))
+SEGMENT_PATTERN = re.compile(r'^trials_(\d+)_(\d+)\.npz$')
+
+
+def loaded_sources(script: str, package: str = 'src') -> list:
+    """Source files a simulation depends on: the script and the modules of
+    the package it imported.
+
+    Args:
+        script (str): Path of the script
+        package (str, optional): Name of the package. Defaults to 'src'.
+
+    Returns:
+        list: Paths of the files
+    """
+    modules = [module for name, module in sys.modules.items()
+               if name.startswith(f'{package}.') and
+               getattr(module, '__file__', None) is not None]
+    return [os.path.abspath(script)] + \
+        sorted(module.__file__ for module in modules)
+
+
+def result_fingerprint(parameters: dict, sources: list) -> str:
+    """Digest of what the results of the trials depend on, whatever the
+    trials range.
+
+    Args:
+        parameters (dict): Parameters of the simulation (scenario digest,
+            seed, options changing the outputs of the trials), serializable
+            to JSON
+        sources (list): Source files of the simulation
+
+    Returns:
+        str: SHA-256 hexadecimal digest
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(parameters, sort_keys=True,
+                             default=str).encode())
+    for path in sources:
+        digest.update(os.path.basename(path).encode())
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Results of the trials of a simulation, stored by segments of
+    consecutive trials in a folder named after the fingerprint of the
+    simulation.
+
+    The trials of a segment are drawn from generators seeded by their
+    number, so a trial has the same results whatever the range it was run
+    in: the segments are sliced and combined to cover other ranges.
+
+    Args:
+        fingerprint (str): Fingerprint of the simulation, see
+            `result_fingerprint`
+        cache_dir (str, optional): Folder of the cache.
+            Defaults to RESULT_CACHE.
+    """
+
+    def __init__(self, fingerprint: str, cache_dir: str = None):
+        if cache_dir is None:
+            cache_dir = RESULT_CACHE
+        self.fingerprint = fingerprint
+        self.path = os.path.join(cache_dir, fingerprint)
+
+    def segments(self) -> list:
+        """Cached segments as (first trial, last trial, path), sorted."""
+        if not os.path.isdir(self.path):
+            return []
+        segments = []
+        for filename in os.listdir(self.path):
+            match = SEGMENT_PATTERN.match(filename)
+            if match is not None:
+                segments.append((int(match.group(1)), int(match.group(2)),
+                                 os.path.join(self.path, filename)))
+        return sorted(segments)
+
+    def plan(self, trials_range: list) -> tuple:
+        """Split a range of trials into the parts found in the cache and
+        the missing ones.
+
+        Args:
+            trials_range (list): First and last trial numbers (included)
+
+        Returns:
+            tuple: (cached parts as (first, last, path) in order, missing
+                ranges as [first, last])
+        """
+        segments = self.segments()
+        cached, missing = [], []
+        trial, last = trials_range
+        while trial <= last:
+            # Segment covering the current trial that goes the furthest
+            covering = [segment for segment in segments
+                        if segment[0] <= trial <= segment[1]]
+            if len(covering) > 0:
+                segment = max(covering, key=lambda segment: segment[1])
+                end = min(segment[1], last)
+                cached.append((trial, end, segment[2]))
+            else:
+                starts = [segment[0] for segment in segments
+                          if segment[0] > trial]
+                end = min(starts + [last + 1]) - 1
+                missing.append([trial, end])
+            trial = end + 1
+        return cached, missing
+
+    def load(self, first: int, last: int, path: str) -> dict:
+        """Results of a part of a cached segment.
+
+        Args:
+            first (int): First trial number
+            last (int): Last trial number (included)
+            path (str): Path of the segment
+
+        Returns:
+            dict: For each output, array of shape (n_trials, ...)
+        """
+        with np.load(path) as data:
+            offset = first - int(data['trial_numbers'][0])
+            return {name: data[name][offset:offset + last - first + 1]
+                    for name in data.files if name != 'trial_numbers'}
+
+    def store(self, trials_range: list, trials: dict):
+        """Add a segment of trials to the cache.
+
+        Args:
+            trials_range (list): First and last trial numbers (included)
+            trials (dict): For each output, array of shape (n_trials, ...)
+        """
+        os.makedirs(self.path, exist_ok=True)
+        path = os.path.join(self.path,
+                            'trials_{}_{}.npz'.format(*trials_range))
+        # Written to a temporary file renamed at once, as concurrent runs
+        # may share the cache
+        temporary = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez(temporary, **trials,
+                 trial_numbers=np.arange(trials_range[0],
+                                         trials_range[1] + 1))
+        os.replace(temporary, path)
+
+
+def run_cached(run, trials_range: list, cache: ResultCache = None) -> tuple:
+    """Run the trials of a range which are not in the cache, and combine
+    them with the cached ones.
+
+    Args:
+        run (callable): Called as `run(trials_range)` for each missing
+            range, returns (results of the trials ordered by trial number,
+            statistics of the profiler), as `run_montecarlo`
+        trials_range (list): First and last trial numbers (included)
+        cache (ResultCache, optional): Cache of the simulation. Defaults to
+            None, every trial is run and nothing is stored.
+
+    Returns:
+        tuple: (for each output, array of shape (n_trials, ...) ordered by
+            trial number, statistics of the profiler, number of trials
+            read from the cache)
+    """
+    if cache is None:
+        cached, missing = [], [list(trials_range)]
+    else:
+        cached, missing = cache.plan(trials_range)
+
+    profiler = StageProfiler()
+    parts = []
+    for missing_range in missing:
+        results, stats = run(missing_range)
+        trials = stack_results(results)
+        profiler.merge(stats)
+        if cache is not None:
+            cache.store(missing_range, trials)
+        parts.append((missing_range[0], trials))
+    for first, last, path in cached:
+        parts.append((first, cache.load(first, last, path)))
+
+    parts = [trials for _, trials in sorted(parts, key=lambda x: x[0])]
+    stacked = {name: np.concatenate([trials[name] for trials in parts])
+               for name in parts[0]}
+    n_cached = sum(last - first + 1 for first, last, _ in cached)
+    return stacked, profiler.stats, n_cached
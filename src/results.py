@@ -0,0 +1,145 @@
+# ========================================
+# FileName: results.py
+# Date: 19 oct. 2026 - 09:12
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Loading and aggregation of the
+#        results of Monte-Carlo runs
+# =========================================
+
+import os
+import pickle
+import re
+import numpy as np
+
+from src.variance_reduction import merge_states, summarize_state
+
+GROUP_PATTERN = re.compile(r'^group_\d+$')
+
+
+def find_group_folders(storage_path: str) -> list:
+    """Find the folders containing the results of a run.
+
+    When several parameters have been run, Qanat stores each of them in a
+    subfolder named `group_<k>`. Otherwise the results are directly in the
+    storage folder.
+
+    Args:
+        storage_path (str): Path to the storage folder of the run
+
+    Returns:
+        list: Folders containing a results file, ordered by group number
+    """
+    groups = [f for f in os.listdir(storage_path)
+              if GROUP_PATTERN.match(f) is not None
+              and os.path.isdir(os.path.join(storage_path, f))]
+    if len(groups) == 0:
+        return [storage_path]
+    return [os.path.join(storage_path, f) for f in
+            sorted(groups, key=lambda f: int(f.split('_')[1]))]
+
+
+def load_results(folder: str) -> dict:
+    """Load the pickled results of a Monte-Carlo run.
+
+    Args:
+        folder (str): Folder where results.pkl is located
+
+    Returns:
+        dict: Results of the run
+    """
+    with open(os.path.join(folder, 'results.pkl'), 'rb') as f:
+        return pickle.load(f)
+
+
+def n_trials_per_n(results: dict) -> np.ndarray:
+    """Number of trials of a run for each number of samples.
+
+    Args:
+        results (dict): Results of the run
+
+    Returns:
+        np.ndarray: Number of trials for each number of samples
+    """
+    if 'n_trials_per_n' in results:
+        return np.asarray(results['n_trials_per_n'])
+    trials_range = results['trials_range']
+    return np.full(len(results['n_samples_list']),
+                   trials_range[1] - trials_range[0] + 1)
+
+
+def reduce_results(results_list: list) -> dict:
+    """Merge the results of runs done on disjoint ranges of trials from
+    their accumulator states.
+
+    The merge is exact: the statistics are those a single run on all the
+    trials would have produced.
+
+    Args:
+        results_list (list): Results dictionaries of the runs, with a
+            `state` entry
+
+    Returns:
+        dict: Merged results. The ranges of trials of the runs are stored
+            under `shards`.
+    """
+    ranges = sorted(results['trials_range'] for results in results_list)
+    for previous, current in zip(ranges[:-1], ranges[1:]):
+        if current[0] <= previous[1]:
+            raise ValueError(f'Overlapping ranges of trials: {previous} '
+                             f'and {current}')
+
+    state = merge_states([results['state'] for results in results_list])
+    reduced = dict(results_list[0])
+    reduced.update(summarize_state(state, reduced.get('expectations')))
+    reduced['state'] = state
+    reduced['trials_range'] = [ranges[0][0], ranges[-1][1]]
+    reduced['shards'] = ranges
+    return reduced
+
+
+def aggregate_results(results_list: list, names: list) -> dict:
+    """Aggregate the results of several runs done on different
+    ranges of trials.
+
+    If the runs stored their accumulator states, they are merged exactly
+    (see `reduce_results`). Otherwise, the keys `<name>_mean` and
+    `<name>_std` of the results are combined with the pooled formulas,
+    weighted by the number of trials of each run.
+
+    Args:
+        results_list (list): Results dictionaries of the runs
+        names (list): Names of the aggregated statistics,
+            e.g. ['mse_covariance']
+
+    Returns:
+        dict: Aggregated `<name>_mean` and `<name>_std` as well as
+            `n_samples_list` and `covariance` of the last run
+    """
+    aggregated = {'n_samples_list': results_list[-1]['n_samples_list'],
+                  'covariance': results_list[-1]['covariance']}
+    if all('state' in results for results in results_list):
+        reduced = reduce_results(results_list)
+        for name in names:
+            aggregated[f'{name}_mean'] = reduced[f'{name}_mean']
+            aggregated[f'{name}_std'] = reduced[f'{name}_std']
+        return aggregated
+
+    counts = np.array([n_trials_per_n(results) for results in results_list])
+    total = np.sum(counts, axis=0)
+    for name in names:
+        means = np.array([results[f'{name}_mean']
+                          for results in results_list])
+        stds = np.array([results[f'{name}_std']
+                         for results in results_list])
+        mean = np.sum(counts * means, axis=0) / total
+
+        # The variance of the union is the average of the variances of
+        # the runs plus the variance of their means
+        variance = np.sum(counts * (stds**2 + (means - mean)**2),
+                          axis=0) / total
+
+        aggregated[f'{name}_mean'] = mean
+        aggregated[f'{name}_std'] = np.sqrt(variance)
+    return aggregated
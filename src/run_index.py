@@ -0,0 +1,278 @@
+# ========================================
+# FileName: run_index.py
+# Date: 19 oct. 2026 - 11:20
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: SQLite catalogue of the results
+#        of the Monte-Carlo runs, queried
+#        without loading them
+# =========================================
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+import numpy as np
+
+from src.provenance import read_snapshot
+from src.results import load_results
+
+# Catalogue of the results of the project. The compute scripts only write
+# to it with --index, or for every run when the environment variable is set
+RUN_INDEX = os.environ.get(
+        'RUN_INDEX',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                     'results', 'run_index.db'))
+AUTO_INDEX = 'RUN_INDEX' in os.environ
+RESULTS_FILE = 'results.pkl'
+
+# Columns of the catalogue, one row per folder of results
+COLUMNS = {
+    'folder': 'TEXT PRIMARY KEY',
+    'run_folder': 'TEXT',
+    'experiment': 'TEXT',
+    'scenario_digest': 'TEXT',
+    'scenario_path': 'TEXT',
+    'n_features': 'INTEGER',
+    'covariance_kind': 'TEXT',
+    'covariance_trace': 'REAL',
+    'n_samples_list': 'TEXT',
+    'n_samples_min': 'INTEGER',
+    'n_samples_max': 'INTEGER',
+    'n_trials': 'INTEGER',
+    'trials_first': 'INTEGER',
+    'trials_last': 'INTEGER',
+    'seed': 'INTEGER',
+    'estimators': 'TEXT',
+    'metrics': 'TEXT',
+    'analytic': 'INTEGER',
+    'mse_covariance_mean': 'TEXT',
+    'results_mtime': 'REAL',
+    'indexed_at': 'REAL',
+}
+
+
+def covariance_kind(covariance: np.ndarray) -> str:
+    """Structure of a covariance: 'identity', 'diagonal' or 'correlated'.
+    """
+    covariance = np.asarray(covariance)
+    if np.allclose(covariance, np.eye(len(covariance))):
+        return 'identity'
+    if np.allclose(covariance, np.diag(np.diag(covariance))):
+        return 'diagonal'
+    return 'correlated'
+
+
+def _connect(index_path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    # Runs completing at the same time wait for each other
+    connection = sqlite3.connect(index_path, timeout=60)
+    connection.row_factory = sqlite3.Row
+    columns = ', '.join(f'{name} {kind}' for name, kind in COLUMNS.items())
+    connection.execute(f'CREATE TABLE IF NOT EXISTS runs ({columns})')
+    return connection
+
+
+def _run_folder(folder: str) -> str:
+    """Folder of the Qanat run of a folder of results, the folder itself
+    when it is not a group."""
+    if os.path.basename(folder).startswith('group_'):
+        return os.path.dirname(folder)
+    return folder
+
+
+def describe_results(folder: str, results: dict,
+                     experiment: str = None) -> dict:
+    """Row of the catalogue of the results of a folder.
+
+    Args:
+        folder (str): Folder of results.pkl
+        results (dict): Results of the run
+        experiment (str, optional): Name of the experiment.
+            Defaults to None.
+
+    Returns:
+        dict: Values of COLUMNS
+    """
+    folder = os.path.abspath(folder)
+    covariance = np.asarray(results['covariance'])
+    n_samples_list = np.asarray(results['n_samples_list'])
+    trials_range = results.get('trials_range', [None, None])
+    scenario_path = None
+    snapshot = read_snapshot(folder)
+    if snapshot is not None:
+        scenario_path = snapshot['path']
+        scenario_dir = os.path.dirname(os.path.abspath(scenario_path))
+        # Scenarios of the experiments are in experiments/<name>/scenarios
+        if experiment is None and \
+                os.path.basename(scenario_dir) == 'scenarios':
+            experiment = os.path.basename(os.path.dirname(scenario_dir))
+    mse = results.get('mse_covariance_mean')
+    results_file = os.path.join(folder, RESULTS_FILE)
+    return {
+        'folder': folder,
+        'run_folder': _run_folder(folder),
+        'experiment': experiment,
+        'scenario_digest': results.get('scenario_digest'),
+        'scenario_path': scenario_path,
+        'n_features': int(covariance.shape[0]),
+        'covariance_kind': covariance_kind(covariance),
+        'covariance_trace': float(np.trace(covariance)),
+        'n_samples_list': json.dumps(n_samples_list.tolist()),
+        'n_samples_min': int(n_samples_list.min()),
+        'n_samples_max': int(n_samples_list.max()),
+        'n_trials': results.get('n_trials'),
+        'trials_first': trials_range[0],
+        'trials_last': trials_range[1],
+        'seed': results.get('seed'),
+        'estimators': json.dumps(results.get('estimators', [])),
+        'metrics': json.dumps(results.get('metrics', [])),
+        'analytic': int(bool(results.get('analytic', False))),
+        'mse_covariance_mean': None if mse is None else
+        json.dumps(np.asarray(mse).tolist()),
+        'results_mtime': os.path.getmtime(results_file)
+        if os.path.isfile(results_file) else None,
+        'indexed_at': time.time(),
+    }
+
+
+def index_results(folder: str, results: dict, experiment: str = None,
+                  index_path: str = None):
+    """Add or update the results of a folder in the catalogue, e.g. when
+    a run completes. The folders of shards are not indexed, their merged
+    results are.
+
+    Args:
+        folder (str): Folder of results.pkl
+        results (dict): Results of the run
+        experiment (str, optional): Name of the experiment.
+            Defaults to None.
+        index_path (str, optional): Path of the catalogue.
+            Defaults to RUN_INDEX.
+    """
+    if os.path.basename(os.path.normpath(folder)).startswith('shard_'):
+        return
+    if index_path is None:
+        index_path = RUN_INDEX
+    row = describe_results(folder, results, experiment)
+    connection = _connect(index_path)
+    try:
+        with connection:
+            connection.execute(
+                    'INSERT OR REPLACE INTO runs ({}) VALUES ({})'.format(
+                        ', '.join(row), ', '.join('?' for _ in row)),
+                    list(row.values()))
+    finally:
+        connection.close()
+
+
+def update_index(storage_paths: list, index_path: str = None) -> int:
+    """Index the results found under folders, skipping those which did
+    not change since they were indexed, e.g. the runs done before the
+    catalogue.
+
+    Args:
+        storage_paths (list): Folders searched recursively for results.pkl
+        index_path (str, optional): Path of the catalogue.
+            Defaults to RUN_INDEX.
+
+    Returns:
+        int: Number of folders indexed
+    """
+    if index_path is None:
+        index_path = RUN_INDEX
+    connection = _connect(index_path)
+    try:
+        indexed = {row['folder']: row['results_mtime'] for row in
+                   connection.execute('SELECT folder, results_mtime '
+                                      'FROM runs')}
+    finally:
+        connection.close()
+
+    count = 0
+    for storage_path in storage_paths:
+        for root, dirs, files in os.walk(storage_path):
+            # The shards are indexed through their merged results
+            dirs[:] = [d for d in dirs if not d.startswith('shard_')]
+            if RESULTS_FILE not in files:
+                continue
+            folder = os.path.abspath(root)
+            mtime = os.path.getmtime(os.path.join(folder, RESULTS_FILE))
+            if indexed.get(folder) == mtime:
+                continue
+            index_results(folder, load_results(folder),
+                          index_path=index_path)
+            count += 1
+    return count
+
+
+def query_runs(index_path: str = None, **filters) -> list:
+    """Rows of the catalogue matching the filters.
+
+    Args:
+        index_path (str, optional): Path of the catalogue.
+            Defaults to RUN_INDEX.
+        **filters: Value of columns, e.g. n_features=70,
+            covariance_kind='correlated'
+
+    Returns:
+        list: Dictionaries of the matching rows, ordered by folder. The
+            lists (numbers of samples, estimators, metrics, MSE) are
+            decoded.
+    """
+    if index_path is None:
+        index_path = RUN_INDEX
+    unknown = set(filters) - set(COLUMNS)
+    if len(unknown) > 0:
+        raise ValueError(f'Unknown columns {sorted(unknown)}, expected '
+                         f'some of {list(COLUMNS)}')
+    where = ' AND '.join(f'{name} = ?' for name in filters)
+    query = 'SELECT * FROM runs' + (f' WHERE {where}' if where else '') + \
+        ' ORDER BY folder'
+    connection = _connect(index_path)
+    try:
+        rows = [dict(row) for row in
+                connection.execute(query, list(filters.values()))]
+    finally:
+        connection.close()
+    for row in rows:
+        for name in ['n_samples_list', 'estimators', 'metrics',
+                     'mse_covariance_mean']:
+            if row[name] is not None:
+                row[name] = json.loads(row[name])
+    return rows
+
+
+def _parse_filter(text: str) -> tuple:
+    name, value = text.split('=', 1)
+    if COLUMNS.get(name) == 'INTEGER':
+        return name, int(value)
+    if COLUMNS.get(name) == 'REAL':
+        return name, float(value)
+    return name, value
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+            description='Index the results of the runs and query them.',
+            epilog='Example: python -m src.run_index --update results '
+            '--where n_features=70 covariance_kind=identity')
+    parser.add_argument('--index', type=str, default=RUN_INDEX,
+                        help='Path of the catalogue.')
+    parser.add_argument('--update', type=str, nargs='+', default=[],
+                        help='Folders searched for results to index.')
+    parser.add_argument('--where', type=str, nargs='+', default=[],
+                        help='Filters <column>=<value> of the query.')
+    args = parser.parse_args()
+
+    if len(args.update) > 0:
+        print('Indexed {} folders'.format(
+            update_index(args.update, args.index)))
+    for row in query_runs(args.index,
+                          **dict(map(_parse_filter, args.where))):
+        print('{folder}: p={n_features} ({covariance_kind}), '
+              'n={n_samples_min}..{n_samples_max}, trials {trials_first}-'
+              '{trials_last}, seed {seed}'.format(**row))
@@ -0,0 +1,131 @@
+# ========================================
+# FileName: sample_store.py
+# Date: 19 oct. 2026 - 14:10
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Binary storage of generated
+#        samples with a metadata sidecar
+# =========================================
+
+import json
+import os
+import numpy as np
+
+SAMPLES_FILE = 'samples.npy'
+PARAMETERS_FILE = 'parameters.json'
+# Files written before the binary storage
+LEGACY_SAMPLES_FILE = 'samples.csv'
+LEGACY_PARAMETERS_FILE = 'parameters.txt'
+
+
+def save_parameters(storage_path: str, parameters: dict):
+    """Write the metadata sidecar of the samples of a folder.
+
+    Args:
+        storage_path (str): Folder of the samples
+        parameters (dict): Parameters of the sampling. The arrays are
+            stored as nested lists.
+    """
+    metadata = {name: value.tolist() if isinstance(value, np.ndarray)
+                else value for name, value in parameters.items()}
+    with open(os.path.join(storage_path, PARAMETERS_FILE), 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+
+def save_samples(storage_path: str, samples: np.ndarray, parameters: dict,
+                 export_csv: bool = False):
+    """Save samples in the .npy format with their metadata sidecar.
+
+    Args:
+        storage_path (str): Folder of the samples
+        samples (np.ndarray): Samples of shape (n_samples, n_features)
+        parameters (dict): Parameters of the sampling
+        export_csv (bool, optional): Whether to also write the samples as
+            text in samples.csv. Defaults to False.
+    """
+    np.save(os.path.join(storage_path, SAMPLES_FILE), samples)
+    save_parameters(storage_path, {**parameters,
+                                   'shape': list(samples.shape),
+                                   'dtype': str(samples.dtype)})
+    if export_csv:
+        np.savetxt(os.path.join(storage_path, LEGACY_SAMPLES_FILE),
+                   samples, delimiter=',')
+
+
+def open_samples(storage_path: str, n_samples: int, n_features: int,
+                 dtype=np.float64) -> np.memmap:
+    """Create samples.npy as a memory map, to be filled block by block
+    without holding all the samples in memory.
+
+    Args:
+        storage_path (str): Folder of the samples
+        n_samples (int): Number of samples
+        n_features (int): Dimension of the samples
+        dtype (optional): Type of the samples. Defaults to np.float64.
+
+    Returns:
+        np.memmap: Writable samples of shape (n_samples, n_features)
+    """
+    return np.lib.format.open_memmap(
+            os.path.join(storage_path, SAMPLES_FILE), mode='w+',
+            dtype=dtype, shape=(n_samples, n_features))
+
+
+def load_parameters(storage_path: str) -> dict:
+    """Read the parameters of the samples of a folder.
+
+    Args:
+        storage_path (str): Folder of the samples
+
+    Returns:
+        dict: Parameters, with the mean and covariance as arrays
+    """
+    json_path = os.path.join(storage_path, PARAMETERS_FILE)
+    if os.path.isfile(json_path):
+        with open(json_path) as f:
+            parameters = json.load(f)
+    else:
+        parameters = _load_legacy_parameters(storage_path)
+    parameters['mean'] = np.asarray(parameters['mean'], dtype=float)
+    parameters['cov'] = np.asarray(parameters['cov'], dtype=float)
+    return parameters
+
+
+def load_samples(storage_path: str, mmap_mode: str = 'r') -> tuple:
+    """Load the samples of a folder and their parameters.
+
+    The .npy samples are memory-mapped, so that they are read lazily.
+    Folders written with the text format are still read.
+
+    Args:
+        storage_path (str): Folder of the samples
+        mmap_mode (str, optional): Memory-map mode of np.load.
+            Defaults to 'r'.
+
+    Returns:
+        tuple: (samples of shape (n_samples, n_features), parameters)
+    """
+    npy_path = os.path.join(storage_path, SAMPLES_FILE)
+    if os.path.isfile(npy_path):
+        samples = np.load(npy_path, mmap_mode=mmap_mode)
+    else:
+        samples = np.loadtxt(
+                os.path.join(storage_path, LEGACY_SAMPLES_FILE),
+                delimiter=',', ndmin=2)
+    return samples, load_parameters(storage_path)
+
+
+def _load_legacy_parameters(storage_path: str) -> dict:
+    """Parse parameters.txt: mean, covariance, number of samples and seed
+    on the successive lines."""
+    with open(os.path.join(storage_path, LEGACY_PARAMETERS_FILE)) as f:
+        lines = f.readlines()
+    mean = [float(x) for x in
+            lines[0].replace('[', '').replace(']', '').split(',')]
+    cov = [float(x) for x in
+           lines[1].replace('[', '').replace(']', '').split(',')]
+    return {'mean': mean,
+            'cov': np.reshape(cov, (len(mean), len(mean))),
+            'n_samples': int(lines[2]),
+            'seed': int(lines[3])}
@@ -0,0 +1,174 @@
+# ========================================
+# FileName: sample_summary.py
+# Date: 19 oct. 2026 - 09:20
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Single streaming pass over large
+#        2D samples: mean, covariance,
+#        histogram and reservoir subsample
+# =========================================
+
+import os
+import numpy as np
+
+from src.accumulators import RunningComoments
+
+# Number of samples read at once from the (memory-mapped) samples
+BLOCK_SIZE = 2**20
+# File of a folder holding the summary computed while sampling
+SUMMARY_FILE = 'summary.npz'
+
+
+def default_bounds(mean: np.ndarray, cov: np.ndarray,
+                   n_std: float = 5.) -> np.ndarray:
+    """Bounds of the histogram of samples of a Gaussian distribution.
+
+    Args:
+        mean (np.ndarray): Mean of the distribution
+        cov (np.ndarray): Covariance of the distribution
+        n_std (float, optional): Half-width of the bounds in standard
+            deviations of each coordinate. Defaults to 5.
+
+    Returns:
+        np.ndarray: Lower and upper bounds of each coordinate, of shape
+            (n_features, 2)
+    """
+    half_width = n_std * np.sqrt(np.diag(cov))
+    return np.stack([mean - half_width, mean + half_width], axis=1)
+
+
+class SampleSummary:
+    """Statistics of samples accumulated block by block: mean and
+    covariance, 2D histogram and a uniform subsample kept by reservoir
+    sampling.
+
+    Args:
+        bounds (np.ndarray): Bounds of the histogram, of shape (2, 2).
+            Samples outside are not counted in the histogram.
+        bins (int, optional): Number of bins of the histogram along each
+            coordinate. Defaults to 200.
+        reservoir_size (int, optional): Size of the subsample.
+            Defaults to 1000.
+        seed (int, optional): Seed of the reservoir sampling.
+            Defaults to 0.
+    """
+
+    def __init__(self, bounds: np.ndarray, bins: int = 200,
+                 reservoir_size: int = 1000, seed: int = 0):
+        self.comoments = RunningComoments(1, 2)
+        self.edges = [np.linspace(low, high, bins + 1)
+                      for low, high in bounds]
+        self.histogram = np.zeros((bins, bins), dtype=np.int64)
+        self.reservoir = np.zeros((reservoir_size, 2))
+        self.count = 0
+        self.seed = seed
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, block: np.ndarray):
+        """Add a block of samples.
+
+        Args:
+            block (np.ndarray): Samples of shape (n_block, 2)
+        """
+        block = np.asarray(block, dtype=float)
+        self.comoments.update(block[:, np.newaxis])
+        self.histogram += np.histogram2d(
+            block[:, 0], block[:, 1], bins=self.edges)[0].astype(np.int64)
+
+        # Reservoir sampling (algorithm R): the sample of global index t
+        # replaces a random element with probability size / (t + 1)
+        size = len(self.reservoir)
+        indexes = self.count + np.arange(len(block))
+        n_fill = max(min(size - self.count, len(block)), 0)
+        self.reservoir[self.count:self.count + n_fill] = block[:n_fill]
+        slots = self._rng.integers(0, indexes[n_fill:] + 1)
+        kept = slots < size
+        self.reservoir[slots[kept]] = block[n_fill:][kept]
+        self.count += len(block)
+
+    @property
+    def mean(self) -> np.ndarray:
+        """Sample mean."""
+        return self.comoments.mean[0]
+
+    @property
+    def covariance(self) -> np.ndarray:
+        """Unbiased sample covariance."""
+        return self.comoments.covariance[0]
+
+    @property
+    def subsample(self) -> np.ndarray:
+        """Uniform subsample of the samples, without replacement."""
+        return self.reservoir[:min(self.count, len(self.reservoir))]
+
+
+def summarize_samples(samples: np.ndarray, bounds: np.ndarray,
+                      bins: int = 200, reservoir_size: int = 1000,
+                      seed: int = 0) -> SampleSummary:
+    """Summarize samples in a single pass over blocks of BLOCK_SIZE
+    samples, without loading them all when they are memory-mapped.
+
+    Args:
+        samples (np.ndarray): Samples of shape (n_samples, 2)
+        bounds (np.ndarray): Bounds of the histogram, of shape (2, 2)
+        bins (int, optional): Number of bins of the histogram along each
+            coordinate. Defaults to 200.
+        reservoir_size (int, optional): Size of the subsample.
+            Defaults to 1000.
+        seed (int, optional): Seed of the reservoir sampling.
+            Defaults to 0.
+
+    Returns:
+        SampleSummary: Statistics of the samples
+    """
+    summary = SampleSummary(bounds, bins, reservoir_size, seed)
+    for start in range(0, len(samples), BLOCK_SIZE):
+        summary.update(samples[start:start + BLOCK_SIZE])
+    return summary
+
+
+def save_summary(storage_path: str, summary: SampleSummary):
+    """Write the summary of the samples of a folder in summary.npz.
+
+    Args:
+        storage_path (str): Folder of the samples
+        summary (SampleSummary): Summary of all the samples
+    """
+    np.savez(os.path.join(storage_path, SUMMARY_FILE),
+             count=summary.count,
+             mean=summary.comoments.mean,
+             comoment=summary.comoments.comoment,
+             edges_x=summary.edges[0], edges_y=summary.edges[1],
+             histogram=summary.histogram,
+             reservoir=summary.reservoir,
+             seed=summary.seed)
+
+
+def load_summary(storage_path: str) -> SampleSummary:
+    """Read the summary of the samples of a folder.
+
+    Args:
+        storage_path (str): Folder of the samples
+
+    Returns:
+        SampleSummary: Summary of the samples, None if the folder has no
+            summary.npz
+    """
+    path = os.path.join(storage_path, SUMMARY_FILE)
+    if not os.path.isfile(path):
+        return None
+    with np.load(path) as data:
+        edges = [data['edges_x'], data['edges_y']]
+        summary = SampleSummary(
+                [[edge[0], edge[-1]] for edge in edges],
+                len(edges[0]) - 1, len(data['reservoir']),
+                int(data['seed']))
+        summary.edges = edges
+        summary.histogram = data['histogram']
+        summary.reservoir = data['reservoir']
+        summary.count = int(data['count'])
+        summary.comoments.count[:] = summary.count
+        summary.comoments.mean = data['mean']
+        summary.comoments.comoment = data['comoment']
+    return summary
@@ -0,0 +1,57 @@
+# ========================================
+# FileName: sampling.py
+# Date: 19 oct. 2026 - 09:05
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Sampling of multivariate
+#        Gaussian distributions
+# =========================================
+
+import numpy as np
+from scipy.stats import chi2
+
+
+def gaussian_samples(rng: np.random.Generator, mean: np.ndarray,
+                     chol: np.ndarray, n_samples: int) -> np.ndarray:
+    """Sample a multivariate Gaussian distribution from the Cholesky factor
+    of its covariance.
+
+    Args:
+        rng (np.random.Generator): Random generator
+        mean (np.ndarray): Mean of the distribution
+        chol (np.ndarray): Lower Cholesky factor of the covariance
+        n_samples (int): Number of samples
+
+    Returns:
+        np.ndarray: Samples of shape (n_samples, n_features)
+    """
+    return mean + rng.standard_normal((n_samples, len(mean))) @ chol.T
+
+
+def antithetic_gaussian_samples(rng: np.random.Generator, mean: np.ndarray,
+                                chol: np.ndarray, n_samples: int) -> tuple:
+    """Sample a pair of antithetic multivariate Gaussian datasets.
+
+    A standard Gaussian vector is z = r u with u uniform on the sphere and
+    r^2 following a chi-squared distribution, independently. The antithetic
+    vector keeps the direction u and takes the opposite quantile of the
+    radius: F(r'^2) = 1 - F(r^2), F being the chi-squared c.d.f. Flipping
+    the sign of z would be useless here as the statistics of interest are
+    even functions of the samples.
+
+    Args:
+        rng (np.random.Generator): Random generator
+        mean (np.ndarray): Mean of the distribution
+        chol (np.ndarray): Lower Cholesky factor of the covariance
+        n_samples (int): Number of samples of each dataset
+
+    Returns:
+        tuple: Two datasets of shape (n_samples, n_features)
+    """
+    n_features = len(mean)
+    z = rng.standard_normal((n_samples, n_features))
+    radius2 = np.sum(z**2, axis=1)
+    radius2_antithetic = chi2.isf(chi2.cdf(radius2, n_features), n_features)
+    z_antithetic = z * np.sqrt(radius2_antithetic / radius2)[:, None]
+    return mean + z @ chol.T, mean + z_antithetic @ chol.T
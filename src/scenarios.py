@@ -0,0 +1,266 @@
+# ========================================
+# FileName: scenarios.py
+# Date: 19 oct. 2026 - 14:45
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Declarative scenarios of the
+#        Monte-Carlo experiments and their
+#        cached artifacts
+# =========================================
+
+import hashlib
+import importlib.util
+import os
+import numpy as np
+import yaml
+from scipy.linalg import toeplitz
+
+from src.cramer_rao import crb_centered_multivariate_gaussian_basis
+
+# Folder of the artifacts of the scenarios, shared by all the runs
+SCENARIO_CACHE = os.environ.get(
+        'SCENARIO_CACHE',
+        os.path.join(os.path.expanduser('~'), '.cache', 'qanat_scenarios'))
+# Above this dimension, the bound has p(p+1)/2 x p(p+1)/2 entries too many
+# to be formed and its trace is computed in closed form
+CRB_BASIS_MAX_FEATURES = 100
+
+
+def identity_covariance(n_features: int) -> np.ndarray:
+    """Identity covariance (white noise)."""
+    return np.eye(n_features)
+
+
+def toeplitz_covariance(n_features: int, rho: float) -> np.ndarray:
+    """Toeplitz covariance of entries rho^|i-j| (AR(1) correlation)."""
+    return toeplitz(rho ** np.arange(n_features))
+
+
+def diagonal_covariance(n_features: int, values: list) -> np.ndarray:
+    """Diagonal covariance of given variances."""
+    return np.diag(np.broadcast_to(np.asarray(values, dtype=float),
+                                   (n_features,)))
+
+
+def explicit_covariance(n_features: int, matrix: list) -> np.ndarray:
+    """Covariance given entry by entry."""
+    return np.asarray(matrix, dtype=float).reshape(n_features, n_features)
+
+
+# Families of covariances: name -> function of the number of features and
+# of the other parameters of the family
+COVARIANCE_FAMILIES = {
+    'identity': identity_covariance,
+    'toeplitz': toeplitz_covariance,
+    'diagonal': diagonal_covariance,
+    'explicit': explicit_covariance,
+}
+
+
+def n_samples_grid(spec, n_features: int) -> np.ndarray:
+    """Numbers of samples of a scenario.
+
+    Args:
+        spec: Either a list of numbers of samples, or a mapping
+            {'logspace': {'start', 'stop', 'num', 'base'}} of numbers spaced
+            evenly on a log scale, truncated to integers and deduplicated.
+            The base defaults to the number of features.
+        n_features (int): Number of features of the scenario
+
+    Returns:
+        np.ndarray: Sorted numbers of samples
+    """
+    if isinstance(spec, dict) and 'logspace' in spec:
+        options = {'base': n_features, **spec['logspace']}
+        return np.unique(np.logspace(options['start'], options['stop'],
+                                     options['num'], base=options['base'],
+                                     dtype=int))
+    return np.unique(np.asarray(spec, dtype=int))
+
+
+def array_digest(*arrays) -> str:
+    """SHA-256 digest of the type, shape and content of arrays."""
+    digest = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f'{array.dtype.str}{array.shape}'.encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+class Scenario:
+    """Parameters of a Monte-Carlo experiment, with the same attributes as
+    the python config files.
+
+    Args:
+        name (str): Name of the scenario, e.g. the stem of its file
+        covariance (np.ndarray): Covariance of the distribution
+        n_samples_list (np.ndarray): Numbers of samples
+        n_trials (int): Number of trials
+        mean (np.ndarray, optional): Mean of the distribution.
+            Defaults to zeros.
+        spec (dict, optional): Declaration the scenario was built from.
+            Defaults to None.
+    """
+
+    def __init__(self, name: str, covariance: np.ndarray,
+                 n_samples_list: np.ndarray, n_trials: int,
+                 mean: np.ndarray = None, spec: dict = None):
+        self.name = name
+        self.covariance = np.asarray(covariance, dtype=float)
+        self.n_features = self.covariance.shape[0]
+        self.n_samples_list = np.asarray(n_samples_list, dtype=int)
+        self.n_trials = int(n_trials)
+        if mean is None:
+            mean = np.zeros(self.n_features)
+        self.mean = np.asarray(mean, dtype=float)
+        self.spec = spec
+
+    @property
+    def digest(self) -> str:
+        """Digest of the content of the scenario, whatever the way it is
+        written."""
+        return array_digest(self.mean, self.covariance, self.n_samples_list,
+                            np.array(self.n_trials))
+
+    def artifacts(self, crb: bool = False, cache_dir: str = None) -> dict:
+        """Cached artifacts of the scenario, see `load_artifacts`."""
+        return load_artifacts(self.covariance, self.n_samples_list, crb,
+                              cache_dir)
+
+
+def parse_scenario(spec: dict, name: str = 'scenario') -> Scenario:
+    """Build a scenario from its declaration.
+
+    Example of declaration::
+
+        n_features: 15
+        covariance:
+          family: toeplitz
+          rho: 0.75
+        n_samples:
+          logspace: {start: 1, stop: 4, num: 30}
+        n_trials: 10000
+
+    Args:
+        spec (dict): Declaration: number of features, covariance family and
+            its parameters, numbers of samples (see `n_samples_grid`),
+            number of trials and optionally the mean (zeros by default)
+        name (str, optional): Name of the scenario. Defaults to 'scenario'.
+
+    Returns:
+        Scenario: The scenario
+    """
+    n_features = int(spec['n_features'])
+    family = dict(spec['covariance'])
+    family_name = family.pop('family')
+    if family_name not in COVARIANCE_FAMILIES:
+        raise ValueError(f'Unknown covariance family {family_name}, '
+                         f'expected one of {list(COVARIANCE_FAMILIES)}')
+    covariance = COVARIANCE_FAMILIES[family_name](n_features, **family)
+    mean = spec.get('mean')
+    if mean is not None:
+        mean = np.broadcast_to(np.asarray(mean, dtype=float), (n_features,))
+    return Scenario(name, covariance,
+                    n_samples_grid(spec['n_samples'], n_features),
+                    spec['n_trials'], mean, spec)
+
+
+def load_scenario(path: str) -> Scenario:
+    """Load a scenario from a YAML declaration or a python config file.
+
+    The python files (the former format) are executed as modules named
+    after the digest of their content, so that files of the same name do
+    not collide.
+
+    Args:
+        path (str): Path to the .yaml/.yml or .py file
+
+    Returns:
+        Scenario: The scenario
+    """
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f'The scenario file {path} does not exist.')
+    name, extension = os.path.splitext(os.path.basename(path))
+    if extension in ('.yaml', '.yml'):
+        with open(path) as f:
+            return parse_scenario(yaml.safe_load(f), name)
+
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    module_spec = importlib.util.spec_from_file_location(
+            f'scenario_{digest[:16]}', path)
+    module = importlib.util.module_from_spec(module_spec)
+    module_spec.loader.exec_module(module)
+    return Scenario(name, module.covariance, module.n_samples_list,
+                    module.n_trials, getattr(module, 'mean', None))
+
+
+def crb_curve(covariance: np.ndarray, n_samples_list) -> np.ndarray:
+    """Trace of the Cramer-Rao bound of the covariance for each number of
+    samples, the bound being inversely proportional to it.
+
+    Args:
+        covariance (np.ndarray): Covariance of the distribution
+        n_samples_list (array-like): Numbers of samples
+
+    Returns:
+        np.ndarray: Trace of the bound for each number of samples
+    """
+    if covariance.shape[0] > CRB_BASIS_MAX_FEATURES:
+        # Trace of the bound of a single sample, (tr(Sigma)^2 + tr(Sigma^2))
+        crb = np.trace(covariance)**2 + np.sum(covariance**2)
+    else:
+        crb = np.trace(
+                crb_centered_multivariate_gaussian_basis(covariance, 1))
+    return crb / np.asarray(n_samples_list, dtype=float)
+
+
+def load_artifacts(covariance: np.ndarray, n_samples_list,
+                   crb: bool = False, cache_dir: str = None) -> dict:
+    """Artifacts derived from the covariance of a scenario, computed once
+    and cached in a file named after the digest of the covariance and of
+    the numbers of samples.
+
+    Args:
+        covariance (np.ndarray): Covariance of the distribution
+        n_samples_list (array-like): Numbers of samples
+        crb (bool, optional): Whether to include the trace of the
+            Cramer-Rao bound for each number of samples, computed on the
+            first request. Defaults to False.
+        cache_dir (str, optional): Folder of the cached artifacts.
+            Defaults to SCENARIO_CACHE.
+
+    Returns:
+        dict: Covariance, its Cholesky factor (`chol`), the numbers of
+            samples and if requested the bound (`crb`)
+    """
+    if cache_dir is None:
+        cache_dir = SCENARIO_CACHE
+    covariance = np.asarray(covariance, dtype=float)
+    n_samples_list = np.asarray(n_samples_list, dtype=int)
+    key = array_digest(covariance, n_samples_list)
+    path = os.path.join(cache_dir, f'{key}.npz')
+
+    artifacts = {}
+    if os.path.isfile(path):
+        with np.load(path) as data:
+            artifacts = dict(data)
+    if len(artifacts) > 0 and (not crb or 'crb' in artifacts):
+        return artifacts
+
+    artifacts = {'covariance': covariance,
+                 'chol': np.linalg.cholesky(covariance),
+                 'n_samples_list': n_samples_list,
+                 **artifacts}
+    if crb:
+        artifacts['crb'] = crb_curve(covariance, n_samples_list)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Written to a temporary file renamed at once, as runs of the same
+    # scenario may share the cache
+    temporary = f'{path}.{os.getpid()}.tmp.npz'
+    np.savez(temporary, **artifacts)
+    os.replace(temporary, path)
+    return artifacts
+
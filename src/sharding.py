@@ -0,0 +1,336 @@
+# ========================================
+# FileName: sharding.py
+# Date: 19 oct. 2026 - 14:05
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Split of a Monte-Carlo simulation
+#        into shards of trials run by a
+#        pluggable backend
+# =========================================
+
+import json
+import os
+import pickle
+import shlex
+import subprocess
+import sys
+import time
+import rich
+
+from src.progress import ProgressMonitor
+from src.results import load_results, reduce_results
+
+# Options of the compute scripts set by the coordinator for each shard,
+# with whether they take a value
+SHARD_OPTIONS = {'--trials_range_start': True,
+                 '--trials_range_end': True,
+                 '--storage_path': True,
+                 '--n_shards': True,
+                 '--shard_backend': True,
+                 '--shard_workers': True,
+                 '--reduce': False}
+
+
+def plan_shards(trials_range: list, n_shards: int) -> list:
+    """Split a range of trials into contiguous ranges of balanced sizes.
+
+    Args:
+        trials_range (list): First and last trial numbers (included)
+        n_shards (int): Number of shards. There are fewer shards if the
+            range has fewer trials.
+
+    Returns:
+        list: First and last trial numbers of each shard
+    """
+    n_trials = trials_range[1] - trials_range[0] + 1
+    n_shards = max(min(n_shards, n_trials), 1)
+    size, remainder = divmod(n_trials, n_shards)
+    ranges = []
+    start = trials_range[0]
+    for k in range(n_shards):
+        end = start + size - 1 + (k < remainder)
+        ranges.append([start, end])
+        start = end + 1
+    return ranges
+
+
+def shard_folder(storage_path: str, shard_no: int) -> str:
+    """Folder of the results of a shard."""
+    return os.path.join(storage_path, f'shard_{shard_no}')
+
+
+def strip_options(argv: list, options: dict) -> list:
+    """Remove options from command-line arguments.
+
+    Args:
+        argv (list): Command-line arguments
+        options (dict): Names of the options with whether they take a value
+
+    Returns:
+        list: Remaining arguments
+    """
+    remaining = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+            continue
+        name = arg.split('=', 1)[0]
+        if name in options:
+            skip = options[name] and '=' not in arg
+            continue
+        remaining.append(arg)
+    return remaining
+
+
+def shard_commands(script: str, argv: list, trials_range: list,
+                   storage_path: str, n_shards: int) -> list:
+    """Commands running each shard of a simulation.
+
+    Args:
+        script (str): Path of the compute script
+        argv (list): Command-line arguments of the coordinator
+        trials_range (list): Range of trials of the whole simulation
+        storage_path (str): Storage folder of the whole simulation
+        n_shards (int): Number of shards
+
+    Returns:
+        list: (command, storage folder of the shard) of each shard
+    """
+    argv = strip_options(argv, SHARD_OPTIONS)
+    commands = []
+    for k, (start, end) in enumerate(plan_shards(trials_range, n_shards)):
+        folder = shard_folder(storage_path, k)
+        command = [sys.executable, os.path.abspath(script)] + argv + [
+            '--trials_range_start', str(start),
+            '--trials_range_end', str(end),
+            '--storage_path', folder]
+        commands.append((command, folder))
+    return commands
+
+
+def shard_progress(folders: list) -> int:
+    """Number of completed trials of the shards, from their progress.json.
+
+    Args:
+        folders (list): Storage folders of the shards
+
+    Returns:
+        int: Number of completed trials
+    """
+    done = 0
+    for folder in folders:
+        try:
+            with open(os.path.join(folder, 'progress.json')) as f:
+                done += json.load(f)['done']
+        except (OSError, ValueError):
+            pass
+    return done
+
+
+class SerialBackend:
+    """Run the shards one after the other in subprocesses, e.g. to debug
+    the sharding on a single machine."""
+
+    # Whether the shards are completed when `run` returns
+    blocking = True
+
+    def run(self, commands: list, poll=None) -> bool:
+        """Run the shards.
+
+        Args:
+            commands (list): (command, folder) of each shard
+            poll (callable, optional): Called regularly while the shards
+                run. Defaults to None.
+
+        Returns:
+            bool: Whether the shards are completed
+        """
+        for command, folder in commands:
+            process = _launch(command, folder)
+            while process.poll() is None:
+                if poll is not None:
+                    poll()
+                time.sleep(1.)
+            _check(process, folder)
+        return True
+
+
+class LocalBackend:
+    """Run the shards in a pool of local subprocesses.
+
+    Args:
+        max_workers (int, optional): Number of shards run simultaneously.
+            Defaults to None, the number of CPUs.
+    """
+
+    blocking = True
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def run(self, commands: list, poll=None) -> bool:
+        """Run the shards, see `SerialBackend.run`."""
+        pending = list(commands)
+        running = []
+        while len(pending) > 0 or len(running) > 0:
+            while len(pending) > 0 and len(running) < self.max_workers:
+                command, folder = pending.pop(0)
+                running.append((_launch(command, folder), folder))
+            for process, folder in list(running):
+                if process.poll() is not None:
+                    running.remove((process, folder))
+                    _check(process, folder)
+            if poll is not None:
+                poll()
+            time.sleep(1.)
+        return True
+
+
+class CondorBackend:
+    """Write an HTCondor submit file with a job per shard. The shards are
+    not run: the file is submitted with `condor_submit` and the results
+    are reduced afterwards with `--reduce`."""
+
+    blocking = False
+
+    def run(self, commands: list, poll=None) -> bool:
+        """Write the submit file, see `SerialBackend.run`."""
+        storage_path = os.path.dirname(commands[0][1])
+        lines = [f'executable = {sys.executable}',
+                 f'initialdir = {os.getcwd()}',
+                 f'log = {os.path.join(storage_path, "shards.log")}',
+                 'getenv = True', '']
+        for command, folder in commands:
+            os.makedirs(folder, exist_ok=True)
+            arguments = ' '.join(f"'{arg}'" if ' ' in arg else arg
+                                 for arg in command[1:])
+            lines += [f'arguments = "{arguments}"',
+                      f'output = {os.path.join(folder, "shard.out")}',
+                      f'error = {os.path.join(folder, "shard.err")}',
+                      'queue', '']
+        submit_file = os.path.join(storage_path, 'shards.sub')
+        with open(submit_file, 'w') as f:
+            f.write('\n'.join(lines))
+        rich.print(f'[bold]Submit file written in {submit_file}[/bold]. '
+                   'Submit it with condor_submit and run the same command '
+                   'with --reduce once the jobs are done.')
+        return False
+
+
+SHARD_BACKENDS = {'local': LocalBackend,
+                  'serial': SerialBackend,
+                  'condor': CondorBackend}
+
+
+def _launch(command: list, folder: str) -> subprocess.Popen:
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, 'shard.log'), 'w') as log:
+        return subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+
+
+def _check(process: subprocess.Popen, folder: str):
+    if process.returncode != 0:
+        raise RuntimeError(
+            f'Shard {folder} failed with code {process.returncode}, '
+            f'see {os.path.join(folder, "shard.log")}:\n'
+            f'{shlex.join(process.args)}')
+
+
+def reduce_shards(storage_path: str, trials_range: list,
+                  n_shards: int) -> dict:
+    """Merge the results of the shards of a simulation and save them in
+    results.pkl of its storage folder.
+
+    Only the shards planned for the range of trials are merged: the
+    folders left by a run with another number of shards or range of
+    trials are ignored.
+
+    Args:
+        storage_path (str): Storage folder of the simulation
+        trials_range (list): Range of trials of the whole simulation
+        n_shards (int): Number of shards
+
+    Returns:
+        dict: Merged results
+    """
+    plan = plan_shards(trials_range, n_shards)
+    folders = [shard_folder(storage_path, k) for k in range(len(plan))]
+    missing = [folder for folder in folders
+               if not os.path.isfile(os.path.join(folder, 'results.pkl'))]
+    if len(missing) > 0:
+        raise FileNotFoundError(
+            f'Missing results of the shards in {storage_path}: {missing}')
+
+    results_list = [load_results(folder) for folder in folders]
+    mismatched = [folder for folder, results, shard_range
+                  in zip(folders, results_list, plan)
+                  if list(results['trials_range']) != shard_range]
+    if len(mismatched) > 0:
+        raise ValueError(
+            f'The shards {mismatched} were not run on the ranges of trials '
+            f'planned for {trials_range} in {len(plan)} shards: {plan}')
+
+    results = reduce_results(results_list)
+    with open(os.path.join(storage_path, 'results.pkl'), 'wb') as f:
+        pickle.dump(results, f)
+    return results
+
+
+def run_sharded(script: str, argv: list, trials_range: list,
+                storage_path: str, n_shards: int, backend: str = 'local',
+                max_workers: int = None, reduce_only: bool = False) -> dict:
+    """Run a simulation as shards of trials and merge their results.
+
+    Each shard runs the compute script on a contiguous part of the range
+    of trials and stores its results, with the states of its
+    accumulators, in `shard_<k>` of the storage folder. The progress of
+    the shards is gathered in the progress files of the storage folder.
+
+    Args:
+        script (str): Path of the compute script
+        argv (list): Command-line arguments of the coordinator
+        trials_range (list): Range of trials of the whole simulation
+        storage_path (str): Storage folder of the whole simulation
+        n_shards (int): Number of shards
+        backend (str, optional): Name of the backend in SHARD_BACKENDS.
+            Defaults to 'local'.
+        max_workers (int, optional): Number of shards run simultaneously
+            by the local backend. Defaults to None, the number of CPUs.
+        reduce_only (bool, optional): Only merge the results of shards
+            already run. Defaults to False.
+
+    Returns:
+        dict: Merged results, None if the backend only submitted the
+            shards
+    """
+    total = trials_range[1] - trials_range[0] + 1
+    commands = shard_commands(script, argv, trials_range, storage_path,
+                              n_shards)
+    folders = [folder for _, folder in commands]
+
+    if not reduce_only:
+        if backend == 'local':
+            runner = LocalBackend(max_workers)
+        else:
+            runner = SHARD_BACKENDS[backend]()
+        if not runner.blocking:
+            runner.run(commands)
+            return None
+        rich.print(f'[bold]Running {len(commands)} shards '
+                   f'with the {backend} backend[/bold]')
+
+    with ProgressMonitor(storage_path, total, shared=False) as progress:
+        reported = 0
+
+        def poll():
+            nonlocal reported
+            done = shard_progress(folders)
+            progress.queue.put(done - reported)
+            reported = done
+
+        if not reduce_only:
+            runner.run(commands, poll)
+        poll()
+        return reduce_shards(storage_path, trials_range, n_shards)
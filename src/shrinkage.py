@@ -0,0 +1,154 @@
+# ========================================
+# FileName: shrinkage.py
+# Date: 19 oct. 2026 - 09:40
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Shrinkage covariance estimators
+#        evaluated at once on stacks of
+#        datasets
+# =========================================
+
+import numpy as np
+
+
+def scatter_statistics(samples: np.ndarray,
+                       assume_centered: bool = False) -> dict:
+    """Statistics of stacks of datasets shared by the shrinkage
+    estimators.
+
+    Args:
+        samples (np.ndarray): Datasets of shape (k, n, p)
+        assume_centered (bool, optional): Whether the data are centered,
+            otherwise the sample mean of each dataset is removed.
+            Defaults to False.
+
+    Returns:
+        dict: Statistics of the datasets:
+            * location: sample means of shape (k, p), zero if centered,
+            * scatter: sample covariances (normalized by n) of shape
+              (k, p, p),
+            * fourth: mean of the fourth power of the norm of the
+              (centered) samples, of shape (k,),
+            * n_samples: number n of samples of the datasets.
+    """
+    n_samples = samples.shape[1]
+    if assume_centered:
+        location = np.zeros((samples.shape[0], samples.shape[2]))
+    else:
+        location = np.mean(samples, axis=1)
+        samples = samples - location[:, np.newaxis]
+    scatter = np.swapaxes(samples, 1, 2) @ samples / n_samples
+    fourth = np.mean(np.sum(samples**2, axis=2)**2, axis=1)
+    return {'location': location, 'scatter': scatter, 'fourth': fourth,
+            'n_samples': n_samples}
+
+
+def _traces(scatter: np.ndarray) -> tuple:
+    """Traces of S and of S^2 of symmetric matrices (k, p, p)."""
+    return (np.trace(scatter, axis1=1, axis2=2),
+            np.sum(scatter**2, axis=(1, 2)))
+
+
+def ledoit_wolf_shrinkage(statistics: dict) -> np.ndarray:
+    """Ledoit-Wolf shrinkage intensities, as in sklearn.
+
+    Args:
+        statistics (dict): Output of scatter_statistics
+
+    Returns:
+        np.ndarray: Shrinkage intensities of shape (k,)
+    """
+    scatter = statistics['scatter']
+    n_features = scatter.shape[-1]
+    n_samples = statistics['n_samples']
+    trace, trace_squared = _traces(scatter)
+    mu = trace / n_features
+    # Variance of the entries of the sample covariance, bounded by the
+    # distance of the sample covariance to the target
+    beta = (statistics['fourth'] - trace_squared) / (n_features * n_samples)
+    delta = (trace_squared - n_features * mu**2) / n_features
+    beta = np.minimum(beta, delta)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(beta == 0, 0., beta / delta)
+
+
+def oas_shrinkage(statistics: dict) -> np.ndarray:
+    """Oracle Approximating Shrinkage intensities, as in sklearn.
+
+    Args:
+        statistics (dict): Output of scatter_statistics
+
+    Returns:
+        np.ndarray: Shrinkage intensities of shape (k,)
+    """
+    scatter = statistics['scatter']
+    n_features = scatter.shape[-1]
+    trace, trace_squared = _traces(scatter)
+    numerator = trace_squared + trace**2
+    denominator = (statistics['n_samples'] + 1) * \
+        (trace_squared - trace**2 / n_features)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator == 0, 1.,
+                        np.minimum(numerator / denominator, 1.))
+
+
+def rblw_shrinkage(statistics: dict) -> np.ndarray:
+    """Rao-Blackwellized Ledoit-Wolf shrinkage intensities of
+    Chen et al. (2010), for Gaussian data.
+
+    Args:
+        statistics (dict): Output of scatter_statistics
+
+    Returns:
+        np.ndarray: Shrinkage intensities of shape (k,)
+    """
+    scatter = statistics['scatter']
+    n_features = scatter.shape[-1]
+    n_samples = statistics['n_samples']
+    trace, trace_squared = _traces(scatter)
+    numerator = (n_samples - 2) / n_samples * trace_squared + trace**2
+    denominator = (n_samples + 2) * (trace_squared - trace**2 / n_features)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator == 0, 1.,
+                        np.minimum(numerator / denominator, 1.))
+
+
+def shrink(scatter: np.ndarray, shrinkage: np.ndarray) -> np.ndarray:
+    """Convex combinations (1 - s) S + s tr(S)/p I of sample covariances
+    and scaled identities.
+
+    Args:
+        scatter (np.ndarray): Sample covariances of shape (k, p, p)
+        shrinkage (np.ndarray): Shrinkage intensities of shape (k,)
+
+    Returns:
+        np.ndarray: Shrunk covariances of shape (k, p, p)
+    """
+    n_features = scatter.shape[-1]
+    mu = np.trace(scatter, axis1=1, axis2=2) / n_features
+    shrunk = (1 - shrinkage)[:, np.newaxis, np.newaxis] * scatter
+    diagonal = np.arange(n_features)
+    shrunk[:, diagonal, diagonal] += (shrinkage * mu)[:, np.newaxis]
+    return shrunk
+
+
+SHRINKAGES = {'ledoit_wolf': ledoit_wolf_shrinkage,
+              'oas': oas_shrinkage,
+              'rblw': rblw_shrinkage}
+
+
+def shrinkage_estimates(statistics: dict, names: list = None) -> dict:
+    """Shrunk covariances of stacks of datasets for several estimators.
+
+    Args:
+        statistics (dict): Output of scatter_statistics
+        names (list, optional): Names of estimators of SHRINKAGES.
+            Defaults to None, all of them.
+
+    Returns:
+        dict: Shrunk covariances of shape (k, p, p) of each estimator
+    """
+    names = list(SHRINKAGES) if names is None else names
+    return {name: shrink(statistics['scatter'], SHRINKAGES[name](statistics))
+            for name in names}
@@ -0,0 +1,208 @@
+# ========================================
+# FileName: spectrum.py
+# Date: 19 oct. 2026 - 16:40
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Spectral statistics of sample
+#        covariances computed from the
+#        samples without forming them
+# =========================================
+
+import numpy as np
+from scipy.sparse.linalg import LinearOperator, eigsh
+
+# Below this size, the Gram matrix is diagonalized directly rather than by
+# the Lanczos iterations
+DENSE_SIZE = 100
+# Relative accuracy of the eigenvalues given by the Lanczos iterations, far
+# below their fluctuations across the trials
+LANCZOS_TOL = 1e-4
+LANCZOS_VECTORS = 32
+# Statistics returned by `spectral_statistics`
+SPECTRAL_STATISTICS = ['mse_covariance', 'eigenvalue_min', 'eigenvalue_max',
+                       'mp_variance', 'mp_ratio']
+
+
+def marchenko_pastur_edges(ratio, variance: float = 1.) -> tuple:
+    """Edges of the support of the Marchenko-Pastur distribution, the
+    limit of the nonzero eigenvalues of sample covariances of white data
+    when p/n tends to the ratio.
+
+    Args:
+        ratio (array-like): Ratios p/n of the number of features to the
+            number of samples
+        variance (float, optional): Variance of the data. Defaults to 1.
+
+    Returns:
+        tuple: (lower edge, upper edge) for each ratio
+    """
+    root = np.sqrt(np.asarray(ratio, dtype=float))
+    return variance * (1 - root)**2, variance * (1 + root)**2
+
+
+def gram_operator(samples: np.ndarray) -> LinearOperator:
+    """Operator of the smallest of the matrices X^T X / n and X X^T / n,
+    which have the same nonzero eigenvalues, applied without being formed.
+
+    Args:
+        samples (np.ndarray): Samples X of shape (n_samples, n_features)
+
+    Returns:
+        LinearOperator: Operator of size min(n_samples, n_features)
+    """
+    n_samples, n_features = samples.shape
+    if n_samples >= n_features:
+        def matmat(vectors):
+            return samples.T @ (samples @ vectors) / n_samples
+    else:
+        def matmat(vectors):
+            return samples @ (samples.T @ vectors) / n_samples
+    size = min(n_samples, n_features)
+    return LinearOperator((size, size), matvec=matmat, matmat=matmat,
+                          dtype=samples.dtype)
+
+
+def extreme_eigenvalues(samples: np.ndarray,
+                        rng: np.random.Generator) -> tuple:
+    """Smallest nonzero and largest eigenvalues of the sample covariance
+    X^T X / n, by Lanczos iterations on its smallest Gram operator.
+
+    Args:
+        samples (np.ndarray): Samples X of shape (n_samples, n_features)
+        rng (np.random.Generator): Random generator of the starting vector
+            of the iterations, for reproducible results
+
+    Returns:
+        tuple: (smallest eigenvalue, largest eigenvalue)
+    """
+    operator = gram_operator(samples)
+    size = operator.shape[0]
+    if size <= DENSE_SIZE:
+        eigenvalues = np.linalg.eigvalsh(operator.matmat(np.eye(size)))
+        return eigenvalues[0], eigenvalues[-1]
+    # Each end of the spectrum converges at its own pace: separate runs
+    # need fewer products than a single one for both ends
+    eigenvalues = [eigsh(operator, k=1, which=which, tol=LANCZOS_TOL,
+                         ncv=min(LANCZOS_VECTORS, size),
+                         v0=rng.standard_normal(size),
+                         return_eigenvectors=False)[0]
+                   for which in ['SA', 'LA']]
+    return eigenvalues[0], eigenvalues[1]
+
+
+def hutchinson_squared_norm(apply, dimension: int, n_probes: int,
+                            rng: np.random.Generator) -> float:
+    """Hutchinson estimate of the squared Frobenius norm of a matrix A,
+    tr(A^T A) = E[||A z||^2] for Rademacher vectors z, from its products.
+
+    Args:
+        apply (callable): Product of the matrix with a block of vectors of
+            shape (dimension, n_probes)
+        dimension (int): Number of columns of the matrix
+        n_probes (int): Number of random vectors
+        rng (np.random.Generator): Random generator of the vectors
+
+    Returns:
+        float: Unbiased estimate of the squared norm
+    """
+    probes = rng.choice([-1., 1.], size=(dimension, n_probes))
+    return np.sum(apply(probes)**2) / n_probes
+
+
+def _squared_gram_norm(samples: np.ndarray) -> float:
+    """||X^T X||_F^2 from the smallest Gram matrix of the samples."""
+    if samples.shape[0] >= samples.shape[1]:
+        return np.sum((samples.T @ samples)**2)
+    return np.sum((samples @ samples.T)**2)
+
+
+def spectral_statistics(white_samples: np.ndarray, chol: np.ndarray,
+                        rng: np.random.Generator, n_probes: int = 32,
+                        identity: bool = False) -> dict:
+    """Statistics of the sample covariance S = L W L^T of Gaussian samples
+    with known mean, from their whitened version Z, W = Z^T Z / n, without
+    forming any p x p matrix.
+
+    The spectrum is that of W, i.e. the generalized eigenvalues of
+    (S, Sigma), which follows the Marchenko-Pastur law. Its moments give
+    the fit of the law: the variance tr(W) / p and the ratio
+    (tr(W^2) / p) / variance^2 - 1, whose expectation is (p + 1) / n.
+
+    Args:
+        white_samples (np.ndarray): Whitened samples Z of shape
+            (n_samples, n_features), the centered samples being Z L^T
+        chol (np.ndarray): Lower Cholesky factor L of the covariance
+        rng (np.random.Generator): Random generator of the probes and of
+            the starting vectors of the Lanczos iterations
+        n_probes (int, optional): Number of probes of the Hutchinson
+            estimates of tr(W^2) and of the squared error. Defaults to 32;
+            0 computes them exactly from the Gram matrices, at a cost of
+            min(n, p)^2 max(n, p) instead of n p n_probes.
+        identity (bool, optional): Whether the covariance is the identity,
+            avoiding the products with the Cholesky factor. Defaults to
+            False.
+
+    Returns:
+        dict: Squared Frobenius error ||S - Sigma||_F^2 (`mse_covariance`),
+            smallest nonzero and largest eigenvalues of W
+            (`eigenvalue_min`, `eigenvalue_max`) and fit of the
+            Marchenko-Pastur law (`mp_variance`, `mp_ratio`)
+    """
+    n_samples, n_features = white_samples.shape
+    trace = np.sum(white_samples**2) / n_samples
+    if n_probes > 0:
+        def gram(vectors):
+            return white_samples.T @ (white_samples @ vectors) / n_samples
+
+        def error(vectors):
+            # (S - Sigma) v = L (W - I) L^T v
+            if identity:
+                return gram(vectors) - vectors
+            colored = chol.T @ vectors
+            return chol @ (gram(colored) - colored)
+
+        trace_square = hutchinson_squared_norm(gram, n_features, n_probes,
+                                               rng)
+        squared_error = hutchinson_squared_norm(error, n_features, n_probes,
+                                                rng)
+    else:
+        trace_square = _squared_gram_norm(white_samples) / n_samples**2
+        if identity:
+            squared_error = trace_square - 2 * trace + n_features
+        else:
+            # ||S||^2 - 2 tr(S Sigma) + ||Sigma||^2
+            samples = white_samples @ chol.T
+            covariance = chol @ chol.T
+            squared_error = _squared_gram_norm(samples) / n_samples**2 - \
+                2 * np.sum((samples @ chol)**2) / n_samples + \
+                np.sum(covariance**2)
+
+    eigenvalue_min, eigenvalue_max = extreme_eigenvalues(white_samples, rng)
+    variance = trace / n_features
+    return {'mse_covariance': squared_error,
+            'eigenvalue_min': eigenvalue_min,
+            'eigenvalue_max': eigenvalue_max,
+            'mp_variance': variance,
+            'mp_ratio': trace_square / n_features / variance**2 - 1}
+
+
+def expected_spectral_statistics(n_features: int,
+                                 n_samples_list) -> dict:
+    """Limits of the spectral statistics of `spectral_statistics` given by
+    the Marchenko-Pastur law, with the ratio p/n of each number of samples.
+
+    Args:
+        n_features (int): Number of features
+        n_samples_list (array-like): Numbers of samples
+
+    Returns:
+        dict: Values for each number of samples of `eigenvalue_min`,
+            `eigenvalue_max`, `mp_variance` and `mp_ratio`
+    """
+    ratio = n_features / np.asarray(n_samples_list, dtype=float)
+    lower, upper = marchenko_pastur_edges(ratio)
+    return {'eigenvalue_min': lower,
+            'eigenvalue_max': upper,
+            'mp_variance': np.ones_like(ratio),
+            'mp_ratio': ratio}
@@ -0,0 +1,241 @@
+# ========================================
+# FileName: trial_store.py
+# Date: 19 oct. 2026 - 10:15
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Storage of the per-trial outputs
+#        of a Monte-Carlo simulation by a
+#        background writer
+# =========================================
+
+import glob
+import os
+import queue
+import shutil
+import threading
+import numpy as np
+
+from src.montecarlo import stack_results
+
+STORE_FORMATS = ['npz', 'zarr', 'hdf5']
+STORE_NAMES = {'npz': 'trials', 'zarr': 'trials.zarr', 'hdf5': 'trials.h5'}
+
+
+def store_path(storage_path: str, store_format: str = 'npz') -> str:
+    """Path of the store of the trials in a storage folder."""
+    return os.path.join(storage_path, STORE_NAMES[store_format])
+
+
+class TrialWriter:
+    """Append the outputs of chunks of trials to a store in a background
+    thread, so that the compression and the writes overlap with the
+    computation.
+
+    The chunks wait in a bounded queue: when the writer is late, `put`
+    blocks until a chunk is written, which bounds the memory used.
+
+    Formats:
+    * npz: a compressed file `chunk_<first>_<last>.npz` per chunk in the
+      folder `trials`,
+    * zarr: a group `trials.zarr` with an array per output (needs zarr),
+    * hdf5: a file `trials.h5` with a dataset per output (needs h5py).
+    In all of them, the numbers of the trials are stored as
+    `trial_numbers`. A store left in the folder by a previous run, in any
+    format, is replaced.
+
+    Args:
+        storage_path (str): Folder where the store is created
+        store_format (str, optional): Format among STORE_FORMATS.
+            Defaults to 'npz'.
+        max_pending (int, optional): Maximum number of chunks waiting to
+            be written. Defaults to 4.
+    """
+
+    def __init__(self, storage_path: str, store_format: str = 'npz',
+                 max_pending: int = 4):
+        if store_format not in STORE_FORMATS:
+            raise ValueError(f'Unknown format {store_format}, '
+                             f'available: {STORE_FORMATS}')
+        self.path = store_path(storage_path, store_format)
+        self.store_format = store_format
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.n_written = 0
+        self._store = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """Create an empty store, replacing the one of a previous run, and
+        start the writer thread."""
+        storage_path = os.path.dirname(self.path)
+        for store_format in STORE_FORMATS:
+            path = store_path(storage_path, store_format)
+            if store_format == self.store_format or \
+                    not os.path.exists(path):
+                continue
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+
+        if self.store_format == 'npz':
+            os.makedirs(self.path, exist_ok=True)
+            for chunk_file in glob.glob(os.path.join(self.path,
+                                                     'chunk_*.npz')):
+                os.remove(chunk_file)
+        elif self.store_format == 'zarr':
+            import zarr
+            self._store = zarr.open_group(self.path, mode='w')
+        else:
+            import h5py
+            self._store = h5py.File(self.path, 'w')
+        self._thread.start()
+
+    def put(self, trial_numbers: list, arrays: dict):
+        """Hand a chunk to the writer, waiting if too many chunks are
+        pending.
+
+        Args:
+            trial_numbers (list): Numbers of the trials of the chunk
+            arrays (dict): Arrays of shape (n_trials, ...) of the chunk
+        """
+        self._raise()
+        self.queue.put((np.asarray(trial_numbers), arrays))
+
+    def close(self):
+        """Write the pending chunks and stop the writer thread."""
+        self.queue.put(None)
+        self._thread.join()
+        self._raise()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _raise(self):
+        if self._error is not None:
+            raise RuntimeError(f'Writing the trials in {self.path} '
+                               'failed') from self._error
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            if self._error is not None:
+                # Keep consuming so that the producer is never blocked
+                continue
+            try:
+                trial_numbers, arrays = item
+                if self.store_format == 'npz':
+                    self._write_npz(trial_numbers, arrays)
+                elif self.store_format == 'zarr':
+                    self._write_zarr(trial_numbers, arrays)
+                else:
+                    self._write_hdf5(trial_numbers, arrays)
+                self.n_written += len(trial_numbers)
+            except Exception as error:
+                self._error = error
+        if self.store_format == 'hdf5':
+            self._store.close()
+
+    def _write_npz(self, trial_numbers, arrays):
+        name = f'chunk_{trial_numbers[0]:09d}_{trial_numbers[-1]:09d}.npz'
+        np.savez_compressed(os.path.join(self.path, name),
+                            trial_numbers=trial_numbers, **arrays)
+
+    def _write_zarr(self, trial_numbers, arrays):
+        group = self._store
+        for name, values in {'trial_numbers': trial_numbers,
+                             **arrays}.items():
+            if name in group:
+                group[name].append(values, axis=0)
+            else:
+                group.create_array(name, shape=values.shape,
+                                   dtype=values.dtype,
+                                   chunks=values.shape)[...] = values
+
+    def _write_hdf5(self, trial_numbers, arrays):
+        store = self._store
+        for name, values in {'trial_numbers': trial_numbers,
+                             **arrays}.items():
+            if name in store:
+                dataset = store[name]
+                dataset.resize(len(dataset) + len(values), axis=0)
+                dataset[-len(values):] = values
+            else:
+                store.create_dataset(name, data=values,
+                                     maxshape=(None,) + values.shape[1:],
+                                     chunks=True, compression='gzip')
+        store.flush()
+
+
+def chunk_handler(sinks: list, drop: list = None):
+    """Callback handing the outputs of each chunk to sinks, to be used as
+    the `on_chunk` argument of `run_montecarlo`.
+
+    Args:
+        sinks (list): Objects with a method `put(trial_numbers, arrays)`
+            called with the stacked outputs of the chunk, e.g. a
+            TrialWriter
+        drop (list, optional): Outputs removed from the results kept in
+            memory once handed to the sinks. Defaults to None.
+
+    Returns:
+        callable: Callback `on_chunk(trial_numbers, chunk_results)`
+    """
+    drop = set() if drop is None else set(drop)
+
+    def on_chunk(trial_numbers, chunk_results):
+        arrays = stack_results(chunk_results)
+        for sink in sinks:
+            sink.put(trial_numbers, arrays)
+        return [{name: values for name, values in result.items()
+                 if name not in drop}
+                for result in chunk_results]
+    return on_chunk
+
+
+def load_trials(storage_path: str, store_format: str = None) -> dict:
+    """Load the per-trial outputs stored by a TrialWriter.
+
+    Args:
+        storage_path (str): Storage folder of the simulation
+        store_format (str, optional): Format of the store. Defaults to
+            None, the format of the store present in the folder.
+
+    Returns:
+        dict: Arrays of shape (n_trials, ...) ordered by trial number,
+            with the numbers of the trials in `trial_numbers`
+    """
+    if store_format is None:
+        formats = [store_format for store_format in STORE_FORMATS
+                   if os.path.exists(store_path(storage_path, store_format))]
+        if len(formats) == 0:
+            raise FileNotFoundError(f'No trials stored in {storage_path}')
+        store_format = formats[0]
+    path = store_path(storage_path, store_format)
+
+    if store_format == 'npz':
+        chunks = []
+        for chunk_file in sorted(glob.glob(os.path.join(path, '*.npz'))):
+            with np.load(chunk_file) as chunk:
+                chunks.append({name: chunk[name] for name in chunk.files})
+        trials = {name: np.concatenate([chunk[name] for chunk in chunks])
+                  for name in chunks[0]}
+    elif store_format == 'zarr':
+        import zarr
+        group = zarr.open_group(path, mode='r')
+        trials = {name: group[name][...] for name in group.array_keys()}
+    else:
+        import h5py
+        with h5py.File(path, 'r') as store:
+            trials = {name: store[name][...] for name in store}
+
+    order = np.argsort(trials['trial_numbers'], kind='stable')
+    return {name: values[order] for name, values in trials.items()}
@@ -0,0 +1,232 @@
+# ========================================
+# FileName: variance_reduction.py
+# Date: 19 oct. 2026 - 09:40
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Control variates and antithetic
+#        pairs for the Monte-Carlo
+#        estimation of MSE curves
+# =========================================
+
+import numpy as np
+
+from src.accumulators import RunningMoments, RunningComoments
+
+
+def control_statistics(sample_covariance: np.ndarray,
+                       covariance: np.ndarray) -> dict:
+    """Control variables computed on sample covariance matrices.
+
+    The squared error ||S - Sigma||_F^2 = ||S||_F^2 - 2 tr(S Sigma) +
+    ||Sigma||_F^2 is correlated with these controls without being one of
+    their linear combinations, ||S||_F^2 not being a control: otherwise
+    the regression would have no residual and the control-variate
+    estimate would only reproduce the closed-form MSE.
+
+    Args:
+        sample_covariance (np.ndarray): Sample covariance matrices of
+            shape (..., p, p)
+        covariance (np.ndarray): True covariance matrix
+
+    Returns:
+        dict: tr(S) and tr(S Sigma), of shape (...)
+    """
+    return {'control_trace': np.trace(sample_covariance,
+                                      axis1=-2, axis2=-1),
+            'control_cross': np.sum(sample_covariance * covariance,
+                                    axis=(-2, -1))}
+
+
+def control_expectations(covariance: np.ndarray, n_samples_list,
+                         assume_centered: bool = True) -> dict:
+    """Expectations of the control variables under a Gaussian model.
+
+    The sample covariance S is normalized by the number of samples n. When
+    centered, n S follows a Wishart distribution W(Sigma, n), otherwise
+    W(Sigma, n-1), hence E[S] = d/n Sigma with d the degrees of freedom.
+
+    Args:
+        covariance (np.ndarray): True covariance matrix
+        n_samples_list (array-like): Numbers of samples
+        assume_centered (bool, optional): Whether the sample covariance
+            uses the known mean. Defaults to True.
+
+    Returns:
+        dict: Expectation of each control of `control_statistics` for
+            each number of samples
+    """
+    n_samples = np.asarray(n_samples_list, dtype=float)
+    dof = n_samples if assume_centered else n_samples - 1
+    bias = dof / n_samples
+    return {'control_trace': bias * np.trace(covariance),
+            'control_cross': bias * np.sum(covariance**2)}
+
+
+def control_variate_estimate(comoments: RunningComoments,
+                             expected: np.ndarray) -> tuple:
+    """Control-variate estimate of the mean of a statistic.
+
+    The first coordinate of the observations is the statistic Y and the
+    others are the controls C of known expectation. The estimate is
+    mean(Y) - beta^T (mean(C) - E[C]) with beta the regression coefficient
+    of Y on C, estimated on the same trials.
+
+    Args:
+        comoments (RunningComoments): Comoments of (Y, C) for each
+            number of samples
+        expected (np.ndarray): Expectations of the controls, of shape
+            (size, n_controls)
+
+    Returns:
+        tuple: (estimate, standard error) for each number of samples
+    """
+    covariance = comoments.covariance
+    s_cc = covariance[:, 1:, 1:]
+    s_cy = covariance[:, 1:, 0]
+    # Some controls can be colinear, e.g. tr(S) and tr(S Sigma) when
+    # Sigma = I, hence the pseudo-inverse
+    beta = np.einsum('mij,mj->mi',
+                     np.linalg.pinv(s_cc, rcond=1e-10, hermitian=True),
+                     s_cy)
+    estimate = comoments.mean[:, 0] - \
+        np.einsum('mi,mi->m', beta, comoments.mean[:, 1:] - expected)
+
+    n_trials = comoments.count
+    n_controls = expected.shape[1]
+    residual = np.maximum(covariance[:, 0, 0] -
+                          np.einsum('mi,mi->m', beta, s_cy), 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        residual *= (n_trials - 1) / (n_trials - 1 - n_controls)
+        standard_error = np.sqrt(residual / n_trials)
+    return estimate, standard_error
+
+
+def accumulate_trials(trials: dict, names: list, controls: list = None,
+                      antithetic: bool = False) -> dict:
+    """Mergeable state of the statistics of the trials.
+
+    Args:
+        trials (dict): Arrays of shape (n_trials, n_samples_sizes) returned
+            by the trials. With antithetic pairs, the statistics of the
+            second dataset are stored under `<name>_antithetic`.
+        names (list): Names of the statistics to summarize
+        controls (list, optional): Names of the control variables.
+            Defaults to None, no control variate.
+        antithetic (bool, optional): Whether the trials are antithetic
+            pairs. Defaults to False.
+
+    Returns:
+        dict: State with, for each statistic, the moments over all the
+            datasets (`moments`), the moments of the values of the trials,
+            i.e. of the averages of the pairs with antithetic pairs
+            (`trials`), and the comoments of these values with the
+            controls (`comoments`). See `summarize_state` and
+            `merge_states`.
+    """
+    controls = [] if controls is None else list(controls)
+    state = {'names': list(names), 'controls': controls,
+             'moments': {}, 'trials': {}, 'comoments': {}}
+
+    def trial_values(name):
+        if antithetic:
+            return (trials[name] + trials[f'{name}_antithetic']) / 2
+        return trials[name]
+
+    for name in names:
+        moments = RunningMoments.from_samples(trials[name])
+        if antithetic:
+            moments.update(trials[f'{name}_antithetic'])
+        values = trial_values(name)
+        state['moments'][name] = moments.state()
+        state['trials'][name] = RunningMoments.from_samples(values).state()
+
+        if len(controls) > 0:
+            observations = [values] + [trial_values(control)
+                                       for control in controls]
+            comoments = RunningComoments(values.shape[1], len(observations))
+            comoments.update(np.stack(observations, axis=-1))
+            state['comoments'][name] = comoments.state()
+    return state
+
+
+def state_from_moments(moments: dict) -> dict:
+    """State of statistics accumulated without antithetic pairs nor
+    controls, e.g. by the adaptive simulation.
+
+    Args:
+        moments (dict): RunningMoments of each statistic
+
+    Returns:
+        dict: State, see `accumulate_trials`
+    """
+    states = {name: name_moments.state()
+              for name, name_moments in moments.items()}
+    return {'names': list(moments), 'controls': [],
+            'moments': states, 'trials': dict(states), 'comoments': {}}
+
+
+def merge_states(states: list) -> dict:
+    """Merge the states of disjoint sets of trials.
+
+    The merge is exact: the summary of the merged state is the one of the
+    concatenated trials.
+
+    Args:
+        states (list): Outputs of `accumulate_trials` on the same
+            statistics
+
+    Returns:
+        dict: Merged state
+    """
+    merged = {'names': states[0]['names'],
+              'controls': states[0]['controls'],
+              'moments': {}, 'trials': {}, 'comoments': {}}
+    for key, accumulator in [('moments', RunningMoments),
+                             ('trials', RunningMoments),
+                             ('comoments', RunningComoments)]:
+        for name in states[0][key]:
+            total = accumulator.from_state(states[0][key][name])
+            for state in states[1:]:
+                total.merge(accumulator.from_state(state[key][name]))
+            merged[key][name] = total.state()
+    return merged
+
+
+def summarize_state(state: dict, expectations: dict = None) -> dict:
+    """Summarize the statistics of the trials from their state.
+
+    Args:
+        state (dict): Output of `accumulate_trials` or `merge_states`
+        expectations (dict, optional): Expectations of the controls, see
+            `control_expectations`. If given, the control-variate estimates
+            are computed. Defaults to None.
+
+    Returns:
+        dict: For each statistic:
+            * `<name>_mean` and `<name>_std`: mean and standard deviation of
+              the statistic over all the datasets,
+            * `<name>_se`: standard error of the mean (over the averages of
+              the pairs with antithetic pairs),
+            * `<name>_mean_cv` and `<name>_se_cv`: control-variate estimate
+              and its standard error, if expectations are given,
+        and `n_trials_per_n`, the number of trials.
+    """
+    summary = {}
+    for name in state['names']:
+        moments = RunningMoments.from_state(state['moments'][name])
+        trials = RunningMoments.from_state(state['trials'][name])
+        summary[f'{name}_mean'] = moments.mean
+        summary[f'{name}_std'] = moments.std
+        summary[f'{name}_se'] = trials.sem
+
+        if expectations is not None and name in state['comoments']:
+            comoments = RunningComoments.from_state(
+                    state['comoments'][name])
+            expected = np.stack([expectations[control]
+                                 for control in state['controls']], axis=-1)
+            summary[f'{name}_mean_cv'], summary[f'{name}_se_cv'] = \
+                control_variate_estimate(comoments, expected)
+
+    summary['n_trials_per_n'] = trials.count
+    return summary
@@ -0,0 +1,14 @@
+# ========================================
+# FileName: conftest.py
+# Date: 19 oct. 2026 - 17:10
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Configuration of the tests: the
+#        modules of src/ are imported from
+#        the root of the repository
+# =========================================
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -0,0 +1,48 @@
+# ========================================
+# FileName: test_metrics.py
+# Date: 19 oct. 2026 - 17:10
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Tests of the error metrics of
+#        the covariance estimates
+# =========================================
+
+import numpy as np
+from scipy.linalg import toeplitz
+
+from src.metrics import (
+        EIGENVALUE_METRICS,
+        ReferenceCovariance,
+        evaluate_metrics
+)
+
+
+def sample_covariances(n_trials, n_samples, covariance, seed=0):
+    """Sample covariances with known mean of Gaussian datasets."""
+    rng = np.random.default_rng(seed)
+    chol = np.linalg.cholesky(covariance)
+    samples = rng.standard_normal(
+            (n_trials, n_samples, len(covariance))) @ chol.T
+    return np.einsum('kni,knj->kij', samples, samples) / n_samples
+
+
+def test_singular_estimates_are_infinite():
+    # With fewer samples than features every estimate is singular, its
+    # null eigenvalues being +-1e-16 numerically
+    covariance = toeplitz(0.5 ** np.arange(4))
+    estimates = sample_covariances(2000, 3, covariance)
+    values = evaluate_metrics(estimates, ReferenceCovariance(covariance),
+                              EIGENVALUE_METRICS)
+    for name, value in values.items():
+        assert np.all(np.isposinf(value)), name
+
+
+def test_regular_estimates_are_finite():
+    covariance = toeplitz(0.5 ** np.arange(4))
+    estimates = sample_covariances(200, 40, covariance)
+    values = evaluate_metrics(estimates, ReferenceCovariance(covariance),
+                              EIGENVALUE_METRICS)
+    for name, value in values.items():
+        assert np.all(np.isfinite(value)), name
+        assert np.all(value >= 0), name
@@ -0,0 +1,44 @@
+# ========================================
+# FileName: test_plotting.py
+# Date: 19 oct. 2026 - 17:40
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Tests of the headless rendering
+#        of the figures
+# =========================================
+
+import os
+import numpy as np
+
+from src import plotting
+from src.plotting import format_covariance, render_folders
+
+
+def render_covariance(folder):
+    """Figure titled as those of sample_2D, saved in the folder."""
+    import matplotlib.pyplot as plt
+    cov = np.array([[1., 0.5], [0.5, 2.]])
+    fig, ax = plt.subplots()
+    ax.set_title(r'$\Sigma = {}$'.format(format_covariance(cov)) + '\n' +
+                 r'Number of samples: 10')
+    fig.savefig(os.path.join(folder, 'plot.pdf'))
+
+
+def test_batch_render_without_latex(tmp_path, monkeypatch):
+    # Rendering falls back on mathtext, which must parse the title
+    monkeypatch.setattr(plotting, 'latex_available', lambda: False)
+    folder = str(tmp_path)
+    rendered = render_folders(
+            render_covariance, [folder], lambda folder: [],
+            lambda folder: [os.path.join(folder, 'plot.pdf')], force=True)
+    import matplotlib.pyplot as plt
+    assert not plt.rcParams['text.usetex']
+    assert rendered == [folder]
+    assert os.path.getsize(os.path.join(folder, 'plot.pdf')) > 0
+
+
+def test_format_covariance_with_usetex(monkeypatch):
+    import matplotlib.pyplot as plt
+    monkeypatch.setitem(plt.rcParams, 'text.usetex', True)
+    assert r'\begin{array}' in format_covariance(np.eye(2))
@@ -0,0 +1,50 @@
+# ========================================
+# FileName: test_progress.py
+# Date: 19 oct. 2026 - 17:25
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Tests of the progress files of
+#        the simulations
+# =========================================
+
+import json
+import os
+import pytest
+
+from src.progress import ProgressMonitor
+
+
+def read_progress(folder):
+    with open(os.path.join(folder, 'progress.txt')) as f:
+        text = f.read()
+    with open(os.path.join(folder, 'progress.json')) as f:
+        return text, json.load(f)
+
+
+def test_completed_simulation_is_finished(tmp_path):
+    with ProgressMonitor(str(tmp_path), 3, shared=False) as progress:
+        progress.queue.put(3)
+    text, state = read_progress(tmp_path)
+    assert text.splitlines() == ['count_total=3', '3', 'finished']
+    assert state['finished'] and state['status'] == 'finished'
+
+
+def test_failed_simulation_is_not_finished(tmp_path):
+    with pytest.raises(RuntimeError):
+        with ProgressMonitor(str(tmp_path), 3, shared=False) as progress:
+            progress.queue.put(1)
+            raise RuntimeError('trial failed')
+    text, state = read_progress(tmp_path)
+    assert 'finished' not in text
+    assert not state['finished'] and state['status'] == 'failed'
+    assert state['done'] == 1
+
+
+def test_interrupted_simulation_is_not_finished(tmp_path):
+    with pytest.raises(KeyboardInterrupt):
+        with ProgressMonitor(str(tmp_path), 3, shared=False):
+            raise KeyboardInterrupt
+    text, state = read_progress(tmp_path)
+    assert 'finished' not in text
+    assert state['status'] == 'interrupted'
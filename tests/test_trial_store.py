@@ -0,0 +1,44 @@
+# ========================================
+# FileName: test_trial_store.py
+# Date: 19 oct. 2026 - 17:50
+# Author: Ammar Mian
+# Email: ammar.mian@univ-smb.fr
+# GitHub: https://github.com/ammarmian
+# Brief: Tests of the storage of the
+#        per-trial outputs
+# =========================================
+
+import numpy as np
+import pytest
+
+from src.trial_store import TrialWriter, STORE_FORMATS, load_trials
+
+
+def write_trials(folder, store_format, first, last, chunk_size=10):
+    with TrialWriter(folder, store_format) as writer:
+        for start in range(first, last + 1, chunk_size):
+            numbers = np.arange(start, min(start + chunk_size, last + 1))
+            writer.put(numbers, {'mse': numbers * 0.5})
+
+
+@pytest.mark.parametrize('store_format', STORE_FORMATS)
+def test_new_run_replaces_stored_trials(tmp_path, store_format):
+    if store_format == 'zarr':
+        pytest.importorskip('zarr')
+    elif store_format == 'hdf5':
+        pytest.importorskip('h5py')
+    write_trials(str(tmp_path), store_format, 1, 30)
+    write_trials(str(tmp_path), store_format, 1, 20)
+    trials = load_trials(str(tmp_path), store_format)
+    np.testing.assert_array_equal(trials['trial_numbers'],
+                                  np.arange(1, 21))
+    np.testing.assert_array_equal(trials['mse'], np.arange(1, 21) * 0.5)
+
+
+def test_new_run_replaces_store_of_other_format(tmp_path):
+    pytest.importorskip('h5py')
+    write_trials(str(tmp_path), 'hdf5', 1, 30)
+    write_trials(str(tmp_path), 'npz', 1, 20)
+    trials = load_trials(str(tmp_path))
+    np.testing.assert_array_equal(trials['trial_numbers'],
+                                  np.arange(1, 21))